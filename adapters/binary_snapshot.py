@@ -0,0 +1,221 @@
+"""
+Adapter - Snapshot binario de contenedores y barcos
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import os
+import struct
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from domain.entities import Container, Ship
+from .columnar import (
+    STATUSES,
+    CARGO_TYPES,
+    PRIORITIES,
+    STATUS_CODES,
+    CARGO_CODES,
+    PRIORITY_CODES,
+)
+
+
+MAGIC = b"CHSNAP02"
+EPOCH = datetime(1970, 1, 1)
+NO_STRING = 0xFFFFFFFF
+
+# magic, firma CSV contenedores (mtime, tamaño), firma CSV barcos,
+# bytes de la tabla de strings, contenedores, barcos y CRC32 del cuerpo
+HEADER = struct.Struct("<8sqqqqIIII")
+
+# id, barco, origen, destino, peso, carga, eta (µs), estado, prioridad,
+# progreso, grúa, refrigerado, aduana, versión
+CONTAINER_RECORD = struct.Struct("<IIIIdBqBBBI??I")
+
+# id, nombre, capitán, origen, contenedores, capacidad, estado, eta (µs)
+SHIP_RECORD = struct.Struct("<IIIIIIIq")
+
+Signature = Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]
+
+
+class _StringTable:
+    """Tabla de strings internados (cada valor repetido se guarda una vez)"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        code = self.index.get(value)
+        if code is None:
+            if "\0" in value:
+                raise ValueError("String con NUL no soportado en snapshot")
+            code = len(self.values)
+            self.index[value] = code
+            self.values.append(value)
+        return code
+
+
+def _micros(moment: datetime) -> int:
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def _flatten(signature: Signature) -> Tuple[int, int, int, int]:
+    containers_sig, ships_sig = signature
+    return (*(containers_sig or (-1, -1)), *(ships_sig or (-1, -1)))
+
+
+def write_snapshot(
+    path: str,
+    signature: Signature,
+    containers: Iterable[Container],
+    ships: Iterable[Ship],
+) -> None:
+    """Escribir snapshot binario atómicamente (archivo temporal + os.replace)
+
+    ``signature`` es la firma de los CSV de los que proviene el snapshot;
+    al leerlo se compara para detectar si quedó desactualizado.
+    """
+    strings = _StringTable()
+    intern = strings.intern
+
+    container_records = [
+        CONTAINER_RECORD.pack(
+            intern(c.container_id),
+            intern(c.ship_name),
+            intern(c.origin_port),
+            intern(c.destination_port),
+            c.weight_kg,
+            CARGO_CODES[c.cargo_type],
+            _micros(c.eta),
+            STATUS_CODES[c.status],
+            PRIORITY_CODES[c.priority],
+            c.progress_percent,
+            intern(c.crane_assigned),
+            c.temperature_controlled,
+            c.customs_cleared,
+            c.version,
+        )
+        for c in containers
+    ]
+    ship_records = [
+        SHIP_RECORD.pack(
+            intern(s.ship_id),
+            intern(s.name),
+            intern(s.captain),
+            intern(s.origin_port),
+            s.containers_count,
+            s.max_capacity,
+            intern(s.current_status),
+            _micros(s.eta_chancay),
+        )
+        for s in ships
+    ]
+
+    blob = "\0".join(strings.values).encode("utf-8")
+    body = blob + b"".join(container_records) + b"".join(ship_records)
+    header = HEADER.pack(
+        MAGIC,
+        *_flatten(signature),
+        len(blob),
+        len(container_records),
+        len(ship_records),
+        zlib.crc32(body),
+    )
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(
+    path: str, signature: Signature
+) -> Optional[Tuple[List[Container], List[Ship]]]:
+    """Leer snapshot binario con una sola lectura
+
+    Retorna None si no existe, está corrupto o no corresponde a la firma
+    actual de los CSV (en ese caso se debe volver a parsear el CSV).
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    if len(data) < HEADER.size:
+        return None
+    magic, *source, blob_size, n_containers, n_ships, crc = HEADER.unpack_from(data)
+    if magic != MAGIC or tuple(source) != _flatten(signature):
+        return None
+    body = memoryview(data)[HEADER.size :]
+    expected = (
+        blob_size
+        + CONTAINER_RECORD.size * n_containers
+        + SHIP_RECORD.size * n_ships
+    )
+    if len(body) != expected or zlib.crc32(body) != crc:
+        return None
+
+    strings = bytes(body[:blob_size]).decode("utf-8").split("\0")
+
+    def text(code: int) -> Optional[str]:
+        return None if code == NO_STRING else strings[code]
+
+    offset = blob_size
+    containers_end = offset + CONTAINER_RECORD.size * n_containers
+    # Los registros se validaron al persistirse: construcción sin revalidar
+    containers = [
+        Container.from_trusted(
+            strings[cid],
+            strings[ship],
+            strings[origin],
+            strings[destination],
+            CARGO_TYPES[cargo],
+            weight,
+            STATUSES[status],
+            EPOCH + timedelta(microseconds=eta),
+            PRIORITIES[priority],
+            progress,
+            text(crane),
+            temperature,
+            customs,
+            version,
+        )
+        for (
+            cid,
+            ship,
+            origin,
+            destination,
+            weight,
+            cargo,
+            eta,
+            status,
+            priority,
+            progress,
+            crane,
+            temperature,
+            customs,
+            version,
+        ) in CONTAINER_RECORD.iter_unpack(body[offset:containers_end])
+    ]
+    ships = [
+        Ship.from_trusted(
+            strings[sid],
+            strings[name],
+            strings[captain],
+            strings[origin],
+            count,
+            capacity,
+            strings[status],
+            EPOCH + timedelta(microseconds=eta),
+        )
+        for sid, name, captain, origin, count, capacity, status, eta in (
+            SHIP_RECORD.iter_unpack(body[containers_end:])
+        )
+    ]
+    return containers, ships
@@ -0,0 +1,51 @@
+"""
+Adapter - Registro de secuencias de cambio (sincronización delta)
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+
+class ChangeLog:
+    """Secuencia de cambios monótona y las entidades tocadas en cada una
+
+    Todo lo anterior a ``base_seq`` está consolidado en el snapshot (sin
+    detalle); desde ahí se guarda (seq, tipo, id) en orden, así una consulta
+    ``since`` es una búsqueda binaria más el tamaño del cambio.
+    """
+
+    def __init__(self, base_seq: int = 0):
+        self.reset(base_seq)
+
+    def reset(self, base_seq: int = 0) -> None:
+        """Descartar el detalle: todo hasta ``base_seq`` queda consolidado"""
+        self.base_seq = base_seq
+        self.last_seq = base_seq
+        self._seqs: List[int] = []
+        self._entries: List[Tuple[str, str]] = []
+
+    def note(self, kind: str, key: str, seq: Optional[int] = None) -> int:
+        """Registrar un cambio (sin ``seq`` se asigna la siguiente)
+
+        Un registro con secuencia ya vista (releído) se ignora.
+        """
+        if seq is None:
+            seq = self.last_seq + 1
+        elif seq <= self.last_seq:
+            return seq
+        self.last_seq = seq
+        self._seqs.append(seq)
+        self._entries.append((kind, key))
+        return seq
+
+    def covers(self, since: Optional[int]) -> bool:
+        """Si el detalle disponible alcanza para responder desde ``since``"""
+        return since is not None and self.base_seq <= since <= self.last_seq
+
+    def changed_since(self, since: int) -> Dict[str, List[str]]:
+        """IDs modificados después de ``since`` por tipo, sin repetir"""
+        changed: Dict[str, Dict[str, None]] = {}
+        for kind, key in self._entries[bisect_right(self._seqs, since) :]:
+            changed.setdefault(kind, {})[key] = None
+        return {kind: list(keys) for kind, keys in changed.items()}
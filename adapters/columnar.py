@@ -0,0 +1,81 @@
+"""
+Adapter - Representación columnar de contenedores (NumPy)
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+from typing import Dict, List, Tuple
+import numpy as np
+from domain.entities import Container, ContainerStatus, TipoCarga, Prioridad
+
+
+STATUSES = list(ContainerStatus)
+CARGO_TYPES = list(TipoCarga)
+PRIORITIES = list(Prioridad)
+
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+CARGO_CODES = {cargo: code for code, cargo in enumerate(CARGO_TYPES)}
+PRIORITY_CODES = {priority: code for code, priority in enumerate(PRIORITIES)}
+
+
+class ContainerColumns:
+    """Tabla columnar de contenedores para agregaciones vectorizadas
+
+    Cada contenedor ocupa una fila fija (container_id → fila) y solo se
+    guardan las columnas que alguna agregación lee: el tipo de carga como
+    código entero y el peso, así conteo y peso por tipo son un
+    ``np.bincount`` en lugar de un bucle Python.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._rows: Dict[str, int] = {}
+        self._size = 0
+        self._allocate(capacity)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def load(self, containers: List[Container]) -> None:
+        """Construir todas las columnas de una vez (carga inicial)"""
+        size = len(containers)
+        self._rows = {c.container_id: row for row, c in enumerate(containers)}
+        self._size = size
+        self._allocate(max(size, 1024), keep=False)
+
+        self.weight_kg[:size] = [c.weight_kg for c in containers]
+        self.cargo_type[:size] = [CARGO_CODES[c.cargo_type] for c in containers]
+
+    def upsert(self, container: Container) -> None:
+        """Escribir la fila del contenedor en O(1) amortizado"""
+        row = self._rows.get(container.container_id)
+        if row is None:
+            if self._size == len(self.weight_kg):
+                self._allocate(2 * len(self.weight_kg))
+            row = self._size
+            self._rows[container.container_id] = row
+            self._size += 1
+
+        self.weight_kg[row] = container.weight_kg
+        self.cargo_type[row] = CARGO_CODES[container.cargo_type]
+
+    # Agregaciones
+
+    def cargo_totals(self) -> Tuple[Dict[TipoCarga, int], Dict[TipoCarga, float]]:
+        """Conteo y peso total por tipo de carga"""
+        codes = self.cargo_type[: self._size]
+        counts = np.bincount(codes, minlength=len(CARGO_TYPES))
+        weights = np.bincount(
+            codes, weights=self.weight_kg[: self._size], minlength=len(CARGO_TYPES)
+        )
+        return (
+            {cargo: int(counts[code]) for code, cargo in enumerate(CARGO_TYPES)},
+            {cargo: float(weights[code]) for code, cargo in enumerate(CARGO_TYPES)},
+        )
+
+    def _allocate(self, capacity: int, keep: bool = True) -> None:
+        """Reservar (o ampliar) las columnas conservando las filas actuales"""
+        columns = {"weight_kg": np.float64, "cargo_type": np.int8}
+        for name, dtype in columns.items():
+            column = np.zeros(capacity, dtype=dtype)
+            if keep and hasattr(self, name):
+                column[: self._size] = getattr(self, name)[: self._size]
+            setattr(self, name, column)
@@ -0,0 +1,247 @@
+"""
+Adapter - Almacén residente de contenedores
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Iterable, Iterator
+from domain.entities import Container, ContainerStatus, Prioridad, TipoCarga
+from .columnar import ContainerColumns
+from .keyset_index import KeysetIndex
+
+
+# Campos filtrables de la paginación: cada valor tiene su índice ordenado
+GROUP_FIELDS = ("status", "ship_name", "priority", "cargo_type")
+
+
+def holds_crane(container: Container) -> bool:
+    """Si el contenedor ocupa una grúa (descarga en curso); los completados
+    conservan la grúa que los descargó solo como historial"""
+    return container.status == ContainerStatus.DESCARGANDO and bool(
+        container.crane_assigned
+    )
+
+
+class ContainerStore:
+    """Almacén en memoria con índices hash por ID, estado y barco, e
+    índices ordenados por ID y por ETA (globales y por cada valor de los
+    campos filtrables)"""
+
+    def __init__(self):
+        self._by_id: Dict[str, Container] = {}
+        self._by_status: Dict[ContainerStatus, Dict[str, Container]] = {
+            status: {} for status in ContainerStatus
+        }
+        self._by_ship: Dict[str, Dict[str, Container]] = {}
+        self._ordered = KeysetIndex()
+        self._groups: Dict[str, Optional[Dict[Any, KeysetIndex]]] = {
+            field: {} for field in GROUP_FIELDS
+        }
+        self.columns = ContainerColumns()
+
+        # Agregados mantenidos incrementalmente (delta por cada upsert)
+        self.total_weight = 0.0
+        self.active_cranes = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, container_id: str) -> bool:
+        return container_id in self._by_id
+
+    def __iter__(self) -> Iterator[Container]:
+        """Iterar los objetos residentes (solo lectura, uso interno)"""
+        return iter(self._by_id.values())
+
+    def load(self, containers: Iterable[Container]) -> None:
+        """Reemplazar el contenido completo del almacén
+
+        Los objetos recibidos pasan a ser residentes sin copiarse: se asume
+        que provienen de una lectura de almacenamiento y nadie más los usa.
+        """
+        self._by_id.clear()
+        for bucket in self._by_status.values():
+            bucket.clear()
+        self._by_ship.clear()
+        self.total_weight = 0.0
+        self.active_cranes = 0
+        for container in containers:
+            self._put(container, incremental=False)
+        self.columns.load(list(self._by_id.values()))
+
+        entries = sorted((c.eta, c.container_id) for c in self._by_id.values())
+        self._ordered.load(entries, sorted(self._by_id))
+        # Los índices por grupo se construyen al primer filtro que los usa
+        self._groups = {field: None for field in GROUP_FIELDS}
+
+    def get(self, container_id: str) -> Optional[Container]:
+        """Obtener contenedor por ID en O(1)"""
+        container = self._by_id.get(container_id)
+        return container.clone() if container else None
+
+    def version_of(self, container_id: str) -> Optional[int]:
+        """Versión almacenada del contenedor (None si no existe)"""
+        container = self._by_id.get(container_id)
+        return container.version if container else None
+
+    def all(self) -> List[Container]:
+        """Obtener copia de todos los contenedores"""
+        return [c.clone() for c in self._by_id.values()]
+
+    def iter(
+        self, filter: Optional[Callable[[Container], bool]] = None
+    ) -> Iterator[Container]:
+        """Recorrer copias de los contenedores una a una
+
+        Se toma una instantánea de referencias para tolerar altas
+        concurrentes durante el recorrido; no se copian los objetos.
+        """
+        for container in tuple(self._by_id.values()):
+            if filter is None or filter(container):
+                yield container.clone()
+
+    def by_status(self, status: ContainerStatus) -> List[Container]:
+        """Obtener contenedores por estado en O(tamaño del resultado)"""
+        return [c.clone() for c in self._by_status[status].values()]
+
+    def status_counts(self) -> Dict[ContainerStatus, int]:
+        """Conteo por estado en O(1) (tamaño de cada índice)"""
+        return {status: len(bucket) for status, bucket in self._by_status.items()}
+
+    def by_ship(self, ship_name: str) -> List[Container]:
+        """Obtener contenedores de un barco en O(tamaño del resultado)"""
+        return [c.clone() for c in self._by_ship.get(ship_name, {}).values()]
+
+    def arriving_between(self, start: datetime, end: datetime) -> List[Container]:
+        """Contenedores con ETA en [start, end] en O(log n + resultado)"""
+        return [self._by_id[cid].clone() for cid in self._ordered.between(start, end)]
+
+    def page(
+        self,
+        limit: int,
+        sort: str = "container_id",
+        descending: bool = False,
+        after: Optional[tuple] = None,
+        status: Optional[ContainerStatus] = None,
+        ship_name: Optional[str] = None,
+        priority: Optional[Prioridad] = None,
+        cargo_type: Optional[TipoCarga] = None,
+    ) -> List[Container]:
+        """Página de hasta ``limit`` contenedores posteriores a la clave ``after``
+
+        Se recorre desde el cursor (búsqueda binaria) el índice ordenado del
+        filtro más selectivo, o el global si no hay filtros, y se corta al
+        completar la página: O(log n + limit) cuando ese índice coincide
+        con los filtros.
+        """
+        filters = {
+            field: value
+            for field, value in (
+                ("status", status),
+                ("ship_name", ship_name),
+                ("priority", priority),
+                ("cargo_type", cargo_type),
+            )
+            if value is not None
+        }
+        index = self._ordered
+        if filters:
+            groups = [self._group_indexes(f).get(v) for f, v in filters.items()]
+            if any(group is None for group in groups):
+                return []
+            index = min(groups, key=len)
+
+        result = []
+        for container_id in index.iter_after(sort, descending, after):
+            container = self._by_id[container_id]
+            if all(getattr(container, f) == v for f, v in filters.items()):
+                result.append(container.clone())
+                if len(result) == limit:
+                    break
+        return result
+
+    def upsert(self, container: Container) -> Optional[Container]:
+        """Insertar o reemplazar contenedor manteniendo los índices
+
+        Retorna la versión anterior (si existía).
+        """
+        return self._put(container.clone())
+
+    def _put(
+        self, resident: Container, incremental: bool = True
+    ) -> Optional[Container]:
+        """Indexar un objeto residente (propiedad del almacén)
+
+        Con ``incremental=False`` (carga completa) la tabla columnar y los
+        índices ordenados no se tocan: ``load`` los construye al final.
+        """
+        previous = self._by_id.get(resident.container_id)
+        if previous is not None:
+            self._unindex(previous)
+            self.total_weight -= previous.weight_kg
+            self.active_cranes -= holds_crane(previous)
+        if incremental:
+            self._reorder(previous, resident)
+
+        self._by_id[resident.container_id] = resident
+        self._by_status[resident.status][resident.container_id] = resident
+        self._by_ship.setdefault(resident.ship_name, {})[
+            resident.container_id
+        ] = resident
+        if incremental:
+            self.columns.upsert(resident)
+        self.total_weight += resident.weight_kg
+        self.active_cranes += holds_crane(resident)
+        return previous
+
+    def _group_indexes(self, field: str) -> Dict[Any, KeysetIndex]:
+        """Índices ordenados por valor de ``field`` (se arman una sola vez
+        a partir del índice global, ya ordenado)"""
+        groups = self._groups[field]
+        if groups is None:
+            entries: Dict[Any, list] = {}
+            for entry in self._ordered.iter_entries():
+                value = getattr(self._by_id[entry[1]], field)
+                entries.setdefault(value, []).append(entry)
+            ids: Dict[Any, List[str]] = {}
+            for container_id in self._ordered.iter_after("container_id", False, None):
+                value = getattr(self._by_id[container_id], field)
+                ids.setdefault(value, []).append(container_id)
+            groups = self._groups[field] = {}
+            for value, group_entries in entries.items():
+                groups[value] = KeysetIndex()
+                groups[value].load(group_entries, ids[value])
+        return groups
+
+    def _reorder(self, previous: Optional[Container], current: Container) -> None:
+        """Actualizar los índices ordenados que cambian con la nueva versión"""
+        container_id = current.container_id
+        moved = previous is None or previous.eta != current.eta
+        if moved:
+            if previous is not None:
+                self._ordered.remove(previous.eta, container_id)
+            self._ordered.add(current.eta, container_id)
+
+        for field in GROUP_FIELDS:
+            groups = self._groups[field]
+            if groups is None:
+                continue
+            value = getattr(current, field)
+            if previous is not None:
+                old = getattr(previous, field)
+                if old == value and not moved:
+                    continue
+                group = groups[old]
+                group.remove(previous.eta, container_id)
+                if not group:
+                    del groups[old]
+            groups.setdefault(value, KeysetIndex()).add(current.eta, container_id)
+
+    def _unindex(self, container: Container) -> None:
+        """Quitar contenedor de los índices secundarios"""
+        self._by_status[container.status].pop(container.container_id, None)
+        ship_bucket = self._by_ship.get(container.ship_name)
+        if ship_bucket is not None:
+            ship_bucket.pop(container.container_id, None)
+            if not ship_bucket:
+                del self._by_ship[container.ship_name]
@@ -5,21 +5,80 @@ Arquitectura Hexagonal - Puerto de Chancay
 
 import csv
 import json
-from typing import List, Optional, Dict, Any
+import os
+import threading
+import zlib
+from typing import List, Optional, Dict, Any, Tuple, Callable, Iterator
 from datetime import datetime, timedelta
 import random
-from domain.ports import ContainerRepositoryPort, ShipTrackingPort, DataAnalyticsPort
+import time
+from domain.ports import (
+    ContainerRepositoryPort,
+    ShipTrackingPort,
+    DataAnalyticsPort,
+    ChangeFeedPort,
+    ChangeSet,
+    VersionConflictError,
+)
 from domain.entities import Container, Ship, ContainerStatus, TipoCarga, Prioridad
-
-
-class CSVDataAdapter(ContainerRepositoryPort, ShipTrackingPort, DataAnalyticsPort):
+from .container_store import ContainerStore
+from .journal import MutationJournal
+from .binary_snapshot import read_snapshot, write_snapshot
+from .file_lock import InterProcessLock
+from .eta_index import EtaIndex
+from .pagination import parse_sort, encode_cursor, decode_cursor
+from .change_log import ChangeLog
+
+
+class CSVDataAdapter(
+    ContainerRepositoryPort, ShipTrackingPort, DataAnalyticsPort, ChangeFeedPort
+):
     """Adaptador para gestión de datos en CSV"""
 
-    def __init__(self, data_path: str = "data/"):
+    def __init__(
+        self,
+        data_path: str = "data/",
+        compact_every: int = 1000,
+        seed_if_empty: bool = True,
+        refresh_interval: float = 1.0,
+        read_only: bool = False,
+    ):
         self.data_path = data_path
         self.containers_file = f"{data_path}containers_chancay.csv"
         self.ships_file = f"{data_path}ships_chancay.csv"
-        self._initialize_sample_data()
+        self.journal_file = f"{data_path}journal_chancay.jsonl"
+        self.snapshot_file = f"{data_path}snapshot_chancay.bin"
+        self.lock_file = f"{data_path}chancay.lock"
+        self.compact_every = compact_every
+        self.seed_if_empty = seed_if_empty and not read_only
+        self.refresh_interval = refresh_interval
+        # Solo lectura (p. ej. origen de una migración): no siembra ni
+        # escribe nada por su cuenta en el directorio (snapshot binario,
+        # compactación al cerrar), aunque otro proceso lo esté sirviendo
+        self.read_only = read_only
+
+        # Almacén residente: se recarga solo si los snapshots CSV cambian
+        # (mtime/tamaño); las mutaciones se leen del journal incrementalmente
+        self._containers = ContainerStore()
+        self._ships: Dict[str, Ship] = {}
+        self._ship_etas = EtaIndex()
+        self._occupied_berths = 0
+        self._snapshot_signature: Optional[Tuple[Any, Any]] = None
+        self._journal = MutationJournal(self.journal_file)
+        self._journal_offset = 0
+        self._last_refresh = 0.0
+        self._changes = ChangeLog()
+
+        # Varios workers comparten los archivos: cada escritura toma el lock
+        # entre procesos, aplica el journal ajeno y valida la versión leída
+        # (compare-and-swap) antes de agregar su registro
+        self._write_lock = InterProcessLock(self.lock_file)
+        self._compaction: Optional[threading.Thread] = None
+
+        # Los archivos se abren de forma perezosa en el primer acceso; el
+        # constructor no toca disco para que el arranque de cada worker sea
+        # constante sin importar el volumen de datos
+        self.load_stats: Dict[str, Any] = {"loaded": False}
 
     def _initialize_sample_data(self):
         """Inicializar datos de ejemplo del Puerto de Chancay"""
@@ -141,24 +200,11 @@ class CSVDataAdapter(ContainerRepositoryPort, ShipTrackingPort, DataAnalyticsPor
     def _save_sample_data(self, containers_data: List[Dict], ships_data: List[Dict]):
         """Guardar datos de ejemplo en archivos CSV"""
         try:
-            # Guardar contenedores
-            import os
-
             os.makedirs(self.data_path, exist_ok=True)
-
-            with open(self.containers_file, "w", newline="", encoding="utf-8") as f:
-                if containers_data:
-                    writer = csv.DictWriter(f, fieldnames=containers_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(containers_data)
-
-            # Guardar barcos
-            with open(self.ships_file, "w", newline="", encoding="utf-8") as f:
-                if ships_data:
-                    writer = csv.DictWriter(f, fieldnames=ships_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(ships_data)
-
+            self._write_csv_atomically(
+                self.containers_file, self.CONTAINER_FIELDS, containers_data
+            )
+            self._write_csv_atomically(self.ships_file, self.SHIP_FIELDS, ships_data)
         except Exception as e:
             print(f"Error guardando datos de ejemplo: {e}")
 
@@ -166,135 +212,239 @@ class CSVDataAdapter(ContainerRepositoryPort, ShipTrackingPort, DataAnalyticsPor
 
     def get_all_containers(self) -> List[Container]:
         """Obtener todos los contenedores"""
-        containers = []
-        try:
-            with open(self.containers_file, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    container = self._dict_to_container(row)
-                    if container:
-                        containers.append(container)
-        except FileNotFoundError:
-            print(f"Archivo {self.containers_file} no encontrado")
-        except Exception as e:
-            print(f"Error leyendo contenedores: {e}")
+        return self._refresh_containers().all()
 
-        return containers
+    def iter_containers(
+        self, filter: Optional[Callable[[Container], bool]] = None
+    ) -> Iterator[Container]:
+        """Recorrer contenedores uno a uno sin materializar la lista"""
+        return self._refresh_containers().iter(filter)
 
     def get_container_by_id(self, container_id: str) -> Optional[Container]:
         """Obtener contenedor por ID"""
-        containers = self.get_all_containers()
-        for container in containers:
-            if container.container_id == container_id:
-                return container
-        return None
+        return self._refresh_containers().get(container_id)
 
     def get_containers_by_status(self, status: str) -> List[Container]:
         """Obtener contenedores por estado"""
-        containers = self.get_all_containers()
-        return [c for c in containers if c.status.value == status]
-
-    def update_container(self, container: Container) -> bool:
-        """Actualizar contenedor"""
-        containers = self.get_all_containers()
-        updated = False
-
-        for i, c in enumerate(containers):
-            if c.container_id == container.container_id:
-                containers[i] = container
-                updated = True
-                break
+        try:
+            container_status = ContainerStatus(status)
+        except ValueError:
+            return []
+        return self._refresh_containers().by_status(container_status)
+
+    def get_containers_by_ship(self, ship_name: str) -> List[Container]:
+        """Obtener contenedores de una embarcación"""
+        return self._refresh_containers().by_ship(ship_name)
+
+    def get_containers_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: str = "container_id",
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        cargo_type: Optional[str] = None,
+        ship_name: Optional[str] = None,
+    ) -> Tuple[List[Container], Optional[str]]:
+        """Obtener una página usando los índices del almacén residente"""
+        field, descending = parse_sort(sort)
+        after = decode_cursor(cursor, field)
+        page = self._refresh_containers().page(
+            limit + 1,
+            sort=field,
+            descending=descending,
+            after=after,
+            status=ContainerStatus(status) if status else None,
+            ship_name=ship_name,
+            priority=Prioridad(priority) if priority else None,
+            cargo_type=TipoCarga(cargo_type) if cargo_type else None,
+        )
+        if len(page) > limit:
+            return page[:limit], encode_cursor(page[limit - 1], field)
+        return page, None
 
-        if updated:
-            self._save_containers(containers)
+    def get_containers_arriving_between(
+        self, start: datetime, end: datetime
+    ) -> List[Container]:
+        """Obtener contenedores por ventana de ETA (búsqueda binaria)"""
+        return self._refresh_containers().arriving_between(start, end)
 
-        return updated
+    def update_container(self, container: Container) -> bool:
+        """Actualizar contenedor si su versión no cambió desde que se leyó"""
+        with self._write_lock:
+            store = self._refresh_containers()
+            current = store.version_of(container.container_id)
+            if current is None:
+                return False
+            if current != container.version:
+                raise VersionConflictError([container.container_id])
+
+            container.version += 1
+            store.upsert(container)
+            self._log_mutation("container", self._container_to_row(container))
+        return True
 
     def add_container(self, container: Container) -> bool:
         """Agregar nuevo contenedor"""
-        containers = self.get_all_containers()
-        containers.append(container)
-        self._save_containers(containers)
+        with self._write_lock:
+            store = self._refresh_containers()
+            current = store.version_of(container.container_id)
+            if current is not None:
+                container.version = current + 1
+            store.upsert(container)
+            self._log_mutation("container", self._container_to_row(container))
         return True
 
+    def update_containers_bulk(self, containers: List[Container]) -> int:
+        """Actualizar varios contenedores con un único append al journal"""
+        with self._write_lock:
+            store = self._refresh_containers()
+            existing = [c for c in containers if c.container_id in store]
+            conflicts = [
+                c.container_id
+                for c in existing
+                if store.version_of(c.container_id) != c.version
+            ]
+            if conflicts:
+                raise VersionConflictError(conflicts)
+
+            for container in existing:
+                container.version += 1
+                store.upsert(container)
+            self._log_mutations(
+                "container", [self._container_to_row(c) for c in existing]
+            )
+        return len(existing)
+
+    def add_containers_bulk(self, containers: List[Container]) -> int:
+        """Agregar varios contenedores con un único append al journal"""
+        with self._write_lock:
+            store = self._refresh_containers()
+            for container in containers:
+                current = store.version_of(container.container_id)
+                if current is not None:
+                    container.version = current + 1
+                store.upsert(container)
+            self._log_mutations(
+                "container", [self._container_to_row(c) for c in containers]
+            )
+        return len(containers)
+
+    def claim_cranes(self, containers: List[Container]) -> int:
+        """Actualizar contenedores en descarga si sus grúas siguen libres"""
+        with self._write_lock:
+            store = self._refresh_containers()
+            in_use = {
+                c.crane_assigned: c.container_id
+                for c in store.by_status(ContainerStatus.DESCARGANDO)
+                if c.crane_assigned
+            }
+            conflicts = [
+                c.container_id
+                for c in containers
+                if in_use.get(c.crane_assigned, c.container_id) != c.container_id
+            ]
+            if conflicts:
+                raise VersionConflictError(conflicts)
+            return self.update_containers_bulk(containers)
+
     # Implementación ShipTrackingPort
 
     def get_all_ships(self) -> List[Ship]:
         """Obtener todas las embarcaciones"""
-        ships = []
-        try:
-            with open(self.ships_file, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    ship = self._dict_to_ship(row)
-                    if ship:
-                        ships.append(ship)
-        except FileNotFoundError:
-            print(f"Archivo {self.ships_file} no encontrado")
-        except Exception as e:
-            print(f"Error leyendo barcos: {e}")
+        return [s.clone() for s in self._refresh_ships().values()]
 
-        return ships
+    def iter_ships(
+        self, filter: Optional[Callable[[Ship], bool]] = None
+    ) -> Iterator[Ship]:
+        """Recorrer embarcaciones una a una sin materializar la lista"""
+        for ship in tuple(self._refresh_ships().values()):
+            if filter is None or filter(ship):
+                yield ship.clone()
 
     def get_ship_by_id(self, ship_id: str) -> Optional[Ship]:
         """Obtener embarcación por ID"""
-        ships = self.get_all_ships()
-        for ship in ships:
-            if ship.ship_id == ship_id:
-                return ship
-        return None
+        ship = self._refresh_ships().get(ship_id)
+        return ship.clone() if ship else None
 
     def get_arriving_ships(self) -> List[Ship]:
         """Obtener embarcaciones que llegan"""
         ships = self.get_all_ships()
         return [s for s in ships if s.current_status in ["llegando", "atracado"]]
 
+    def get_ships_arriving_between(self, start: datetime, end: datetime) -> List[Ship]:
+        """Obtener embarcaciones por ventana de ETA (búsqueda binaria)"""
+        ships = self._refresh_ships()
+        return [ships[sid].clone() for sid in self._ship_etas.between(start, end)]
+
+    def add_ship(self, ship: Ship) -> bool:
+        """Agregar (o reemplazar) embarcación"""
+        with self._write_lock:
+            self._refresh_ships()
+            self._put_ship(ship)
+            self._log_mutation("ship", self._ship_to_row(ship))
+        return True
+
     def update_ship_status(self, ship_id: str, status: str) -> bool:
         """Actualizar estado de embarcación"""
-        ships = self.get_all_ships()
-        for ship in ships:
-            if ship.ship_id == ship_id:
-                ship.current_status = status
-                self._save_ships(ships)
-                return True
-        return False
+        with self._write_lock:
+            ships = self._refresh_ships()
+            ship = ships.get(ship_id)
+            if not ship:
+                return False
+
+            self._occupied_berths += (status == "atracado") - (
+                ship.current_status == "atracado"
+            )
+            ship.current_status = status
+            self._log_mutation("ship", self._ship_to_row(ship))
+        return True
+
+    def update_ship_eta(self, ship_id: str, eta: datetime) -> bool:
+        """Actualizar ETA de embarcación (mantiene el índice por ETA)"""
+        with self._write_lock:
+            ship = self._refresh_ships().get(ship_id)
+            if not ship:
+                return False
+
+            updated = ship.clone()
+            updated.eta_chancay = eta
+            self._put_ship(updated)
+            self._log_mutation("ship", self._ship_to_row(updated))
+        return True
 
     # Implementación DataAnalyticsPort
 
     def get_port_overview(self) -> Dict[str, Any]:
-        """Obtener resumen del puerto"""
-        containers = self.get_all_containers()
-        ships = self.get_all_ships()
-
-        status_breakdown = {}
-        total_weight = 0
-        active_cranes = 0
-
-        for container in containers:
-            status = container.status.value
-            status_breakdown[status] = status_breakdown.get(status, 0) + 1
-            total_weight += container.weight_kg
-            if container.crane_assigned:
-                active_cranes += 1
+        """Obtener resumen del puerto
+
+        Lee contadores mantenidos por delta en cada mutación: O(1); los
+        archivos se revisan a lo sumo cada ``refresh_interval`` segundos para
+        incorporar escrituras de otros workers.
+        """
+        self._refresh_if_stale()
+        store = self._containers
+
+        status_breakdown = {
+            status.value: count
+            for status, count in store.status_counts().items()
+            if count
+        }
 
         return {
-            "total_containers": len(containers),
-            "total_weight_kg": total_weight,
-            "ships_count": len(ships),
+            "total_containers": len(store),
+            "total_weight_kg": store.total_weight,
+            "ships_count": len(self._ships),
             "status_breakdown": status_breakdown,
-            "active_cranes": active_cranes,
-            "occupied_berths": len(
-                [s for s in ships if s.current_status == "atracado"]
-            ),
+            "active_cranes": store.active_cranes,
+            "occupied_berths": self._occupied_berths,
             "unloading_containers": status_breakdown.get("descargando", 0),
         }
 
     def get_performance_metrics(self) -> Dict[str, float]:
         """Obtener métricas de rendimiento"""
-        containers = self.get_all_containers()
-        completed = len(
-            [c for c in containers if c.status == ContainerStatus.COMPLETADO]
-        )
+        status_counts = self._refresh_containers().status_counts()
+        completed = status_counts[ContainerStatus.COMPLETADO]
 
         return {
             "containers_processed": completed,
@@ -305,16 +455,15 @@ class CSVDataAdapter(ContainerRepositoryPort, ShipTrackingPort, DataAnalyticsPor
 
     def get_cargo_statistics(self) -> Dict[str, Any]:
         """Obtener estadísticas de carga"""
-        containers = self.get_all_containers()
-        cargo_stats = {}
-
-        for container in containers:
-            cargo_type = container.cargo_type.value
-            cargo_stats[cargo_type] = cargo_stats.get(cargo_type, 0) + 1
+        counts, weights = self._refresh_containers().columns.cargo_totals()
 
         return {
-            "cargo_breakdown": cargo_stats,
-            "total_weight_by_type": {},  # Se calcularía según necesidades
+            "cargo_breakdown": {
+                cargo.value: count for cargo, count in counts.items() if count
+            },
+            "total_weight_by_type": {
+                cargo.value: weights[cargo] for cargo, count in counts.items() if count
+            },
             "peru_exports": ["cobre", "zinc", "harina_pescado", "palta"],
             "asia_imports": ["manufactura", "textiles", "quimicos"],
         }
@@ -340,9 +489,277 @@ class CSVDataAdapter(ContainerRepositoryPort, ShipTrackingPort, DataAnalyticsPor
             },
         }
 
+    # Implementación ChangeFeedPort
+
+    def get_changes_since(self, since: Optional[int]) -> ChangeSet:
+        """Obtener cambios posteriores a ``since`` desde el registro de secuencias"""
+        self._refresh()
+        changes = self._changes
+        if not changes.covers(since):
+            return ChangeSet(
+                seq=changes.last_seq,
+                containers=self._containers.all(),
+                ships=[s.clone() for s in self._ships.values()],
+                full=True,
+            )
+
+        changed = changes.changed_since(since)
+        containers = [self._containers.get(cid) for cid in changed.get("container", [])]
+        ships = [self._ships.get(sid) for sid in changed.get("ship", [])]
+        return ChangeSet(
+            seq=changes.last_seq,
+            containers=[c for c in containers if c],
+            ships=[s.clone() for s in ships if s],
+        )
+
+    def get_data_version(self) -> str:
+        """Versión de datos: secuencia de cambios más firma de los snapshots
+
+        La firma cubre ediciones externas de los CSV (que no pasan por el
+        journal); el refresco es el mismo acotado de ``get_port_overview``.
+        """
+        self._refresh_if_stale()
+        signature = zlib.crc32(repr(self._snapshot_signature).encode("utf-8"))
+        return f"{self._changes.last_seq}.{signature:08x}"
+
+    def get_change_seq(self) -> int:
+        """Secuencia de cambios actual (mismo refresco acotado que la versión)"""
+        self._refresh_if_stale()
+        return self._changes.last_seq
+
     # Métodos auxiliares
 
-    def _dict_to_container(self, data: Dict) -> Optional[Container]:
+    def _file_signature(self, path: str) -> Optional[Tuple[int, int]]:
+        """Firma (mtime, tamaño) del archivo para detectar cambios externos"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh_containers(self) -> ContainerStore:
+        """Obtener el almacén de contenedores actualizado"""
+        self._refresh()
+        return self._containers
+
+    def _refresh_ships(self) -> Dict[str, Ship]:
+        """Obtener el índice de embarcaciones actualizado"""
+        self._refresh()
+        return self._ships
+
+    def _refresh_if_stale(self) -> None:
+        """Refrescar solo si pasó ``refresh_interval`` desde la última revisión"""
+        if (
+            self._snapshot_signature is None
+            or time.monotonic() - self._last_refresh >= self.refresh_interval
+        ):
+            self._refresh()
+
+    def _refresh(self) -> None:
+        """Recargar snapshots si cambiaron y aplicar el journal pendiente"""
+        signature = (
+            self._file_signature(self.containers_file),
+            self._file_signature(self.ships_file),
+        )
+        journal_signature = self._file_signature(self.journal_file)
+        journal_size = journal_signature[1] if journal_signature else 0
+
+        if (
+            self._snapshot_signature is None
+            and signature == (None, None)
+            and journal_size == 0
+            and self.seed_if_empty
+        ):
+            # Solo un almacén explícitamente vacío (sin archivos) se siembra;
+            # bajo el lock y revisando de nuevo, para que siembre un solo worker
+            with self._write_lock:
+                if not (
+                    os.path.exists(self.containers_file)
+                    or os.path.exists(self.ships_file)
+                ):
+                    self._initialize_sample_data()
+            signature = (
+                self._file_signature(self.containers_file),
+                self._file_signature(self.ships_file),
+            )
+
+        if (
+            signature != self._snapshot_signature
+            or journal_size < self._journal_offset
+        ):
+            self._load_snapshot(signature)
+            self._snapshot_signature = signature
+            self._journal_offset = 0
+
+        if journal_size > self._journal_offset:
+            records, self._journal_offset = self._journal.replay(self._journal_offset)
+            for record in records:
+                self._apply_record(record)
+        self._last_refresh = time.monotonic()
+
+    def _load_snapshot(self, signature) -> None:
+        """Cargar el estado base desde el snapshot binario o desde los CSV
+
+        El snapshot binario se usa solo si corresponde a la firma actual de
+        los CSV; si está desactualizado se parsean los CSV y se regenera.
+        """
+        started = time.perf_counter()
+        snapshot = read_snapshot(self.snapshot_file, signature)
+        if snapshot is not None:
+            containers, ships = snapshot
+        else:
+            containers, ships = self._read_containers(), self._read_ships()
+
+        self._containers.load(containers)
+        self._ships = {}
+        self._ship_etas = EtaIndex()
+        self._occupied_berths = 0
+        self._changes.reset()
+        for ship in ships:
+            self._put_ship(ship)
+
+        if snapshot is None and not self.read_only:
+            self._write_binary_snapshot(signature)
+
+        self.load_stats = {
+            "loaded": True,
+            "source": "snapshot" if snapshot is not None else "csv",
+            "containers": len(self._containers),
+            "ships": len(self._ships),
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+
+    def _write_binary_snapshot(self, signature) -> None:
+        """Escribir el snapshot binario del estado residente"""
+        try:
+            write_snapshot(
+                self.snapshot_file, signature, self._containers, self._ships.values()
+            )
+        except Exception as e:
+            print(f"Error guardando snapshot binario: {e}")
+
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        """Aplicar una mutación del journal al almacén residente"""
+        kind = record.get("kind")
+        if kind == "checkpoint":
+            # Primer registro tras una compactación: secuencia del snapshot
+            self._changes.reset(record["seq"])
+        elif kind == "container":
+            container = self._dict_to_container(record["row"])
+            if container:
+                self._changes.note(kind, container.container_id, record.get("seq"))
+                # Un registro anterior al estado residente (p. ej. journal
+                # releído junto a un snapshot ya compactado) no lo retrocede
+                current = self._containers.version_of(container.container_id)
+                if current is None or container.version >= current:
+                    self._containers.upsert(container)
+        elif kind == "ship":
+            ship = self._dict_to_ship(record["row"])
+            if ship:
+                self._changes.note(kind, ship.ship_id, record.get("seq"))
+                self._put_ship(ship)
+
+    def _put_ship(self, ship: Ship) -> None:
+        """Insertar o reemplazar embarcación manteniendo muelles ocupados"""
+        previous = self._ships.get(ship.ship_id)
+        if previous is not None:
+            self._occupied_berths -= previous.current_status == "atracado"
+            self._ship_etas.remove(previous.eta_chancay, previous.ship_id)
+        self._ships[ship.ship_id] = ship
+        self._ship_etas.add(ship.eta_chancay, ship.ship_id)
+        self._occupied_berths += ship.current_status == "atracado"
+
+    def _log_mutation(self, kind: str, row: Dict[str, str]) -> None:
+        """Registrar mutación en el journal y compactar si corresponde"""
+        self._log_mutations(kind, [row])
+
+    def _log_mutations(self, kind: str, rows: List[Dict[str, str]]) -> None:
+        """Registrar un lote de mutaciones en el journal"""
+        if not rows:
+            return
+        key_field = "container_id" if kind == "container" else "ship_id"
+        first_seq = self._changes.last_seq + 1
+        start, end = self._journal.append_many(kind, rows, first_seq=first_seq)
+        for row in rows:
+            self._changes.note(kind, row[key_field])
+        if start == self._journal_offset:
+            self._journal_offset = end
+        if self._journal.records_since_compaction >= self.compact_every:
+            self._schedule_compaction()
+
+    def _schedule_compaction(self) -> None:
+        """Compactar en un hilo aparte: la escritura que cruza el umbral no
+        espera la reescritura de los CSV (se llama con el lock tomado, así
+        que no se lanzan dos compactaciones a la vez)"""
+        if self._compaction is None or not self._compaction.is_alive():
+            self._compaction = threading.Thread(
+                target=self._compact_in_background, daemon=True
+            )
+            self._compaction.start()
+
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Error compactando el journal: {e}")
+
+    def compact(self) -> None:
+        """Consolidar el journal en los snapshots CSV y vaciarlo"""
+        with self._write_lock:
+            self._refresh()
+            self._save_containers(list(self._containers))
+            self._save_ships(list(self._ships.values()))
+            self._journal_offset = self._journal.reset(
+                checkpoint_seq=self._changes.last_seq
+            )
+            self._changes.reset(self._changes.last_seq)
+            self._snapshot_signature = (
+                self._file_signature(self.containers_file),
+                self._file_signature(self.ships_file),
+            )
+            self._write_binary_snapshot(self._snapshot_signature)
+
+    def close(self) -> None:
+        """Compactar (si hay mutaciones pendientes) y cerrar el journal"""
+        if self._compaction is not None:
+            self._compaction.join()
+        if (
+            not self.read_only
+            and self._snapshot_signature is not None
+            and self._journal.records_since_compaction
+        ):
+            self.compact()
+        self._journal.close()
+        self._write_lock.close()
+
+    def _read_containers(self) -> Iterator[Container]:
+        """Leer contenedores del CSV fila a fila (streaming)"""
+        try:
+            with open(self.containers_file, "r", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    container = self._dict_to_container(row)
+                    if container:
+                        yield container
+        except FileNotFoundError:
+            print(f"Archivo {self.containers_file} no encontrado")
+        except Exception as e:
+            print(f"Error leyendo contenedores: {e}")
+
+    def _read_ships(self) -> Iterator[Ship]:
+        """Leer embarcaciones del CSV fila a fila (streaming)"""
+        try:
+            with open(self.ships_file, "r", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    ship = self._dict_to_ship(row)
+                    if ship:
+                        yield ship
+        except FileNotFoundError:
+            print(f"Archivo {self.ships_file} no encontrado")
+        except Exception as e:
+            print(f"Error leyendo barcos: {e}")
+
+    @staticmethod
+    def _dict_to_container(data: Dict) -> Optional[Container]:
         """Convertir diccionario a Container"""
         try:
             return Container(
@@ -357,16 +774,20 @@ class CSVDataAdapter(ContainerRepositoryPort, ShipTrackingPort, DataAnalyticsPor
                 priority=Prioridad(data["priority"]),
                 progress_percent=int(data["progress_percent"]),
                 crane_assigned=(
-                    data["crane_assigned"] if data["crane_assigned"] != "None" else None
+                    data["crane_assigned"]
+                    if data["crane_assigned"] not in ("", "None")
+                    else None
                 ),
                 temperature_controlled=data["temperature_controlled"].lower() == "true",
                 customs_cleared=data["customs_cleared"].lower() == "true",
+                version=int(data.get("version") or 0),
             )
         except Exception as e:
             print(f"Error convirtiendo contenedor: {e}")
             return None
 
-    def _dict_to_ship(self, data: Dict) -> Optional[Ship]:
+    @staticmethod
+    def _dict_to_ship(data: Dict) -> Optional[Ship]:
         """Convertir diccionario a Ship"""
         try:
             return Ship(
@@ -383,80 +804,98 @@ class CSVDataAdapter(ContainerRepositoryPort, ShipTrackingPort, DataAnalyticsPor
             print(f"Error convirtiendo barco: {e}")
             return None
 
+    CONTAINER_FIELDS = [
+        "container_id",
+        "ship_name",
+        "origin_port",
+        "destination_port",
+        "cargo_type",
+        "weight_kg",
+        "status",
+        "eta",
+        "priority",
+        "progress_percent",
+        "crane_assigned",
+        "temperature_controlled",
+        "customs_cleared",
+        "version",
+    ]
+
+    SHIP_FIELDS = [
+        "ship_id",
+        "name",
+        "captain",
+        "origin_port",
+        "containers_count",
+        "max_capacity",
+        "current_status",
+        "eta_chancay",
+    ]
+
+    def _container_to_row(self, container: Container) -> Dict[str, str]:
+        """Convertir Container a fila CSV/journal"""
+        return {
+            "container_id": container.container_id,
+            "ship_name": container.ship_name,
+            "origin_port": container.origin_port,
+            "destination_port": container.destination_port,
+            "cargo_type": container.cargo_type.value,
+            "weight_kg": str(container.weight_kg),
+            "status": container.status.value,
+            "eta": container.eta.isoformat(),
+            "priority": container.priority.value,
+            "progress_percent": str(container.progress_percent),
+            "crane_assigned": container.crane_assigned or "",
+            "temperature_controlled": str(container.temperature_controlled),
+            "customs_cleared": str(container.customs_cleared),
+            "version": str(container.version),
+        }
+
+    def _ship_to_row(self, ship: Ship) -> Dict[str, str]:
+        """Convertir Ship a fila CSV/journal"""
+        return {
+            "ship_id": ship.ship_id,
+            "name": ship.name,
+            "captain": ship.captain,
+            "origin_port": ship.origin_port,
+            "containers_count": str(ship.containers_count),
+            "max_capacity": str(ship.max_capacity),
+            "current_status": ship.current_status,
+            "eta_chancay": ship.eta_chancay.isoformat(),
+        }
+
     def _save_containers(self, containers: List[Container]):
         """Guardar contenedores en CSV"""
         try:
-            with open(self.containers_file, "w", newline="", encoding="utf-8") as f:
-                if containers:
-                    fieldnames = [
-                        "container_id",
-                        "ship_name",
-                        "origin_port",
-                        "destination_port",
-                        "cargo_type",
-                        "weight_kg",
-                        "status",
-                        "eta",
-                        "priority",
-                        "progress_percent",
-                        "crane_assigned",
-                        "temperature_controlled",
-                        "customs_cleared",
-                    ]
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-
-                    for container in containers:
-                        writer.writerow(
-                            {
-                                "container_id": container.container_id,
-                                "ship_name": container.ship_name,
-                                "origin_port": container.origin_port,
-                                "destination_port": container.destination_port,
-                                "cargo_type": container.cargo_type.value,
-                                "weight_kg": container.weight_kg,
-                                "status": container.status.value,
-                                "eta": container.eta.isoformat(),
-                                "priority": container.priority.value,
-                                "progress_percent": container.progress_percent,
-                                "crane_assigned": container.crane_assigned,
-                                "temperature_controlled": container.temperature_controlled,
-                                "customs_cleared": container.customs_cleared,
-                            }
-                        )
+            self._write_csv_atomically(
+                self.containers_file,
+                self.CONTAINER_FIELDS,
+                (self._container_to_row(c) for c in containers),
+            )
         except Exception as e:
             print(f"Error guardando contenedores: {e}")
 
     def _save_ships(self, ships: List[Ship]):
         """Guardar barcos en CSV"""
         try:
-            with open(self.ships_file, "w", newline="", encoding="utf-8") as f:
-                if ships:
-                    fieldnames = [
-                        "ship_id",
-                        "name",
-                        "captain",
-                        "origin_port",
-                        "containers_count",
-                        "max_capacity",
-                        "current_status",
-                        "eta_chancay",
-                    ]
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-
-                    for ship in ships:
-                        writer.writerow(
-                            {
-                                "ship_id": ship.ship_id,
-                                "name": ship.name,
-                                "captain": ship.captain,
-                                "origin_port": ship.origin_port,
-                                "containers_count": ship.containers_count,
-                                "max_capacity": ship.max_capacity,
-                                "current_status": ship.current_status,
-                                "eta_chancay": ship.eta_chancay.isoformat(),
-                            }
-                        )
+            self._write_csv_atomically(
+                self.ships_file,
+                self.SHIP_FIELDS,
+                (self._ship_to_row(s) for s in ships),
+            )
         except Exception as e:
             print(f"Error guardando barcos: {e}")
+
+    def _write_csv_atomically(self, path: str, fieldnames: List[str], rows) -> None:
+        """Escribir CSV en archivo temporal y reemplazar con os.replace
+
+        Una caída a mitad de escritura deja intacto el snapshot anterior.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,68 @@
+"""
+Adapter - Índice ordenado por ETA
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+class EtaIndex:
+    """Índice ordenado por (eta, id) para ventanas de llegada y paginación
+
+    Dos listas paralelas en el mismo orden: las claves completas (para
+    ubicar una entrada o un cursor) y las ETA (para los límites de una
+    ventana). Ambas búsquedas son binarias, O(log n).
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[datetime, str]] = []
+        self._etas: List[datetime] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def load(
+        self, entries: Iterable[Tuple[datetime, str]], presorted: bool = False
+    ) -> None:
+        """Reconstruir el índice completo con un solo ordenamiento"""
+        self._keys = list(entries) if presorted else sorted(entries)
+        self._etas = [eta for eta, _ in self._keys]
+
+    def add(self, eta: datetime, key: str) -> None:
+        """Insertar una entrada manteniendo el orden"""
+        position = bisect_left(self._keys, (eta, key))
+        self._keys.insert(position, (eta, key))
+        self._etas.insert(position, eta)
+
+    def remove(self, eta: datetime, key: str) -> None:
+        """Quitar una entrada (si existe)"""
+        position = bisect_left(self._keys, (eta, key))
+        if position < len(self._keys) and self._keys[position] == (eta, key):
+            del self._keys[position]
+            del self._etas[position]
+
+    def between(self, start: datetime, end: datetime) -> List[str]:
+        """IDs con ``start <= eta <= end`` ordenados por ETA"""
+        low = bisect_left(self._etas, start)
+        high = bisect_right(self._etas, end, lo=low)
+        return [key for _, key in self._keys[low:high]]
+
+    def iter_entries(self) -> Iterator[Tuple[datetime, str]]:
+        """Recorrer las claves (eta, id) en orden"""
+        return iter(self._keys)
+
+    def iter_after(
+        self, after: Optional[Tuple[datetime, str]] = None, descending: bool = False
+    ) -> Iterator[str]:
+        """Recorrer IDs en orden a partir de (excluyendo) la clave ``after``"""
+        keys = self._keys
+        if descending:
+            position = len(keys) if after is None else bisect_left(keys, after)
+            for index in range(position - 1, -1, -1):
+                yield keys[index][1]
+        else:
+            position = 0 if after is None else bisect_right(keys, after)
+            for index in range(position, len(keys)):
+                yield keys[index][1]
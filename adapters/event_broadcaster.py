@@ -0,0 +1,82 @@
+"""
+Adapter - Pub/sub en proceso para el canal push del dashboard
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import asyncio
+from typing import Any, Dict, Optional, Set
+from domain.ports import EventPublisherPort
+
+
+class InProcessEventBroadcaster(EventPublisherPort):
+    """Reparte mensajes a los suscriptores conectados a este proceso
+
+    Los servicios publican cambios (barato y síncrono): solo se marca el
+    tema como pendiente. Un único productor espera esas marcas, arma el
+    mensaje una vez y lo entrega a la cola de cada suscriptor. Las colas
+    son acotadas: un cliente lento pierde los mensajes intermedios y recibe
+    ``None`` (pedido de resincronización) en lugar de frenar a los demás.
+    """
+
+    def __init__(self, queue_size: int = 32):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._topics: Set[str] = set()
+        self._pending: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, topic: str, payload: Dict[str, Any]) -> None:
+        """Marcar un tema como modificado (seguro desde cualquier hilo)
+
+        El detalle del cambio lo obtiene el productor del feed de cambios,
+        así varias publicaciones seguidas se agrupan en un solo mensaje.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # Todavía no hay productor escuchando
+        loop.call_soon_threadsafe(self._mark, topic)
+
+    def _mark(self, topic: str) -> None:
+        self._topics.add(topic)
+        self._pending.set()
+
+    async def wait_for_changes(self, timeout: float) -> Set[str]:
+        """Esperar publicaciones hasta ``timeout`` segundos
+
+        Retorna los temas modificados desde la llamada anterior (vacío si
+        se agotó el tiempo).
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._pending = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._pending.wait(), timeout)
+        except asyncio.TimeoutError:
+            return set()
+        self._pending.clear()
+        topics, self._topics = self._topics, set()
+        return topics
+
+    def subscribe(self) -> asyncio.Queue:
+        """Registrar un suscriptor y retornar su cola de mensajes"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Dar de baja un suscriptor"""
+        self._subscribers.discard(queue)
+
+    def broadcast(self, message: Any) -> None:
+        """Entregar el mismo mensaje a todos los suscriptores"""
+        for queue in tuple(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
@@ -0,0 +1,374 @@
+"""
+Adapter - Caché de insights de IA direccionada por contenido
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from domain.ports import AIAnalyticsPort, AsyncAIAnalyticsPort, InsightNarrationPort
+from domain.entities import Container, PortOperation, AIInsight
+from .local_analytics import LOCAL_PREFIX
+
+
+def insight_to_record(insight: AIInsight) -> Dict[str, Any]:
+    """Serializar un insight para la caché en disco"""
+    return {
+        "insight_id": insight.insight_id,
+        "type": insight.type,
+        "title": insight.title,
+        "description": insight.description,
+        "confidence": insight.confidence,
+        "impact_level": insight.impact_level,
+        "generated_at": insight.generated_at.isoformat(),
+        "related_containers": list(insight.related_containers),
+    }
+
+
+def record_to_insight(record: Dict[str, Any]) -> AIInsight:
+    """Reconstruir un insight serializado"""
+    return AIInsight(
+        insight_id=record["insight_id"],
+        type=record["type"],
+        title=record["title"],
+        description=record["description"],
+        confidence=record["confidence"],
+        impact_level=record["impact_level"],
+        generated_at=datetime.fromisoformat(record["generated_at"]),
+        related_containers=list(record["related_containers"]),
+    )
+
+
+def content_key(analysis: str, inputs: Any) -> str:
+    """Hash canónico de las entradas del prompt (orden de claves estable)"""
+    canonical = json.dumps(
+        inputs, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(f"{analysis}:{canonical}".encode("utf-8")).hexdigest()
+
+
+class InsightCache:
+    """Caché LRU de insights con vencimiento por entrada y tope de memoria
+
+    El tamaño de cada entrada se estima por su serialización JSON; al
+    superar ``max_bytes`` se descartan las menos usadas recientemente.
+    Con ``path`` se carga al crear y se guarda con ``save``/``close``.
+    """
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._lock = threading.Lock()
+        # key -> (vence_en, registro, tamaño)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any], int]]" = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[AIInsight]:
+        """Insight vigente para ``key`` (None si no está o venció)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            record = entry[1]
+        return record_to_insight(record)
+
+    def put(self, key: str, insight: AIInsight, ttl: float) -> None:
+        """Guardar un insight por ``ttl`` segundos"""
+        record = insight_to_record(insight)
+        size = len(json.dumps(record, ensure_ascii=False)) + len(key)
+        with self._lock:
+            self._store(key, time.time() + ttl, record, size)
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas de uso de la caché"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entradas": len(self._entries),
+                "bytes": self._bytes,
+                "aciertos": self.hits,
+                "fallos": self.misses,
+                "tasa_aciertos": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def save(self) -> None:
+        """Guardar las entradas vigentes en disco (archivo temporal + os.replace)"""
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            entries = [
+                {"key": key, "expires_at": expires_at, "insight": record}
+                for key, (expires_at, record, _) in self._entries.items()
+                if expires_at > now
+            ]
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error guardando caché de insights: {e}")
+
+    def close(self) -> None:
+        self.save()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Caché de insights ilegible, se descarta: {e}")
+            return
+        now = time.time()
+        for entry in entries:
+            if entry["expires_at"] > now:
+                record = entry["insight"]
+                size = len(json.dumps(record, ensure_ascii=False)) + len(entry["key"])
+                self._store(entry["key"], entry["expires_at"], record, size)
+
+    def _store(
+        self, key: str, expires_at: float, record: Dict[str, Any], size: int
+    ) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (expires_at, record, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+CONGESTION_FIELDS = (
+    "total_containers",
+    "ships_count",
+    "active_cranes",
+    "occupied_berths",
+    "unloading_containers",
+)
+
+
+class InsightKeys:
+    """Claves por contenido a partir de las mismas entradas que usan los
+    prompts: mismas entradas, misma clave"""
+
+    def _congestion_key(self, current_data: Dict[str, Any]) -> str:
+        # Solo los campos del resumen que entran al prompt
+        inputs = {field: current_data.get(field, 0) for field in CONGESTION_FIELDS}
+        return content_key("congestion", inputs)
+
+    def _crane_allocation_key(self, containers: List[Container]) -> str:
+        waiting = sorted(
+            (
+                c.container_id,
+                c.cargo_type.value,
+                c.weight_kg,
+                c.priority.value,
+                c.status.value,
+            )
+            for c in containers
+        )
+        return content_key("crane_allocation", waiting)
+
+    def _cargo_patterns_key(self, containers: List[Container]) -> str:
+        cargo_summary: Dict[str, int] = {}
+        for container in containers:
+            cargo_type = container.cargo_type.value
+            cargo_summary[cargo_type] = cargo_summary.get(cargo_type, 0) + 1
+        return content_key("cargo_patterns", cargo_summary)
+
+    def _efficiency_key(self, operations: List[PortOperation]) -> str:
+        ops_data = [
+            (op.operation_type, op.get_duration_hours(), op.crane_id, op.is_completed())
+            for op in operations
+        ]
+        return content_key("efficiency", ops_data)
+
+    def _narration_key(self, insight: AIInsight) -> str:
+        inputs = [
+            insight.type,
+            insight.title,
+            insight.description,
+            insight.impact_level,
+            insight.confidence,
+        ]
+        return content_key("narration", inputs)
+
+
+class InsightCacheKeys(InsightKeys):
+    """Claves más la caché y los TTL por análisis"""
+
+    DEFAULT_TTLS = {
+        "congestion": 300,
+        "crane_allocation": 300,
+        "cargo_patterns": 1800,
+        "efficiency": 900,
+        "narration": 1800,
+    }
+
+    def __init__(self, cache: InsightCache, ttls: Optional[Dict[str, float]] = None):
+        self.cache = cache
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+
+    def _remember(self, analysis: str, key: str, insight: AIInsight) -> AIInsight:
+        # Los insights de respaldo (modo básico o motor local) no se guardan
+        if insight.type != "error" and not insight.insight_id.startswith(
+            LOCAL_PREFIX
+        ):
+            self.cache.put(key, insight, self.ttls[analysis])
+        return insight
+
+
+class CachedAIAnalyticsAdapter(InsightCacheKeys, AIAnalyticsPort):
+    """Decorador de ``AIAnalyticsPort``: un estado del puerto ya analizado
+    se responde desde la caché sin consultar al modelo"""
+
+    def __init__(
+        self,
+        inner: AIAnalyticsPort,
+        cache: InsightCache,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        super().__init__(cache, ttls)
+        self.inner = inner
+
+    def predict_port_congestion(self, current_data: Dict[str, Any]) -> AIInsight:
+        """Predecir congestión portuaria (con caché)"""
+        key = self._congestion_key(current_data)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        insight = self.inner.predict_port_congestion(current_data)
+        return self._remember("congestion", key, insight)
+
+    def recommend_crane_allocation(self, containers: List[Container]) -> AIInsight:
+        """Recomendar asignación de grúas (con caché)"""
+        key = self._crane_allocation_key(containers)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        insight = self.inner.recommend_crane_allocation(containers)
+        return self._remember("crane_allocation", key, insight)
+
+    def analyze_cargo_patterns(self, containers: List[Container]) -> AIInsight:
+        """Analizar patrones de carga Perú-Asia (con caché)"""
+        key = self._cargo_patterns_key(containers)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        insight = self.inner.analyze_cargo_patterns(containers)
+        return self._remember("cargo_patterns", key, insight)
+
+    def generate_efficiency_insights(
+        self, operations: List[PortOperation]
+    ) -> AIInsight:
+        """Generar insights de eficiencia (con caché)"""
+        key = self._efficiency_key(operations)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        insight = self.inner.generate_efficiency_insights(operations)
+        return self._remember("efficiency", key, insight)
+
+    def predict_delays(self, ship, weather_data: Dict) -> AIInsight:
+        """Predecir demoras potenciales"""
+        return self.inner.predict_delays(ship, weather_data)
+
+
+class AsyncCachedAIAnalyticsAdapter(
+    InsightCacheKeys, AsyncAIAnalyticsPort, InsightNarrationPort
+):
+    """Decorador de ``AsyncAIAnalyticsPort`` con la misma caché y claves que
+    la versión síncrona (ambas comparten resultados)"""
+
+    def __init__(
+        self,
+        inner: AsyncAIAnalyticsPort,
+        cache: InsightCache,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        super().__init__(cache, ttls)
+        self.inner = inner
+
+    async def predict_port_congestion(self, current_data: Dict[str, Any]) -> AIInsight:
+        """Predecir congestión portuaria (con caché)"""
+        key = self._congestion_key(current_data)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        insight = await self.inner.predict_port_congestion(current_data)
+        return self._remember("congestion", key, insight)
+
+    async def recommend_crane_allocation(
+        self, containers: List[Container]
+    ) -> AIInsight:
+        """Recomendar asignación de grúas (con caché)"""
+        key = self._crane_allocation_key(containers)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        insight = await self.inner.recommend_crane_allocation(containers)
+        return self._remember("crane_allocation", key, insight)
+
+    async def analyze_cargo_patterns(self, containers: List[Container]) -> AIInsight:
+        """Analizar patrones de carga Perú-Asia (con caché)"""
+        key = self._cargo_patterns_key(containers)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        insight = await self.inner.analyze_cargo_patterns(containers)
+        return self._remember("cargo_patterns", key, insight)
+
+    async def generate_efficiency_insights(
+        self, operations: List[PortOperation]
+    ) -> AIInsight:
+        """Generar insights de eficiencia (con caché)"""
+        key = self._efficiency_key(operations)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        insight = await self.inner.generate_efficiency_insights(operations)
+        return self._remember("efficiency", key, insight)
+
+    async def predict_delays(self, ship, weather_data: Dict) -> AIInsight:
+        """Predecir demoras potenciales"""
+        return await self.inner.predict_delays(ship, weather_data)
+
+    async def narrate_insight(self, insight: AIInsight) -> Optional[AIInsight]:
+        """Redactar un insight local (con caché)"""
+        key = self._narration_key(insight)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        narrated = await self.inner.narrate_insight(insight)
+        if narrated is not None:  # Sin redacción (error) no se guarda
+            self.cache.put(key, narrated, self.ttls["narration"])
+        return narrated
+
+    async def aclose(self) -> None:
+        """Cerrar el adaptador interno"""
+        await self.inner.aclose()
@@ -0,0 +1,115 @@
+"""
+Adapter - Planificador de precálculo de insights de IA
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from domain.entities import AIInsight
+from domain.ports import ChangeFeedPort, InsightStorePort
+from domain.services import AIAnalyticsService
+
+
+class InsightScheduler:
+    """Genera los insights de IA fuera del camino de las peticiones
+
+    Regenera cada ``interval`` segundos, o antes si desde la última
+    generación la secuencia de cambios avanzó más de ``change_threshold``
+    (se revisa cada ``check_interval`` segundos, sin tocar la IA). El
+    resultado queda en el ``InsightStorePort`` que lee la API.
+    """
+
+    def __init__(
+        self,
+        ai_service: AIAnalyticsService,
+        store: InsightStorePort,
+        change_feed: ChangeFeedPort,
+        interval: float = 300.0,
+        change_threshold: int = 50,
+        check_interval: float = 5.0,
+    ):
+        self.ai_service = ai_service
+        self.store = store
+        self.change_feed = change_feed
+        self.interval = interval
+        self.change_threshold = change_threshold
+        self.check_interval = check_interval
+        self._task: Optional[asyncio.Task] = None
+        self._generation: Optional[asyncio.Task] = None
+        self._last_run: Optional[float] = None
+        self._last_seq: Optional[int] = None
+        self.runs = 0
+        self.last_duration: Optional[float] = None
+
+    def start(self) -> None:
+        """Lanzar el ciclo de fondo (requiere un event loop activo)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Detener el ciclo de fondo y la generación en curso"""
+        for task in (self._task, self._generation):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+
+    async def refresh(self) -> List[AIInsight]:
+        """Regenerar ahora; las llamadas simultáneas esperan la misma generación"""
+        if self._generation is None or self._generation.done():
+            self._generation = asyncio.create_task(self._generate())
+        return await asyncio.shield(self._generation)
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado del planificador para /api/status"""
+        updated_at = self.store.get_updated_at()
+        return {
+            "generaciones": self.runs,
+            "ultima_actualizacion": (
+                updated_at.strftime("%Y-%m-%d %H:%M:%S") if updated_at else None
+            ),
+            "duracion_ultima_s": (
+                round(self.last_duration, 3) if self.last_duration is not None else None
+            ),
+            "intervalo_s": self.interval,
+            "umbral_cambios": self.change_threshold,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self._is_due():
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error precalculando insights de IA: {e}")
+            await asyncio.sleep(self.check_interval)
+
+    def _is_due(self) -> bool:
+        """Si toca regenerar por tiempo o por volumen de cambios"""
+        if self._last_run is None:
+            return True
+        if time.monotonic() - self._last_run >= self.interval:
+            return True
+        changes = self.change_feed.get_change_seq() - self._last_seq
+        # Una secuencia menor (base de datos reemplazada) también cuenta
+        return changes > self.change_threshold or changes < 0
+
+    async def _generate(self) -> List[AIInsight]:
+        seq = self.change_feed.get_change_seq()
+        started = time.perf_counter()
+        try:
+            insights = await self.ai_service.generate_daily_insights_async()
+        finally:
+            # También ante error: el próximo intento espera el intervalo
+            self._last_run = time.monotonic()
+            self._last_seq = seq
+        self.store.save_insights(insights)
+        self.runs += 1
+        self.last_duration = time.perf_counter() - started
+        return insights
@@ -0,0 +1,38 @@
+"""
+Adapter - Almacén en memoria de insights precalculados
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import threading
+from datetime import datetime
+from typing import List, Optional
+from domain.ports import InsightStorePort
+from domain.entities import AIInsight
+
+
+class InMemoryInsightStore(InsightStorePort):
+    """Última tanda de insights generada por el planificador
+
+    Se reemplaza la lista completa en cada actualización, así una lectura
+    nunca ve una mezcla de dos generaciones.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._insights: List[AIInsight] = []
+        self._updated_at: Optional[datetime] = None
+
+    def save_insights(self, insights: List[AIInsight]) -> None:
+        """Reemplazar los insights vigentes"""
+        with self._lock:
+            self._insights = list(insights)
+            self._updated_at = datetime.now()
+
+    def get_latest_insights(self) -> List[AIInsight]:
+        """Obtener los insights vigentes (vacío si aún no se generaron)"""
+        with self._lock:
+            return list(self._insights)
+
+    def get_updated_at(self) -> Optional[datetime]:
+        """Momento de la última actualización"""
+        return self._updated_at
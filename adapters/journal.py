@@ -0,0 +1,151 @@
+"""
+Adapter - Journal de mutaciones (write-ahead log)
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class MutationJournal:
+    """Journal append-only de mutaciones de contenedores y barcos
+
+    Cada mutación es una línea JSON con la fila completa de la entidad y su
+    número de secuencia de cambio, por lo que reaplicar el journal sobre el
+    snapshot CSV es idempotente.
+    Los fsync se agrupan (group commit): se sincroniza cada ``sync_every``
+    registros y, si quedan pendientes, un timer lo hace a más tardar
+    ``sync_interval`` segundos después, aunque no lleguen más escrituras.
+    """
+
+    def __init__(self, path: str, sync_every: int = 64, sync_interval: float = 0.05):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending_sync = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer: Optional[threading.Timer] = None
+        self.records_since_compaction = 0
+
+    def append(
+        self, kind: str, row: Dict[str, Any], seq: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Agregar una mutación al final del journal
+
+        Retorna los offsets (inicio, fin) del registro escrito.
+        """
+        return self.append_many(kind, [row], first_seq=seq)
+
+    def append_many(
+        self, kind: str, rows: List[Dict[str, Any]], first_seq: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Agregar un lote de mutaciones con una sola escritura
+
+        Con ``first_seq`` cada registro lleva su secuencia (consecutivas).
+        """
+        records = (
+            {"kind": kind, "row": row}
+            if first_seq is None
+            else {"kind": kind, "seq": first_seq + index, "row": row}
+            for index, row in enumerate(rows)
+        )
+        data = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ).encode("utf-8")
+        with self._lock:
+            f = self._open()
+            start = f.seek(0, os.SEEK_END)
+            f.write(data)
+            f.flush()
+            self._pending_sync += len(rows)
+            self.records_since_compaction += len(rows)
+            if (
+                self._pending_sync >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval
+            ):
+                self._sync_locked()
+            elif self._sync_timer is None:
+                self._sync_timer = threading.Timer(self.sync_interval, self.sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+            return start, start + len(data)
+
+    def replay(self, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Leer mutaciones desde ``offset``
+
+        Retorna los registros y el offset hasta donde se leyó. Una última
+        línea incompleta (caída a mitad de escritura) se ignora.
+        """
+        records = []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(raw)
+                        records.append(record)
+                        if record.get("kind") != "checkpoint":
+                            self.records_since_compaction += 1
+                    except ValueError as e:
+                        print(f"Registro de journal inválido ignorado: {e}")
+                    offset += len(raw)
+        except FileNotFoundError:
+            pass
+        return records, offset
+
+    def sync(self) -> None:
+        """Forzar fsync de las mutaciones pendientes"""
+        with self._lock:
+            self._sync_locked()
+
+    def reset(self, checkpoint_seq: Optional[int] = None) -> int:
+        """Vaciar el journal (tras compactar en el snapshot)
+
+        Con ``checkpoint_seq`` el journal nuevo empieza con un registro
+        ``checkpoint`` que conserva la secuencia de cambios del snapshot.
+        Retorna el tamaño del journal resultante.
+        """
+        data = b""
+        if checkpoint_seq is not None:
+            record = {"kind": "checkpoint", "seq": checkpoint_seq}
+            data = (json.dumps(record) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            with open(self.path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._sync_locked()
+            self.records_since_compaction = 0
+        return len(data)
+
+    def close(self) -> None:
+        """Sincronizar y cerrar el archivo"""
+        with self._lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def _sync_locked(self) -> None:
+        if self._file is not None and self._pending_sync:
+            os.fsync(self._file.fileno())
+        self._pending_sync = 0
+        self._last_sync = time.monotonic()
+        if self._sync_timer is not None:
+            self._sync_timer.cancel()
+            self._sync_timer = None
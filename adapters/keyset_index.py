@@ -0,0 +1,68 @@
+"""
+Adapter - Índice ordenado para paginación por clave
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from .eta_index import EtaIndex
+
+
+class KeysetIndex:
+    """IDs de un grupo de contenedores en los dos órdenes de paginación
+
+    Una lista ordenada de IDs y un ``EtaIndex`` por (eta, id). Ubicar el
+    cursor es una búsqueda binaria y una página recorre solo sus ``limit``
+    entradas: O(log n + limit) sin importar la profundidad.
+    """
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._by_eta = EtaIndex()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def load(self, entries: List[Tuple[datetime, str]], ids: List[str]) -> None:
+        """Reconstruir desde pares (eta, id) ya ordenados y los mismos IDs
+        ordenados (sin volver a ordenar)"""
+        self._by_eta.load(entries, presorted=True)
+        self._ids = ids
+
+    def add(self, eta: datetime, container_id: str) -> None:
+        """Insertar un contenedor manteniendo ambos órdenes"""
+        insort(self._ids, container_id)
+        self._by_eta.add(eta, container_id)
+
+    def remove(self, eta: datetime, container_id: str) -> None:
+        """Quitar un contenedor (si está)"""
+        position = bisect_left(self._ids, container_id)
+        if position < len(self._ids) and self._ids[position] == container_id:
+            del self._ids[position]
+        self._by_eta.remove(eta, container_id)
+
+    def iter_entries(self) -> Iterator[Tuple[datetime, str]]:
+        """Pares (eta, id) en orden de ETA"""
+        return self._by_eta.iter_entries()
+
+    def between(self, start: datetime, end: datetime) -> List[str]:
+        """IDs con ``start <= eta <= end`` ordenados por ETA"""
+        return self._by_eta.between(start, end)
+
+    def iter_after(
+        self, sort: str, descending: bool, after: Optional[tuple]
+    ) -> Iterator[str]:
+        """IDs en el orden pedido a partir de (excluyendo) la clave ``after``"""
+        if sort == "eta":
+            yield from self._by_eta.iter_after(after, descending)
+            return
+        ids = self._ids
+        if descending:
+            position = len(ids) if after is None else bisect_left(ids, after[0])
+            for index in range(position - 1, -1, -1):
+                yield ids[index]
+        else:
+            position = 0 if after is None else bisect_right(ids, after[0])
+            for index in range(position, len(ids)):
+                yield ids[index]
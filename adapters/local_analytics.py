@@ -0,0 +1,337 @@
+"""
+Adapter - Motor analítico local determinista (sin red)
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import heapq
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from domain.ports import AIAnalyticsPort, AsyncAIAnalyticsPort
+from domain.crane_scheduling import PRIORITY_RANK
+from domain.entities import (
+    Container,
+    PortOperation,
+    AIInsight,
+    Prioridad,
+    TipoCarga,
+)
+
+
+# Prefijo de los insights locales (la caché de IA no los guarda como respuesta
+# del modelo cuando actúan de respaldo)
+LOCAL_PREFIX = "local_"
+
+# Minutos de grúa por contenedor según tipo de carga (más el peso)
+HANDLING_MINUTES = {
+    TipoCarga.MINERALES: 4.0,
+    TipoCarga.QUIMICOS: 3.5,
+    TipoCarga.AGRICOLA: 3.0,
+    TipoCarga.MANUFACTURA: 2.5,
+    TipoCarga.TEXTILES: 2.0,
+    TipoCarga.GENERAL: 2.0,
+}
+MINUTES_PER_TONNE = 0.05
+
+EXPORT_GROUPS = {
+    "minería": (TipoCarga.MINERALES,),
+    "agroexportación": (TipoCarga.AGRICOLA,),
+    "industria": (TipoCarga.MANUFACTURA, TipoCarga.TEXTILES, TipoCarga.QUIMICOS),
+}
+
+
+def handling_minutes(container: Container) -> float:
+    """Tiempo estimado de grúa para un contenedor"""
+    base = HANDLING_MINUTES.get(container.cargo_type, 2.0)
+    return base + container.weight_kg / 1000 * MINUTES_PER_TONNE
+
+
+def local_insight_id(kind: str, stamp: str = "%Y%m%d_%H%M") -> str:
+    """ID de insight local con el mismo formato que los del modelo"""
+    return f"{LOCAL_PREFIX}{kind}_{datetime.now().strftime(stamp)}"
+
+
+def level(score: float, medium: float = 0.4, high: float = 0.7) -> str:
+    """Clasificar un puntaje 0-1 en bajo/medio/alto"""
+    if score >= high:
+        return "alto"
+    return "medio" if score >= medium else "bajo"
+
+
+class LocalAnalyticsAdapter(AIAnalyticsPort):
+    """Implementación de ``AIAnalyticsPort`` con modelos numéricos locales
+
+    Mismos análisis que el adaptador de OpenAI, calculados en microsegundos
+    sobre los datos del repositorio y siempre con el mismo resultado para
+    las mismas entradas. Sirve como modo rápido, como primer nivel que el
+    LLM solo redacta a pedido, y como respaldo cuando el modelo falla.
+    """
+
+    def __init__(
+        self,
+        cranes: int = 12,
+        berths: int = 4,
+        crane_moves_per_hour: float = 25.0,
+        horizon_hours: float = 12.0,
+    ):
+        self.cranes = cranes
+        self.berths = berths
+        self.crane_moves_per_hour = crane_moves_per_hour
+        self.horizon_hours = horizon_hours
+
+    def predict_port_congestion(self, current_data: Dict[str, Any]) -> AIInsight:
+        """Riesgo de congestión: ocupación de muelles y grúas más la cola
+        pendiente frente a la capacidad de las grúas en el horizonte"""
+        breakdown = current_data.get("status_breakdown", {})
+        pending = breakdown.get("llegando", 0) + breakdown.get("atracado", 0)
+        berth_load = min(1.0, current_data.get("occupied_berths", 0) / self.berths)
+        crane_load = min(1.0, current_data.get("active_cranes", 0) / self.cranes)
+        capacity = self.cranes * self.crane_moves_per_hour * self.horizon_hours
+        queue_pressure = min(1.0, pending / capacity) if capacity else 1.0
+
+        risk = 0.4 * berth_load + 0.35 * crane_load + 0.25 * queue_pressure
+        risk_level = level(risk)
+        prediction = {"bajo": "baja", "medio": "media", "alto": "alta"}[risk_level]
+
+        recommendations = []
+        if crane_load >= 0.8:
+            recommendations.append("reforzar turnos de grúa")
+        if berth_load >= 0.75:
+            recommendations.append("escalonar atraques de los próximos arribos")
+        if queue_pressure >= 0.5:
+            recommendations.append("priorizar carga crítica y perecible")
+        if not recommendations:
+            recommendations.append("mantener la operación actual")
+
+        return AIInsight(
+            insight_id=local_insight_id("congestion"),
+            type="prediccion",
+            title=f"Predicción de Congestión: {prediction} congestión",
+            description=(
+                f"Riesgo {risk:.0%} en las próximas {self.horizon_hours:.0f} horas: "
+                f"muelles {berth_load:.0%}, grúas {crane_load:.0%}, cola "
+                f"{pending} contenedores ({queue_pressure:.0%} de la capacidad). "
+                f"Recomendaciones: {', '.join(recommendations)}"
+            ),
+            confidence=0.8,
+            impact_level=risk_level,
+            generated_at=datetime.now(),
+            related_containers=[],
+        )
+
+    def recommend_crane_allocation(self, containers: List[Container]) -> AIInsight:
+        """Orden por prioridad, ETA y tiempo de grúa; reparto al menos cargado"""
+        if not containers:
+            return self._empty_insight(
+                "crane_alloc", "recomendacion", "Optimización de Grúas"
+            )
+
+        ordered = sorted(
+            containers,
+            key=lambda c: (PRIORITY_RANK[c.priority], c.eta, -handling_minutes(c)),
+        )
+        assignments, loads = self._assign_to_cranes(ordered)
+        busiest = max(loads)
+        balance = sum(loads) / (len(loads) * busiest) if busiest else 1.0
+        critical = sum(1 for c in containers if c.priority == Prioridad.CRITICA)
+        plan = ", ".join(
+            f"{c.container_id}→{assignments[c.container_id]}" for c in ordered[:5]
+        )
+
+        return AIInsight(
+            insight_id=local_insight_id("crane_alloc"),
+            type="recomendacion",
+            title=f"Optimización de Grúas (Eficiencia: {balance:.0%})",
+            description=(
+                f"{len(containers)} contenedores en {len(loads)} grúas, "
+                f"{critical} críticos primero; la grúa más cargada termina en "
+                f"{busiest:.0f} min. Orden y grúa sugeridos: {plan}"
+            ),
+            confidence=balance,
+            impact_level="medio" if balance > 0.7 else "bajo",
+            generated_at=datetime.now(),
+            related_containers=[c.container_id for c in ordered[:3]],
+        )
+
+    def analyze_cargo_patterns(self, containers: List[Container]) -> AIInsight:
+        """Mezcla de carga, concentración y tendencia por ETA de cada tipo"""
+        if not containers:
+            return self._empty_insight(
+                "cargo_patterns", "analisis", "Análisis Patrones Comercio Perú-Asia"
+            )
+
+        total = len(containers)
+        counts: Dict[TipoCarga, int] = {}
+        for container in containers:
+            counts[container.cargo_type] = counts.get(container.cargo_type, 0) + 1
+        shares = {cargo: count / total for cargo, count in counts.items()}
+        concentration = sum(share * share for share in shares.values())  # HHI
+
+        # Tendencia: participación en la mitad más reciente de ETA vs la anterior
+        by_eta = sorted(containers, key=lambda c: c.eta)
+        half = total // 2
+        trends = []
+        if half:
+            early = self._shares(by_eta[:half])
+            late = self._shares(by_eta[half:])
+            for cargo in counts:
+                change = late.get(cargo, 0.0) - early.get(cargo, 0.0)
+                if abs(change) >= 0.1:
+                    direction = "en alza" if change > 0 else "a la baja"
+                    trends.append(f"{cargo.value} {direction} ({change:+.0%})")
+
+        groups = {
+            name: sum(shares.get(cargo, 0.0) for cargo in members)
+            for name, members in EXPORT_GROUPS.items()
+        }
+        mix = ", ".join(
+            f"{cargo.value} {share:.0%}"
+            for cargo, share in sorted(shares.items(), key=lambda item: -item[1])
+        )
+
+        return AIInsight(
+            insight_id=local_insight_id("cargo_patterns", "%Y%m%d"),
+            type="analisis",
+            title="Análisis Patrones Comercio Perú-Asia",
+            description=(
+                f"Mezcla: {mix}. "
+                f"Minería {groups['minería']:.0%}, "
+                f"agroexportación {groups['agroexportación']:.0%}, "
+                f"industria {groups['industria']:.0%}. "
+                f"Tendencias: {', '.join(trends) if trends else 'mezcla estable'}"
+            ),
+            confidence=round(concentration, 3),
+            impact_level="alto" if concentration > 0.5 else "medio",
+            generated_at=datetime.now(),
+            related_containers=[],
+        )
+
+    def generate_efficiency_insights(
+        self, operations: List[PortOperation]
+    ) -> AIInsight:
+        """Puntaje de eficiencia: operaciones completadas y desvío contra el
+        tiempo estimado"""
+        if not operations:
+            return self._empty_insight(
+                "efficiency", "recomendacion", "Eficiencia Operativa"
+            )
+
+        completed = [op for op in operations if op.is_completed()]
+        completion = len(completed) / len(operations)
+        overruns = []
+        for op in completed:
+            planned = (op.estimated_end_time - op.start_time).total_seconds()
+            actual = (op.actual_end_time - op.start_time).total_seconds()
+            if planned > 0:
+                overruns.append(actual / planned)
+        punctuality = (
+            min(1.0, len(overruns) / sum(max(1.0, r) for r in overruns))
+            if overruns
+            else 1.0
+        )
+        score = completion * punctuality
+        late = sum(1 for r in overruns if r > 1.1)
+
+        return AIInsight(
+            insight_id=local_insight_id("efficiency", "%Y%m%d"),
+            type="recomendacion",
+            title=f"Eficiencia Operativa ({score:.0%})",
+            description=(
+                f"{len(completed)}/{len(operations)} operaciones completadas, "
+                f"{late} con más de 10% de demora sobre lo estimado."
+            ),
+            confidence=round(score, 3),
+            impact_level=level(1 - score),
+            generated_at=datetime.now(),
+            related_containers=[op.container_id for op in operations][:3],
+        )
+
+    def predict_delays(self, ship, weather_data: Dict) -> AIInsight:
+        """Demora estimada por viento y oleaje sobre la ETA del barco"""
+        wind = float(weather_data.get("wind_knots", 0))
+        waves = float(weather_data.get("wave_height_m", 0))
+        delay_hours = max(0.0, wind - 25) * 0.5 + max(0.0, waves - 2.5) * 2
+        name = getattr(ship, "name", "barco")
+
+        outlook = "Reprogramar atraque." if delay_hours else "Sin impacto esperado."
+
+        return AIInsight(
+            insight_id=local_insight_id("delays"),
+            type="prediccion",
+            title=f"Demora estimada {name}: {delay_hours:.1f} h",
+            description=(
+                f"Viento {wind:.0f} nudos, oleaje {waves:.1f} m. {outlook}"
+            ),
+            confidence=0.7,
+            impact_level=level(min(1.0, delay_hours / 12)),
+            generated_at=datetime.now(),
+            related_containers=[],
+        )
+
+    def _assign_to_cranes(
+        self, ordered: List[Container]
+    ) -> Tuple[Dict[str, str], List[float]]:
+        """Repartir en orden a la grúa que se libera primero"""
+        heap = [(0.0, index) for index in range(self.cranes)]
+        loads = [0.0] * self.cranes
+        assignments = {}
+        for container in ordered:
+            load, index = heapq.heappop(heap)
+            load += handling_minutes(container)
+            loads[index] = load
+            assignments[container.container_id] = f"Grua-{index + 1:02d}"
+            heapq.heappush(heap, (load, index))
+        return assignments, [load for load in loads if load] or [0.0]
+
+    @staticmethod
+    def _shares(containers: List[Container]) -> Dict[TipoCarga, float]:
+        counts: Dict[TipoCarga, int] = {}
+        for container in containers:
+            counts[container.cargo_type] = counts.get(container.cargo_type, 0) + 1
+        return {cargo: count / len(containers) for cargo, count in counts.items()}
+
+    @staticmethod
+    def _empty_insight(kind: str, insight_type: str, title: str) -> AIInsight:
+        return AIInsight(
+            insight_id=local_insight_id(kind),
+            type=insight_type,
+            title=title,
+            description="Sin datos para analizar en este momento.",
+            confidence=0.5,
+            impact_level="bajo",
+            generated_at=datetime.now(),
+            related_containers=[],
+        )
+
+
+class AsyncLocalAnalyticsAdapter(AsyncAIAnalyticsPort):
+    """Versión asíncrona del motor local (el cálculo es inmediato)"""
+
+    def __init__(self, engine: LocalAnalyticsAdapter):
+        self.engine = engine
+
+    async def predict_port_congestion(self, current_data: Dict[str, Any]) -> AIInsight:
+        """Predecir congestión portuaria"""
+        return self.engine.predict_port_congestion(current_data)
+
+    async def recommend_crane_allocation(
+        self, containers: List[Container]
+    ) -> AIInsight:
+        """Recomendar asignación de grúas"""
+        return self.engine.recommend_crane_allocation(containers)
+
+    async def analyze_cargo_patterns(self, containers: List[Container]) -> AIInsight:
+        """Analizar patrones de carga Perú-Asia"""
+        return self.engine.analyze_cargo_patterns(containers)
+
+    async def generate_efficiency_insights(
+        self, operations: List[PortOperation]
+    ) -> AIInsight:
+        """Generar insights de eficiencia"""
+        return self.engine.generate_efficiency_insights(operations)
+
+    async def predict_delays(self, ship, weather_data: Dict) -> AIInsight:
+        """Predecir demoras potenciales"""
+        return self.engine.predict_delays(ship, weather_data)
+
+    async def aclose(self) -> None:
+        pass
@@ -0,0 +1,142 @@
+"""
+Adapter - Ingesta vectorizada de manifiestos (pandas)
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+import pandas as pd
+from domain.ports import ContainerRepositoryPort
+from domain.entities import Container, ContainerStatus, TipoCarga, Prioridad
+
+
+REQUIRED_COLUMNS = [
+    "container_id",
+    "ship_name",
+    "origin_port",
+    "destination_port",
+    "cargo_type",
+    "weight_kg",
+    "status",
+    "eta",
+    "priority",
+]
+OPTIONAL_COLUMNS = {
+    "progress_percent": "0",
+    "crane_assigned": "",
+    "temperature_controlled": "False",
+    "customs_cleared": "False",
+}
+ENUM_COLUMNS = {
+    "cargo_type": TipoCarga,
+    "status": ContainerStatus,
+    "priority": Prioridad,
+}
+
+
+@dataclass
+class ManifestLoadResult:
+    """Resultado de leer un manifiesto: contenedores válidos y filas rechazadas"""
+
+    containers: List[Container]
+    rejected: List[Dict[str, Any]] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "accepted": len(self.containers),
+            "rejected": len(self.rejected),
+            "errors": self.rejected,
+        }
+
+
+class PandasManifestLoader:
+    """Carga manifiestos CSV con columnas tipadas y validación vectorizada
+
+    Aplica las mismas reglas que ``Container.__post_init__`` (peso positivo,
+    progreso entre 0 y 100) más la validez de enums, fechas e IDs sobre
+    columnas completas, y reporta todas las filas inválidas en una pasada.
+    Los contenedores válidos se construyen directamente desde las columnas
+    (sin diccionarios intermedios) con ``Container.from_trusted``.
+    """
+
+    def load(self, source) -> ManifestLoadResult:
+        """Leer y validar un manifiesto (ruta o buffer)"""
+        df = pd.read_csv(source, dtype="string", keep_default_na=False)
+        missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"Columnas faltantes en manifiesto: {missing}")
+        for column, default in OPTIONAL_COLUMNS.items():
+            if column not in df.columns:
+                df[column] = default
+
+        weight = pd.to_numeric(df["weight_kg"], errors="coerce")
+        progress = pd.to_numeric(df["progress_percent"], errors="coerce")
+        # Las ETAs del dominio son horas locales sin zona: con utc=True las
+        # naive se leen tal cual y las que traen zona se detectan y rechazan
+        eta = pd.to_datetime(
+            df["eta"], errors="coerce", format="ISO8601", utc=True
+        ).dt.tz_localize(None)
+        eta_with_zone = df["eta"].str.strip().str.contains(
+            r"[T ]\S*(?:Z|[+-]\d{2}(?::?\d{2})?)$", regex=True
+        )
+        enums = {
+            column: df[column].map({member.value: member for member in enum})
+            for column, enum in ENUM_COLUMNS.items()
+        }
+
+        checks = {
+            "container_id vacío": df["container_id"].str.strip() == "",
+            "container_id duplicado": df["container_id"].duplicated(keep="last"),
+            # Lo no numérico queda como NA y sus comparaciones también: se
+            # rechaza explícitamente para que ``any`` no lo pase por alto
+            "El peso debe ser positivo": weight.isna() | ~(weight > 0),
+            "El progreso debe estar entre 0 y 100": progress.isna()
+            | ~progress.between(0, 100)
+            | (progress % 1 != 0),
+            "eta inválida": eta.isna(),
+            "eta con zona horaria": eta_with_zone,
+        }
+        for column, values in enums.items():
+            checks[f"{column} inválido"] = values.isna()
+
+        errors = pd.DataFrame(checks)
+        bad = errors.any(axis=1)
+        rejected = [
+            {
+                "row": int(index) + 2,  # línea del CSV (incluye encabezado)
+                "container_id": df.at[index, "container_id"],
+                "errors": [reason for reason, failed in row.items() if failed],
+            }
+            for index, row in errors[bad].iterrows()
+        ]
+
+        ok = ~bad
+        cranes = df["crane_assigned"].replace({"": None, "None": None})
+        containers = [
+            Container.from_trusted(*values)
+            for values in zip(
+                df.loc[ok, "container_id"].tolist(),
+                df.loc[ok, "ship_name"].tolist(),
+                df.loc[ok, "origin_port"].tolist(),
+                df.loc[ok, "destination_port"].tolist(),
+                enums["cargo_type"][ok].tolist(),
+                weight[ok].astype(float).tolist(),
+                enums["status"][ok].tolist(),
+                pd.DatetimeIndex(eta[ok]).to_pydatetime().tolist(),
+                enums["priority"][ok].tolist(),
+                progress[ok].astype(int).tolist(),
+                cranes[ok].tolist(),
+                (df.loc[ok, "temperature_controlled"].str.lower() == "true").tolist(),
+                (df.loc[ok, "customs_cleared"].str.lower() == "true").tolist(),
+            )
+        ]
+        return ManifestLoadResult(containers=containers, rejected=rejected)
+
+    def ingest(
+        self, source, repository: ContainerRepositoryPort
+    ) -> ManifestLoadResult:
+        """Leer un manifiesto y agregar los contenedores válidos en lote"""
+        result = self.load(source)
+        if result.containers:
+            repository.add_containers_bulk(result.containers)
+        return result
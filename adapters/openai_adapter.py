@@ -3,38 +3,67 @@ Adapter - OpenAI GPT-4o mini Integration
 Arquitectura Hexagonal - Puerto de Chancay
 """
 
+import httpx
 import openai
 import os
 import json
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
 from datetime import datetime
-from domain.ports import AIAnalyticsPort
+from domain.ports import AIAnalyticsPort, AsyncAIAnalyticsPort, InsightNarrationPort
 from domain.entities import Container, PortOperation, AIInsight
 
 
-class OpenAIAnalyticsAdapter(AIAnalyticsPort):
-    """Adaptador para análisis con OpenAI GPT-4o mini"""
+MODEL = "gpt-4o-mini"
 
-    def __init__(self):
-        # Obtener API key del environment o config
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            # Fallback a config.py
-            try:
-                from config import OPENAI_API_KEY
-
-                api_key = OPENAI_API_KEY
-                os.environ["OPENAI_API_KEY"] = api_key
-            except ImportError:
-                raise ValueError(
-                    "OPENAI_API_KEY no configurada en environment ni en config.py"
-                )
 
-        # Crear cliente OpenAI con la nueva sintaxis
-        self.client = openai.OpenAI(api_key=api_key)
+def resolve_api_key() -> str:
+    """Obtener API key del environment o, como respaldo, de config.py"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        try:
+            from config import OPENAI_API_KEY
 
-    def predict_port_congestion(self, current_data: Dict[str, Any]) -> AIInsight:
-        """Predecir congestión portuaria usando GPT-4o mini"""
+            api_key = OPENAI_API_KEY
+            os.environ["OPENAI_API_KEY"] = api_key
+        except ImportError:
+            raise ValueError(
+                "OPENAI_API_KEY no configurada en environment ni en config.py"
+            )
+    return api_key
+
+
+class ChatCall(NamedTuple):
+    """Una consulta al modelo: mensajes, cómo interpretar la respuesta JSON y
+    qué insight de respaldo generar si falla"""
+
+    messages: List[Dict[str, str]]
+    temperature: float
+    parse: Callable[[Dict[str, Any]], AIInsight]
+    fallback_type: str
+    error_label: str
+    on_error: Optional[Callable[[], Optional[AIInsight]]] = None
+
+
+class OpenAIPrompts:
+    """Prompts e interpretación de respuestas, comunes a los clientes
+    síncrono y asíncrono (solo cambia el transporte)
+
+    Con ``fallback`` (p. ej. el motor local) un error del modelo responde con
+    ese análisis en lugar del insight de modo básico.
+    """
+
+    fallback: Optional[AIAnalyticsPort] = None
+
+    def _local(
+        self, analysis: Callable[[AIAnalyticsPort], AIInsight]
+    ) -> Optional[Callable[[], AIInsight]]:
+        """Respaldo con el análisis equivalente del motor ``fallback``"""
+        if self.fallback is None:
+            return None
+        return lambda: analysis(self.fallback)
+
+    def _congestion_call(self, current_data: Dict[str, Any]) -> ChatCall:
+        """Consulta de predicción de congestión portuaria"""
 
         prompt = f"""
         Eres un experto en operaciones portuarias del Puerto de Chancay, Perú.
@@ -59,21 +88,7 @@ class OpenAIAnalyticsAdapter(AIAnalyticsPort):
         }}
         """
 
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Eres un experto en análisis portuario y logística del Puerto de Chancay.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.3,
-            )
-
-            result = json.loads(response.choices[0].message.content)
-
+        def parse(result: Dict[str, Any]) -> AIInsight:
             return AIInsight(
                 insight_id=f"congestion_pred_{datetime.now().strftime('%Y%m%d_%H%M')}",
                 type="prediccion",
@@ -85,13 +100,25 @@ class OpenAIAnalyticsAdapter(AIAnalyticsPort):
                 related_containers=[],
             )
 
-        except Exception as e:
-            return self._create_fallback_insight(
-                "congestion", f"Error en predicción: {e}"
-            )
+        return ChatCall(
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Eres un experto en análisis portuario y logística del Puerto de Chancay.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.3,
+            parse=parse,
+            fallback_type="congestion",
+            error_label="Error en predicción",
+            on_error=self._local(
+                lambda engine: engine.predict_port_congestion(current_data)
+            ),
+        )
 
-    def recommend_crane_allocation(self, containers: List[Container]) -> AIInsight:
-        """Recomendar asignación de grúas"""
+    def _crane_allocation_call(self, containers: List[Container]) -> ChatCall:
+        """Consulta de recomendación de asignación de grúas"""
 
         container_data = []
         for c in containers:
@@ -130,21 +157,7 @@ class OpenAIAnalyticsAdapter(AIAnalyticsPort):
         }}
         """
 
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Eres un experto en optimización de operaciones portuarias.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.2,
-            )
-
-            result = json.loads(response.choices[0].message.content)
-
+        def parse(result: Dict[str, Any]) -> AIInsight:
             return AIInsight(
                 insight_id=f"crane_alloc_{datetime.now().strftime('%Y%m%d_%H%M')}",
                 type="recomendacion",
@@ -158,13 +171,25 @@ class OpenAIAnalyticsAdapter(AIAnalyticsPort):
                 related_containers=result["priority_order"][:3],
             )
 
-        except Exception as e:
-            return self._create_fallback_insight(
-                "crane_allocation", f"Error en recomendación: {e}"
-            )
+        return ChatCall(
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Eres un experto en optimización de operaciones portuarias.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.2,
+            parse=parse,
+            fallback_type="crane_allocation",
+            error_label="Error en recomendación",
+            on_error=self._local(
+                lambda engine: engine.recommend_crane_allocation(containers)
+            ),
+        )
 
-    def analyze_cargo_patterns(self, containers: List[Container]) -> AIInsight:
-        """Analizar patrones de carga Perú-Asia"""
+    def _cargo_patterns_call(self, containers: List[Container]) -> ChatCall:
+        """Consulta de análisis de patrones de carga Perú-Asia"""
 
         cargo_summary = {}
         for container in containers:
@@ -193,21 +218,7 @@ class OpenAIAnalyticsAdapter(AIAnalyticsPort):
         }}
         """
 
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Eres un experto en análisis de comercio internacional Perú-Asia.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.4,
-            )
-
-            result = json.loads(response.choices[0].message.content)
-
+        def parse(result: Dict[str, Any]) -> AIInsight:
             return AIInsight(
                 insight_id=f"cargo_patterns_{datetime.now().strftime('%Y%m%d')}",
                 type="analisis",
@@ -219,15 +230,25 @@ class OpenAIAnalyticsAdapter(AIAnalyticsPort):
                 related_containers=[],
             )
 
-        except Exception as e:
-            return self._create_fallback_insight(
-                "cargo_patterns", f"Error en análisis: {e}"
-            )
+        return ChatCall(
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Eres un experto en análisis de comercio internacional Perú-Asia.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.4,
+            parse=parse,
+            fallback_type="cargo_patterns",
+            error_label="Error en análisis",
+            on_error=self._local(
+                lambda engine: engine.analyze_cargo_patterns(containers)
+            ),
+        )
 
-    def generate_efficiency_insights(
-        self, operations: List[PortOperation]
-    ) -> AIInsight:
-        """Generar insights de eficiencia"""
+    def _efficiency_call(self, operations: List[PortOperation]) -> ChatCall:
+        """Consulta de insights de eficiencia operativa"""
 
         ops_data = []
         for op in operations:
@@ -263,21 +284,7 @@ class OpenAIAnalyticsAdapter(AIAnalyticsPort):
         }}
         """
 
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Eres un experto en optimización de eficiencia portuaria.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.3,
-            )
-
-            result = json.loads(response.choices[0].message.content)
-
+        def parse(result: Dict[str, Any]) -> AIInsight:
             return AIInsight(
                 insight_id=f"efficiency_{datetime.now().strftime('%Y%m%d')}",
                 type="recomendacion",
@@ -289,15 +296,84 @@ class OpenAIAnalyticsAdapter(AIAnalyticsPort):
                 related_containers=[],
             )
 
-        except Exception as e:
-            return self._create_fallback_insight(
-                "efficiency", f"Error en análisis: {e}"
+        return ChatCall(
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Eres un experto en optimización de eficiencia portuaria.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.3,
+            parse=parse,
+            fallback_type="efficiency",
+            error_label="Error en análisis",
+            on_error=self._local(
+                lambda engine: engine.generate_efficiency_insights(operations)
+            ),
+        )
+
+    def _narration_call(self, insight: AIInsight) -> ChatCall:
+        """Consulta para redactar un insight calculado localmente"""
+
+        prompt = f"""
+        Eres analista de operaciones del Puerto de Chancay, Perú.
+
+        Un modelo numérico produjo este resultado:
+        - Título: {insight.title}
+        - Detalle: {insight.description}
+        - Tipo: {insight.type} | Impacto: {insight.impact_level} | Confianza: {insight.confidence:.0%}
+
+        Redáctalo para los operadores del puerto en 2-3 frases claras, sin
+        cambiar ninguna cifra ni agregar datos que no estén arriba.
+
+        Responde en JSON:
+        {{
+            "title": "título breve",
+            "description": "explicación y recomendaciones"
+        }}
+        """
+
+        def parse(result: Dict[str, Any]) -> AIInsight:
+            return AIInsight(
+                insight_id=insight.insight_id,
+                type=insight.type,
+                title=result["title"],
+                description=result["description"],
+                confidence=insight.confidence,
+                impact_level=insight.impact_level,
+                generated_at=insight.generated_at,
+                related_containers=list(insight.related_containers),
             )
 
-    def predict_delays(self, ship, weather_data: Dict) -> AIInsight:
-        """Predecir demoras potenciales"""
+        return ChatCall(
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Eres un redactor técnico de operaciones portuarias.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.3,
+            parse=parse,
+            fallback_type="narration",
+            error_label="Error en redacción",
+            on_error=lambda: None,  # Sin redacción: quien llama usa el original
+        )
+
+    def _interpret(self, call: ChatCall, content: str) -> AIInsight:
+        """Convertir la respuesta del modelo en insight (o respaldo si no es válida)"""
+        try:
+            return call.parse(json.loads(content))
+        except Exception as e:
+            return self._fallback(call, e)
+
+    def _fallback(self, call: ChatCall, error: Exception) -> AIInsight:
+        """Respuesta ante un error del modelo"""
+        if call.on_error is not None:
+            return call.on_error()
         return self._create_fallback_insight(
-            "delays", "Predicción de demoras no implementada"
+            call.fallback_type, f"{call.error_label}: {error}"
         )
 
     def _create_fallback_insight(self, insight_type: str, message: str) -> AIInsight:
@@ -312,3 +388,121 @@ class OpenAIAnalyticsAdapter(AIAnalyticsPort):
             generated_at=datetime.now(),
             related_containers=[],
         )
+
+
+class OpenAIAnalyticsAdapter(OpenAIPrompts, AIAnalyticsPort):
+    """Adaptador para análisis con OpenAI GPT-4o mini"""
+
+    def __init__(self, fallback: Optional[AIAnalyticsPort] = None):
+        # Crear cliente OpenAI con la nueva sintaxis
+        self.client = openai.OpenAI(api_key=resolve_api_key())
+        self.fallback = fallback
+
+    def predict_port_congestion(self, current_data: Dict[str, Any]) -> AIInsight:
+        """Predecir congestión portuaria usando GPT-4o mini"""
+        return self._complete(self._congestion_call(current_data))
+
+    def recommend_crane_allocation(self, containers: List[Container]) -> AIInsight:
+        """Recomendar asignación de grúas"""
+        return self._complete(self._crane_allocation_call(containers))
+
+    def analyze_cargo_patterns(self, containers: List[Container]) -> AIInsight:
+        """Analizar patrones de carga Perú-Asia"""
+        return self._complete(self._cargo_patterns_call(containers))
+
+    def generate_efficiency_insights(
+        self, operations: List[PortOperation]
+    ) -> AIInsight:
+        """Generar insights de eficiencia"""
+        return self._complete(self._efficiency_call(operations))
+
+    def predict_delays(self, ship, weather_data: Dict) -> AIInsight:
+        """Predecir demoras potenciales"""
+        if self.fallback:
+            return self.fallback.predict_delays(ship, weather_data)
+        return self._create_fallback_insight(
+            "delays", "Predicción de demoras no implementada"
+        )
+
+    def _complete(self, call: ChatCall) -> AIInsight:
+        try:
+            response = self.client.chat.completions.create(
+                model=MODEL, messages=call.messages, temperature=call.temperature
+            )
+        except Exception as e:
+            return self._fallback(call, e)
+        return self._interpret(call, response.choices[0].message.content)
+
+
+class AsyncOpenAIAnalyticsAdapter(
+    OpenAIPrompts, AsyncAIAnalyticsPort, InsightNarrationPort
+):
+    """Adaptador asíncrono para OpenAI GPT-4o mini
+
+    Un solo ``AsyncOpenAI`` con un pool HTTP compartido (conexiones
+    keep-alive reutilizadas): varias consultas en paralelo no bloquean el
+    event loop ni abren una conexión nueva por llamada.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+        fallback: Optional[AIAnalyticsPort] = None,
+    ):
+        self.fallback = fallback
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout,
+        )
+        self.client = openai.AsyncOpenAI(
+            api_key=resolve_api_key(), http_client=self._http
+        )
+
+    async def predict_port_congestion(self, current_data: Dict[str, Any]) -> AIInsight:
+        """Predecir congestión portuaria usando GPT-4o mini"""
+        return await self._complete(self._congestion_call(current_data))
+
+    async def recommend_crane_allocation(
+        self, containers: List[Container]
+    ) -> AIInsight:
+        """Recomendar asignación de grúas"""
+        return await self._complete(self._crane_allocation_call(containers))
+
+    async def analyze_cargo_patterns(self, containers: List[Container]) -> AIInsight:
+        """Analizar patrones de carga Perú-Asia"""
+        return await self._complete(self._cargo_patterns_call(containers))
+
+    async def generate_efficiency_insights(
+        self, operations: List[PortOperation]
+    ) -> AIInsight:
+        """Generar insights de eficiencia"""
+        return await self._complete(self._efficiency_call(operations))
+
+    async def predict_delays(self, ship, weather_data: Dict) -> AIInsight:
+        """Predecir demoras potenciales"""
+        if self.fallback:
+            return self.fallback.predict_delays(ship, weather_data)
+        return self._create_fallback_insight(
+            "delays", "Predicción de demoras no implementada"
+        )
+
+    async def narrate_insight(self, insight: AIInsight) -> Optional[AIInsight]:
+        """Redactar en lenguaje natural un insight calculado localmente"""
+        return await self._complete(self._narration_call(insight))
+
+    async def aclose(self) -> None:
+        """Cerrar el pool de conexiones HTTP"""
+        await self._http.aclose()
+
+    async def _complete(self, call: ChatCall) -> AIInsight:
+        try:
+            response = await self.client.chat.completions.create(
+                model=MODEL, messages=call.messages, temperature=call.temperature
+            )
+        except Exception as e:
+            return self._fallback(call, e)
+        return self._interpret(call, response.choices[0].message.content)
@@ -0,0 +1,57 @@
+"""
+Adapter - Cursores de paginación por clave (keyset)
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from domain.entities import Container
+
+
+SORT_FIELDS = ("container_id", "eta")
+
+
+def parse_sort(sort: str) -> Tuple[str, bool]:
+    """Interpretar ``sort`` ("eta", "-eta", ...) como (campo, descendente)"""
+    field = sort.lstrip("-")
+    if field not in SORT_FIELDS:
+        options = ", ".join(SORT_FIELDS)
+        raise ValueError(f"Orden no soportado: {sort} (usar {options})")
+    return field, sort.startswith("-")
+
+
+def sort_key(container: Container, field: str) -> tuple:
+    """Clave total de orden: el campo más el ID para desempatar"""
+    if field == "eta":
+        return (container.eta, container.container_id)
+    return (container.container_id,)
+
+
+def encode_cursor(container: Container, field: str) -> str:
+    """Cursor opaco con la clave del último elemento de la página"""
+    key = sort_key(container, field)
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in key]
+    raw = json.dumps([field, *values]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], field: str) -> Optional[tuple]:
+    """Recuperar la clave de un cursor (None si no hay cursor)"""
+    if not cursor:
+        return None
+    try:
+        cursor_field, *values = json.loads(base64.urlsafe_b64decode(cursor))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if cursor_field != field:
+        raise ValueError("El cursor corresponde a otro orden")
+    try:
+        if field == "eta":
+            eta, container_id = values
+            return (datetime.fromisoformat(eta), container_id)
+        (container_id,) = values
+        return (container_id,)
+    except Exception:
+        raise ValueError("Cursor inválido")
@@ -0,0 +1,527 @@
+"""
+Adapter - Simulador de eventos discretos del puerto
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from random import Random
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from domain.entities import Container, ContainerStatus, Prioridad, Ship, TipoCarga
+from domain.crane_scheduling import CraneScheduler, crane_ids, queue_key
+from domain.ports import ContainerRepositoryPort, ShipTrackingPort
+from domain.services import ContainerTrackingService
+from .local_analytics import handling_minutes
+
+
+HOURS_PER_YEAR = 365 * 24
+
+# Mezcla de los contenedores simulados (pesos relativos)
+CARGO_MIX = {
+    TipoCarga.MINERALES: 0.35,
+    TipoCarga.AGRICOLA: 0.25,
+    TipoCarga.MANUFACTURA: 0.15,
+    TipoCarga.TEXTILES: 0.10,
+    TipoCarga.QUIMICOS: 0.10,
+    TipoCarga.GENERAL: 0.05,
+}
+PRIORITY_MIX = {
+    Prioridad.BAJA: 0.30,
+    Prioridad.MEDIA: 0.45,
+    Prioridad.ALTA: 0.20,
+    Prioridad.CRITICA: 0.05,
+}
+
+
+def parse_annual_teu(capacidad_anual: str) -> int:
+    """Leer la capacidad de PUERTO_CONFIG ("1_000_000 TEU" -> 1000000)"""
+    return int(capacidad_anual.split()[0].replace("_", ""))
+
+
+class SimulationObserver:
+    """Ganchos de la simulación; por defecto no hacen nada (modelo puro)"""
+
+    def ship_announced(self, ship: Ship, containers: List[Container]) -> None:
+        """Zarpó del puerto de origen con su manifiesto"""
+
+    def eta_revised(self, ship: Ship) -> None:
+        """La ETA cambió durante la travesía"""
+
+    def ship_arrived(self, ship: Ship) -> None:
+        """Llegó a la rada y espera muelle"""
+
+    def ship_berthed(self, ship: Ship, containers: List[Container]) -> None:
+        """Atracó: sus contenedores quedan atracados"""
+
+    def unload_started(self, container: Container, crane_id: str) -> None:
+        """Una grúa empezó a descargar el contenedor"""
+
+    def unload_finished(self, container: Container) -> None:
+        """Contenedor descargado"""
+
+    def ship_departed(self, ship: Ship) -> None:
+        """Zarpó y liberó el muelle"""
+
+
+class ServiceDriver(SimulationObserver):
+    """Lleva cada evento simulado al ``ContainerTrackingService`` real y a los
+    repositorios a través de los puertos (generación de carga realista)"""
+
+    def __init__(
+        self,
+        service: ContainerTrackingService,
+        ships: ShipTrackingPort,
+        containers: ContainerRepositoryPort,
+    ):
+        self.service = service
+        self.ships = ships
+        self.containers = containers
+        self.calls = 0
+        self.rejected = 0
+
+    def ship_announced(self, ship: Ship, containers: List[Container]) -> None:
+        # Copias: el repositorio asigna versiones y la simulación sigue mutando
+        self._count(self.ships.add_ship(ship.clone()))
+        self.containers.add_containers_bulk([c.clone() for c in containers])
+        self.calls += 1
+
+    def eta_revised(self, ship: Ship) -> None:
+        self._count(self.ships.update_ship_eta(ship.ship_id, ship.eta_chancay))
+
+    def ship_arrived(self, ship: Ship) -> None:
+        self._count(self.ships.update_ship_status(ship.ship_id, "llegando"))
+
+    def ship_berthed(self, ship: Ship, containers: List[Container]) -> None:
+        self._count(self.ships.update_ship_status(ship.ship_id, "atracado"))
+        for container in containers:
+            self._count(self.service.dock_container(container.container_id))
+
+    def unload_started(self, container: Container, crane_id: str) -> None:
+        self._count(
+            self.service.assign_crane_intelligently(container.container_id, crane_id)
+        )
+
+    def unload_finished(self, container: Container) -> None:
+        self._count(
+            self.service.update_unloading_progress(container.container_id, 100)
+        )
+
+    def ship_departed(self, ship: Ship) -> None:
+        self._count(self.ships.update_ship_status(ship.ship_id, "zarpado"))
+
+    def _count(self, ok: bool) -> None:
+        self.calls += 1
+        self.rejected += not ok
+
+
+@dataclass(slots=True, eq=False)
+class ShipVisit:
+    """Escala de un barco en la simulación"""
+
+    ship: Ship
+    containers: List[Container]
+    arrival: float  # Horas simuladas (llegada real, no la ETA anunciada)
+    queue: Deque[Container] = field(default_factory=deque)
+    cranes: int = 0
+    arrived_at: float = 0.0
+    berthed_at: float = 0.0
+
+
+@dataclass(slots=True)
+class SimulationReport:
+    """Resultados de una corrida del simulador"""
+
+    days: float
+    ships_arrived: int
+    ships_served: int
+    containers_unloaded: int
+    teu_per_year: float
+    avg_wait_hours: float
+    p95_wait_hours: float
+    max_wait_hours: float
+    avg_queue_ships: float
+    avg_turnaround_hours: float
+    berth_utilization: float
+    crane_utilization: float
+    events: int
+    wall_seconds: float
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "dias_simulados": self.days,
+            "barcos_llegados": self.ships_arrived,
+            "barcos_atendidos": self.ships_served,
+            "contenedores_descargados": self.containers_unloaded,
+            "teu_anual": round(self.teu_per_year),
+            "espera_media_horas": round(self.avg_wait_hours, 2),
+            "espera_p95_horas": round(self.p95_wait_hours, 2),
+            "espera_max_horas": round(self.max_wait_hours, 2),
+            "cola_media_barcos": round(self.avg_queue_ships, 2),
+            "estadia_media_horas": round(self.avg_turnaround_hours, 2),
+            "utilizacion_muelles": round(self.berth_utilization, 3),
+            "utilizacion_gruas": round(self.crane_utilization, 3),
+            "eventos": self.events,
+            "segundos_reales": round(self.wall_seconds, 2),
+        }
+
+
+class PortSimulator:
+    """Simulación de eventos discretos: arribos, atraque, grúas y descarga
+
+    Los barcos zarpan de cada ruta de ``RUTAS_COMERCIALES`` como un proceso
+    de Poisson calibrado para mover ``annual_teu`` por año, con la ETA
+    anunciada al zarpar y corregida un día antes de llegar. Esperan en rada
+    un muelle libre (orden de llegada) y sus contenedores se descargan en el
+    orden de ``queue_key`` con las grúas de un ``CraneScheduler``; el tiempo
+    de cada descarga viene de ``handling_minutes``.
+
+    El reloj salta de evento en evento sobre un heap, así que un año se
+    simula en segundos. Cada evento se informa al ``observer``: con un
+    ``ServiceDriver`` la simulación maneja el servicio y los adaptadores
+    reales a través de los puertos; en ese caso se le pasa el scheduler del
+    servicio (``crane_scheduler=service.cranes``) para que la grúa que elige
+    la simulación sea la que el servicio persiste.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, Dict[str, Any]],
+        annual_teu: int = 1_000_000,
+        berths: int = 4,
+        cranes: Optional[List[str]] = None,
+        containers_per_call: int = 1500,
+        teu_per_container: float = 1.6,
+        maneuver_hours: float = 2.0,
+        max_cranes_per_ship: int = 4,
+        eta_sigma_hours: float = 6.0,
+        start: Optional[datetime] = None,
+        seed: Optional[int] = None,
+        observer: Optional[SimulationObserver] = None,
+        crane_scheduler: Optional[CraneScheduler] = None,
+    ):
+        self.routes = routes
+        self.annual_teu = annual_teu
+        self.berths = berths
+        self.crane_scheduler = crane_scheduler
+        if crane_scheduler is not None:
+            self.crane_ids = crane_scheduler.cranes
+        else:
+            self.crane_ids = cranes if cranes is not None else crane_ids(12)
+        self.containers_per_call = containers_per_call
+        self.teu_per_container = teu_per_container
+        self.maneuver_hours = maneuver_hours
+        self.max_cranes_per_ship = max_cranes_per_ship
+        self.eta_sigma_hours = eta_sigma_hours
+        self.start = start or datetime.now().replace(
+            minute=0, second=0, microsecond=0
+        )
+        self.seed = seed
+        self.observer = observer or SimulationObserver()
+
+    def run(self, days: float) -> SimulationReport:
+        """Simular ``days`` días a partir de un puerto vacío"""
+        started = time.perf_counter()
+        horizon = days * 24
+        self._reset()
+
+        # Cada ruta arranca con un tiempo de navegación de adelanto para que
+        # los primeros barcos lleguen al inicio del horizonte
+        calls_per_hour = (
+            self.annual_teu
+            / (self.containers_per_call * self.teu_per_container)
+            / HOURS_PER_YEAR
+        )
+        self._route_rate = calls_per_hour / len(self.routes)
+        for route, info in self.routes.items():
+            lead = info["tiempo_navegacion"] * 24
+            first = -lead + self._rng.expovariate(self._route_rate)
+            self._schedule(first, self._depart, route)
+
+        events = self._events
+        while events and events[0][0] <= horizon:
+            self.now, _, handler, arg = heapq.heappop(events)
+            handler(arg)
+            self._event_count += 1
+
+        self.now = horizon
+        return self._report(days, time.perf_counter() - started)
+
+    # Eventos
+
+    def _depart(self, route: str) -> None:
+        rng = self._rng
+        next_departure = self.now + rng.expovariate(self._route_rate)
+        self._schedule(next_departure, self._depart, route)
+
+        self._ship_seq += 1
+        sailing = self.routes[route]["tiempo_navegacion"] * 24
+        planned = self.now + sailing
+        arrival = max(self.now + 1, planned + rng.gauss(0, self.eta_sigma_hours))
+        count = rng.randint(
+            self.containers_per_call // 2, self.containers_per_call * 3 // 2
+        )
+
+        ship_id = f"SIM-{self._ship_seq:06d}"
+        eta = self._at(planned)
+        ship = Ship.from_trusted(
+            ship_id,
+            f"{route} Trader {self._ship_seq}",
+            "Simulado",
+            route,
+            count,
+            count,
+            "en_transito",
+            eta,
+        )
+        cargo = rng.choices(self._cargo_types, self._cargo_weights, k=count)
+        priority = rng.choices(self._priorities, self._priority_weights, k=count)
+        containers = [
+            Container.from_trusted(
+                f"{ship_id}-{i:05d}",
+                ship.name,
+                route,
+                "Chancay",
+                cargo[i],
+                rng.uniform(4000, 30000),
+                ContainerStatus.EN_TRANSITO,
+                eta,
+                priority[i],
+            )
+            for i in range(count)
+        ]
+        visit = ShipVisit(ship, containers, arrival)
+        self.observer.ship_announced(ship, containers)
+
+        self._schedule(max(self.now, arrival - 24), self._revise_eta, visit)
+        self._schedule(arrival, self._arrive, visit)
+
+    def _revise_eta(self, visit: ShipVisit) -> None:
+        visit.ship.eta_chancay = self._at(visit.arrival)
+        self.observer.eta_revised(visit.ship)
+
+    def _arrive(self, visit: ShipVisit) -> None:
+        visit.ship.current_status = "llegando"
+        visit.arrived_at = self.now
+        self._ships_arrived += 1
+        self._track_queue()
+        self._waiting.append(visit)
+        self.observer.ship_arrived(visit.ship)
+        self._dispatch_berths()
+
+    def _dispatch_berths(self) -> None:
+        """Atracar en orden de llegada mientras haya muelles libres"""
+        while self._free_berths and self._waiting:
+            self._track_queue()
+            visit = self._waiting.popleft()
+            self._free_berths -= 1
+            visit.berthed_at = self.now
+            self._waits.append(self.now - visit.arrived_at)
+            self._at_berth[visit] = visit
+
+            visit.ship.current_status = "atracado"
+            for container in visit.containers:
+                container.status = ContainerStatus.ATRACADO
+            visit.queue = deque(sorted(visit.containers, key=queue_key))
+            self.observer.ship_berthed(visit.ship, visit.containers)
+            mooring_done = self.now + self.maneuver_hours / 2
+            self._schedule(mooring_done, self._start_unloading, visit)
+
+    def _start_unloading(self, visit: ShipVisit) -> None:
+        visit.ship.current_status = "descargando"
+        self._unloading.append(visit)
+        while visit.cranes < self.max_cranes_per_ship and self._lift(visit):
+            pass
+        self._maybe_depart(visit)
+
+    def _lift(self, visit: ShipVisit, crane_id: Optional[str] = None) -> bool:
+        """Poner una grúa (libre o la indicada) sobre el siguiente contenedor"""
+        if not visit.queue:
+            return False
+        container = visit.queue[0]
+        crane_id = self.cranes.acquire(container.container_id, crane_id)
+        if crane_id is None:
+            return False
+        visit.queue.popleft()
+        visit.cranes += 1
+        container.assign_crane(crane_id)
+        self.observer.unload_started(container, crane_id)
+
+        duration = handling_minutes(container) / 60
+        self._crane_hours += duration
+        self._schedule(self.now + duration, self._finish_lift, (visit, container))
+        return True
+
+    def _finish_lift(self, job: Tuple[ShipVisit, Container]) -> None:
+        visit, container = job
+        crane_id = self.cranes.release(container.container_id)
+        visit.cranes -= 1
+        container.update_progress(100)
+        self._unloaded += 1
+        self.observer.unload_finished(container)
+
+        # La grúa sigue en el mismo barco; si ya no tiene carga pasa al que
+        # tenga menos grúas trabajando
+        if not self._lift(visit, crane_id):
+            self._maybe_depart(visit)
+            candidates = [
+                v
+                for v in self._unloading
+                if v.queue and v.cranes < self.max_cranes_per_ship
+            ]
+            if candidates:
+                target = min(candidates, key=lambda v: (v.cranes, -len(v.queue)))
+                self._lift(target, crane_id)
+
+    def _maybe_depart(self, visit: ShipVisit) -> None:
+        if not visit.queue and not visit.cranes and visit in self._unloading:
+            self._unloading.remove(visit)
+            self._schedule(self.now + self.maneuver_hours / 2, self._leave, visit)
+
+    def _leave(self, visit: ShipVisit) -> None:
+        visit.ship.current_status = "zarpado"
+        self._free_berths += 1
+        del self._at_berth[visit]
+        self._berth_hours += self.now - visit.berthed_at
+        self._turnarounds.append(self.now - visit.arrived_at)
+        self.observer.ship_departed(visit.ship)
+        self._dispatch_berths()
+
+    # Soporte
+
+    def _reset(self) -> None:
+        self._rng = Random(self.seed)
+        self._events: List[Tuple[float, int, Callable[[Any], None], Any]] = []
+        self._sequence = itertools.count()
+        self.now = 0.0
+        # Un scheduler compartido refleja el repositorio: no se reinicia
+        self.cranes = self.crane_scheduler or CraneScheduler(self.crane_ids)
+        self._cargo_types = list(CARGO_MIX)
+        self._cargo_weights = list(CARGO_MIX.values())
+        self._priorities = list(PRIORITY_MIX)
+        self._priority_weights = list(PRIORITY_MIX.values())
+        self._free_berths = self.berths
+        self._waiting: Deque[ShipVisit] = deque()
+        self._unloading: List[ShipVisit] = []
+        self._at_berth: Dict[ShipVisit, ShipVisit] = {}
+        self._ship_seq = 0
+        self._event_count = 0
+        self._ships_arrived = 0
+        self._unloaded = 0
+        self._waits: List[float] = []
+        self._turnarounds: List[float] = []
+        self._crane_hours = 0.0
+        self._berth_hours = 0.0
+        self._queue_area = 0.0
+        self._queue_since = 0.0
+
+    def _schedule(self, at: float, handler: Callable[[Any], None], arg: Any) -> None:
+        heapq.heappush(self._events, (at, next(self._sequence), handler, arg))
+
+    def _at(self, hours: float) -> datetime:
+        return self.start + timedelta(hours=hours)
+
+    def _track_queue(self) -> None:
+        """Acumular el largo de la cola en rada ponderado por tiempo"""
+        if self.now > 0:
+            self._queue_area += len(self._waiting) * (self.now - self._queue_since)
+            self._queue_since = self.now
+
+    def _report(self, days: float, wall_seconds: float) -> SimulationReport:
+        horizon = days * 24
+        self._track_queue()
+        waits = sorted(self._waits)
+        berth_hours = self._berth_hours + sum(
+            horizon - visit.berthed_at for visit in self._at_berth.values()
+        )
+        return SimulationReport(
+            days=days,
+            ships_arrived=self._ships_arrived,
+            ships_served=len(self._turnarounds),
+            containers_unloaded=self._unloaded,
+            teu_per_year=(
+                self._unloaded * self.teu_per_container * HOURS_PER_YEAR / horizon
+            ),
+            avg_wait_hours=sum(waits) / len(waits) if waits else 0.0,
+            p95_wait_hours=waits[int(len(waits) * 0.95)] if waits else 0.0,
+            max_wait_hours=waits[-1] if waits else 0.0,
+            avg_queue_ships=self._queue_area / horizon,
+            avg_turnaround_hours=(
+                sum(self._turnarounds) / len(self._turnarounds)
+                if self._turnarounds
+                else 0.0
+            ),
+            berth_utilization=berth_hours / (self.berths * horizon),
+            crane_utilization=self._crane_hours / (len(self.crane_ids) * horizon),
+            events=self._event_count,
+            wall_seconds=wall_seconds,
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import os
+    from config import PUERTO_CONFIG, RUTAS_COMERCIALES, BERTH_CONFIG
+    from .data_adapter import CSVDataAdapter
+    from .local_analytics import LocalAnalyticsAdapter
+    from .sqlite_adapter import SQLiteDataAdapter
+
+    parser = argparse.ArgumentParser(description="Simulador del Puerto de Chancay")
+    parser.add_argument("--days", type=float, default=365)
+    parser.add_argument(
+        "--teu", type=int, default=parse_annual_teu(PUERTO_CONFIG["capacidad_anual"])
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--drive",
+        choices=["csv", "sqlite"],
+        help="manejar el servicio real sobre este backend (generación de carga)",
+    )
+    parser.add_argument("--data-path", default="data/simulacion/")
+    args = parser.parse_args()
+
+    observer, service, adapter = None, None, None
+    if args.drive:
+        os.makedirs(args.data_path, exist_ok=True)
+        if args.drive == "sqlite":
+            adapter = SQLiteDataAdapter(
+                os.path.join(args.data_path, "chancay.db"),
+                args.data_path,
+                auto_migrate=False,
+            )
+        else:
+            adapter = CSVDataAdapter(args.data_path, seed_if_empty=False)
+        service = ContainerTrackingService(
+            container_repo=adapter,
+            ship_tracking=adapter,
+            ai_analytics=LocalAnalyticsAdapter(),
+            notifications=None,
+            operations=None,
+            cranes=CraneScheduler(crane_ids(PUERTO_CONFIG["gruas_disponibles"])),
+        )
+        observer = ServiceDriver(service, adapter, adapter)
+        service.get_available_cranes()  # Grúas ya ocupadas en el repositorio
+
+    simulator = PortSimulator(
+        RUTAS_COMERCIALES,
+        annual_teu=args.teu,
+        berths=PUERTO_CONFIG["muelles"],
+        cranes=crane_ids(PUERTO_CONFIG["gruas_disponibles"]),
+        maneuver_hours=BERTH_CONFIG["maneuver_hours"],
+        seed=args.seed,
+        observer=observer,
+        crane_scheduler=service.cranes if service else None,
+    )
+    report = simulator.run(args.days).summary()
+    if observer:
+        report["llamadas_servicio"] = observer.calls
+        report["llamadas_rechazadas"] = observer.rejected
+        report["llamadas_por_segundo"] = round(
+            observer.calls / max(report["segundos_reales"], 1e-9)
+        )
+        adapter.close()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
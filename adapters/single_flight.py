@@ -0,0 +1,188 @@
+"""
+Adapter - Coalescencia de consultas de IA idénticas (single-flight)
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+from domain.ports import AIAnalyticsPort, AsyncAIAnalyticsPort, InsightNarrationPort
+from domain.entities import Container, PortOperation, AIInsight
+from .insight_cache import InsightKeys
+
+T = TypeVar("T")
+
+
+class FlightStats:
+    """Contadores de llamadas recibidas y ejecutadas realmente"""
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        coalesced = self.calls - self.executions
+        ratio = coalesced / self.calls if self.calls else 0.0
+        return {
+            "llamadas": self.calls,
+            "ejecuciones": self.executions,
+            "coalescidas": coalesced,
+            "ratio_coalescencia": round(ratio, 3),
+        }
+
+
+class SingleFlight(FlightStats):
+    """Una sola ejecución en vuelo por clave para corrutinas
+
+    Quien llega con una clave ya en vuelo espera el mismo resultado (o la
+    misma excepción). Si uno de los que esperan se cancela, la ejecución
+    compartida sigue para los demás.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is None:
+            self.executions += 1
+            future = asyncio.ensure_future(call())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+
+class ThreadSingleFlight(FlightStats):
+    """Una sola ejecución en vuelo por clave entre hilos"""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def do(self, key: str, call: Callable[[], T]) -> T:
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                self.executions += 1
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(call())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return future.result()
+
+
+class CoalescingAIAnalyticsAdapter(InsightKeys, AIAnalyticsPort):
+    """Decorador de ``AIAnalyticsPort``: consultas simultáneas con las mismas
+    entradas comparten una sola llamada al modelo"""
+
+    def __init__(self, inner: AIAnalyticsPort):
+        self.inner = inner
+        self.flights = ThreadSingleFlight()
+
+    def predict_port_congestion(self, current_data: Dict[str, Any]) -> AIInsight:
+        """Predecir congestión portuaria (coalescida)"""
+        return self.flights.do(
+            self._congestion_key(current_data),
+            lambda: self.inner.predict_port_congestion(current_data),
+        )
+
+    def recommend_crane_allocation(self, containers: List[Container]) -> AIInsight:
+        """Recomendar asignación de grúas (coalescida)"""
+        return self.flights.do(
+            self._crane_allocation_key(containers),
+            lambda: self.inner.recommend_crane_allocation(containers),
+        )
+
+    def analyze_cargo_patterns(self, containers: List[Container]) -> AIInsight:
+        """Analizar patrones de carga Perú-Asia (coalescida)"""
+        return self.flights.do(
+            self._cargo_patterns_key(containers),
+            lambda: self.inner.analyze_cargo_patterns(containers),
+        )
+
+    def generate_efficiency_insights(
+        self, operations: List[PortOperation]
+    ) -> AIInsight:
+        """Generar insights de eficiencia (coalescida)"""
+        return self.flights.do(
+            self._efficiency_key(operations),
+            lambda: self.inner.generate_efficiency_insights(operations),
+        )
+
+    def predict_delays(self, ship, weather_data: Dict) -> AIInsight:
+        """Predecir demoras potenciales"""
+        return self.inner.predict_delays(ship, weather_data)
+
+
+class AsyncCoalescingAIAnalyticsAdapter(
+    InsightKeys, AsyncAIAnalyticsPort, InsightNarrationPort
+):
+    """Decorador de ``AsyncAIAnalyticsPort`` con coalescencia por contenido"""
+
+    def __init__(self, inner: AsyncAIAnalyticsPort):
+        self.inner = inner
+        self.flights = SingleFlight()
+
+    async def predict_port_congestion(self, current_data: Dict[str, Any]) -> AIInsight:
+        """Predecir congestión portuaria (coalescida)"""
+        return await self.flights.do(
+            self._congestion_key(current_data),
+            lambda: self.inner.predict_port_congestion(current_data),
+        )
+
+    async def recommend_crane_allocation(
+        self, containers: List[Container]
+    ) -> AIInsight:
+        """Recomendar asignación de grúas (coalescida)"""
+        return await self.flights.do(
+            self._crane_allocation_key(containers),
+            lambda: self.inner.recommend_crane_allocation(containers),
+        )
+
+    async def analyze_cargo_patterns(self, containers: List[Container]) -> AIInsight:
+        """Analizar patrones de carga Perú-Asia (coalescida)"""
+        return await self.flights.do(
+            self._cargo_patterns_key(containers),
+            lambda: self.inner.analyze_cargo_patterns(containers),
+        )
+
+    async def generate_efficiency_insights(
+        self, operations: List[PortOperation]
+    ) -> AIInsight:
+        """Generar insights de eficiencia (coalescida)"""
+        return await self.flights.do(
+            self._efficiency_key(operations),
+            lambda: self.inner.generate_efficiency_insights(operations),
+        )
+
+    async def predict_delays(self, ship, weather_data: Dict) -> AIInsight:
+        """Predecir demoras potenciales"""
+        return await self.inner.predict_delays(ship, weather_data)
+
+    async def narrate_insight(self, insight: AIInsight) -> Optional[AIInsight]:
+        """Redactar un insight local (coalescida)"""
+        return await self.flights.do(
+            self._narration_key(insight),
+            lambda: self.inner.narrate_insight(insight),
+        )
+
+    async def aclose(self) -> None:
+        """Cerrar el adaptador interno"""
+        await self.inner.aclose()
@@ -0,0 +1,748 @@
+"""
+Adapter - Data Management sobre SQLite
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Dict, Any, Callable, Iterator, Tuple
+from datetime import datetime
+from domain.ports import (
+    ContainerRepositoryPort,
+    ShipTrackingPort,
+    DataAnalyticsPort,
+    ChangeFeedPort,
+    ChangeSet,
+    VersionConflictError,
+)
+from domain.entities import Container, Ship, ContainerStatus, TipoCarga, Prioridad
+from .data_adapter import CSVDataAdapter
+from .pagination import parse_sort, encode_cursor, decode_cursor
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS containers (
+    container_id TEXT PRIMARY KEY,
+    ship_name TEXT NOT NULL,
+    origin_port TEXT NOT NULL,
+    destination_port TEXT NOT NULL,
+    cargo_type TEXT NOT NULL,
+    weight_kg REAL NOT NULL CHECK (weight_kg > 0),
+    status TEXT NOT NULL,
+    eta TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    progress_percent INTEGER NOT NULL CHECK (progress_percent BETWEEN 0 AND 100),
+    crane_assigned TEXT,
+    temperature_controlled INTEGER NOT NULL,
+    customs_cleared INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_containers_eta ON containers (eta);
+
+CREATE TABLE IF NOT EXISTS ships (
+    ship_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    captain TEXT NOT NULL,
+    origin_port TEXT NOT NULL,
+    containers_count INTEGER NOT NULL,
+    max_capacity INTEGER NOT NULL,
+    current_status TEXT NOT NULL,
+    eta_chancay TEXT NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_ships_status ON ships (current_status);
+CREATE INDEX IF NOT EXISTS idx_ships_eta ON ships (eta_chancay);
+
+-- Secuencia global de cambios (una fila): cada transacción de escritura
+-- la incrementa y marca las filas que toca con el nuevo valor
+CREATE TABLE IF NOT EXISTS change_sequence (value INTEGER NOT NULL);
+INSERT INTO change_sequence (value)
+SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM change_sequence);
+"""
+
+# Columnas agregadas después de la primera versión del esquema
+ADDED_COLUMNS = (
+    ("containers", "version", "INTEGER NOT NULL DEFAULT 0"),
+    ("containers", "seq", "INTEGER NOT NULL DEFAULT 0"),
+    ("ships", "seq", "INTEGER NOT NULL DEFAULT 0"),
+)
+SEQ_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_containers_seq ON containers (seq);
+CREATE INDEX IF NOT EXISTS idx_ships_seq ON ships (seq);
+"""
+# Índices compuestos (filtro, clave de orden): una página filtrada es un
+# rango del índice desde el cursor, sin ordenar en un B-tree temporal.
+# Reemplazan a los índices de una sola columna de la primera versión.
+PAGE_INDEXES = """
+DROP INDEX IF EXISTS idx_containers_status;
+DROP INDEX IF EXISTS idx_containers_ship;
+DROP INDEX IF EXISTS idx_containers_priority;
+CREATE INDEX IF NOT EXISTS idx_containers_status_id
+    ON containers (status, container_id);
+CREATE INDEX IF NOT EXISTS idx_containers_status_eta
+    ON containers (status, eta, container_id);
+CREATE INDEX IF NOT EXISTS idx_containers_ship_id
+    ON containers (ship_name, container_id);
+CREATE INDEX IF NOT EXISTS idx_containers_priority_id
+    ON containers (priority, container_id);
+CREATE INDEX IF NOT EXISTS idx_containers_cargo_id
+    ON containers (cargo_type, container_id);
+"""
+
+
+class SQLiteDataAdapter(
+    ContainerRepositoryPort, ShipTrackingPort, DataAnalyticsPort, ChangeFeedPort
+):
+    """Adaptador para gestión de datos en SQLite embebido
+
+    Usa modo WAL (lectores no bloquean al escritor) y SQL constante por
+    operación: sqlite3 cachea las sentencias preparadas por texto, así que
+    cada consulta se compila una sola vez por conexión. Varios workers
+    pueden compartir la base: las escrituras toman el lock de escritura de
+    SQLite (``BEGIN IMMEDIATE``) y los contenedores se actualizan con
+    compare-and-swap sobre la columna ``version``.
+    """
+
+    CONTAINER_COLUMNS = (
+        "container_id, ship_name, origin_port, destination_port, cargo_type, "
+        "weight_kg, status, eta, priority, progress_percent, crane_assigned, "
+        "temperature_controlled, customs_cleared, version"
+    )
+    SHIP_COLUMNS = (
+        "ship_id, name, captain, origin_port, containers_count, max_capacity, "
+        "current_status, eta_chancay"
+    )
+
+    SQL_ALL_CONTAINERS = f"SELECT {CONTAINER_COLUMNS} FROM containers"
+    SQL_CONTAINER_BY_ID = f"{SQL_ALL_CONTAINERS} WHERE container_id = ?"
+    SQL_CONTAINERS_BY_STATUS = f"{SQL_ALL_CONTAINERS} WHERE status = ?"
+    SQL_CONTAINERS_BY_SHIP = f"{SQL_ALL_CONTAINERS} WHERE ship_name = ?"
+    SQL_CONTAINERS_BY_ETA = (
+        f"{SQL_ALL_CONTAINERS} WHERE eta BETWEEN ? AND ? ORDER BY eta"
+    )
+    SQL_CONTAINER_VERSION = "SELECT version FROM containers WHERE container_id = ?"
+    SQL_UPDATE_CONTAINER = (
+        "UPDATE containers SET ship_name = ?, origin_port = ?, "
+        "destination_port = ?, cargo_type = ?, weight_kg = ?, status = ?, "
+        "eta = ?, priority = ?, progress_percent = ?, crane_assigned = ?, "
+        "temperature_controlled = ?, customs_cleared = ?, version = version + 1, "
+        "seq = ? WHERE container_id = ? AND version = ?"
+    )
+    SQL_UPSERT_CONTAINER = (
+        f"INSERT OR REPLACE INTO containers ({CONTAINER_COLUMNS}, seq) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    SQL_CONTAINERS_CHANGED = f"{SQL_ALL_CONTAINERS} WHERE seq > ?"
+    SQL_CRANES_IN_USE = (
+        "SELECT crane_assigned, container_id FROM containers "
+        "WHERE status = 'descargando' AND crane_assigned IS NOT NULL"
+    )
+
+    SQL_ALL_SHIPS = f"SELECT {SHIP_COLUMNS} FROM ships"
+    SQL_SHIP_BY_ID = f"{SQL_ALL_SHIPS} WHERE ship_id = ?"
+    SQL_ARRIVING_SHIPS = (
+        f"{SQL_ALL_SHIPS} WHERE current_status IN ('llegando', 'atracado')"
+    )
+    SQL_SHIPS_BY_ETA = (
+        f"{SQL_ALL_SHIPS} WHERE eta_chancay BETWEEN ? AND ? ORDER BY eta_chancay"
+    )
+    SQL_UPDATE_SHIP_STATUS = (
+        "UPDATE ships SET current_status = ?, seq = ? WHERE ship_id = ?"
+    )
+    SQL_UPDATE_SHIP_ETA = "UPDATE ships SET eta_chancay = ?, seq = ? WHERE ship_id = ?"
+    SQL_UPSERT_SHIP = (
+        f"INSERT OR REPLACE INTO ships ({SHIP_COLUMNS}, seq) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    SQL_SHIPS_CHANGED = f"{SQL_ALL_SHIPS} WHERE seq > ?"
+
+    SQL_NEXT_SEQ = "UPDATE change_sequence SET value = value + 1"
+    SQL_CURRENT_SEQ = "SELECT value FROM change_sequence"
+
+    SQL_OVERVIEW = (
+        "SELECT status, COUNT(*), COALESCE(SUM(weight_kg), 0), "
+        "COUNT(crane_assigned) FROM containers GROUP BY status"
+    )
+    SQL_SHIPS_OVERVIEW = (
+        "SELECT COUNT(*), COALESCE(SUM(current_status = 'atracado'), 0) FROM ships"
+    )
+    SQL_COMPLETED_COUNT = "SELECT COUNT(*) FROM containers WHERE status = ?"
+    SQL_CARGO_STATS = (
+        "SELECT cargo_type, COUNT(*), SUM(weight_kg) FROM containers "
+        "GROUP BY cargo_type"
+    )
+    SQL_ROUTES = "SELECT origin_port, COUNT(*) FROM ships GROUP BY origin_port"
+
+    def __init__(
+        self,
+        db_path: str = "data/chancay.db",
+        csv_path: str = "data/",
+        auto_migrate: bool = True,
+    ):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._ensure_columns()
+        self.load_stats: Dict[str, Any] = {"loaded": True, "source": "sqlite"}
+
+        # Migración inicial: una base vacía se carga desde los CSV existentes
+        if (
+            auto_migrate
+            and self._count("containers") == 0
+            and self._count("ships") == 0
+        ):
+            self.migrate_from_csv(csv_path)
+
+    # Implementación ContainerRepositoryPort
+
+    def get_all_containers(self) -> List[Container]:
+        """Obtener todos los contenedores"""
+        return self._query_containers(self.SQL_ALL_CONTAINERS)
+
+    def iter_containers(
+        self, filter: Optional[Callable[[Container], bool]] = None
+    ) -> Iterator[Container]:
+        """Recorrer contenedores por lotes del cursor sin materializar la lista"""
+        for row in self._iter_rows(self.SQL_ALL_CONTAINERS):
+            container = self._row_to_container(row)
+            if filter is None or filter(container):
+                yield container
+
+    def get_container_by_id(self, container_id: str) -> Optional[Container]:
+        """Obtener contenedor por ID"""
+        containers = self._query_containers(self.SQL_CONTAINER_BY_ID, (container_id,))
+        return containers[0] if containers else None
+
+    def get_containers_by_status(self, status: str) -> List[Container]:
+        """Obtener contenedores por estado"""
+        return self._query_containers(self.SQL_CONTAINERS_BY_STATUS, (status,))
+
+    def get_containers_by_ship(self, ship_name: str) -> List[Container]:
+        """Obtener contenedores de una embarcación"""
+        return self._query_containers(self.SQL_CONTAINERS_BY_SHIP, (ship_name,))
+
+    def get_containers_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: str = "container_id",
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        cargo_type: Optional[str] = None,
+        ship_name: Optional[str] = None,
+    ) -> Tuple[List[Container], Optional[str]]:
+        """Obtener una página con WHERE por clave (row values) y LIMIT
+
+        El texto SQL solo varía según los filtros presentes y el orden, así
+        que el conjunto de sentencias es acotado y se reutiliza del caché.
+        """
+        field, descending = parse_sort(sort)
+        after = decode_cursor(cursor, field)
+        filters = (
+            ("status", ContainerStatus(status).value if status else None),
+            ("priority", Prioridad(priority).value if priority else None),
+            ("cargo_type", TipoCarga(cargo_type).value if cargo_type else None),
+            ("ship_name", ship_name),
+        )
+        clauses = [f"{column} = ?" for column, value in filters if value is not None]
+        params = [value for _, value in filters if value is not None]
+
+        order = ("eta", "container_id") if field == "eta" else ("container_id",)
+        if after is not None:
+            operator = "<" if descending else ">"
+            placeholders = ", ".join("?" for _ in order)
+            clauses.append(f"({', '.join(order)}) {operator} ({placeholders})")
+            params.extend(
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in after
+            )
+
+        direction = " DESC" if descending else ""
+        sql = self.SQL_ALL_CONTAINERS
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY " + ", ".join(column + direction for column in order)
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+
+        page = self._query_containers(sql, tuple(params))
+        if len(page) > limit:
+            return page[:limit], encode_cursor(page[limit - 1], field)
+        return page, None
+
+    def get_containers_arriving_between(
+        self, start: datetime, end: datetime
+    ) -> List[Container]:
+        """Obtener contenedores por ventana de ETA (rango sobre idx_containers_eta)"""
+        return self._query_containers(
+            self.SQL_CONTAINERS_BY_ETA, (start.isoformat(), end.isoformat())
+        )
+
+    def update_container(self, container: Container) -> bool:
+        """Actualizar contenedor si su versión no cambió desde que se leyó"""
+        return self.update_containers_bulk([container]) > 0
+
+    def add_container(self, container: Container) -> bool:
+        """Agregar nuevo contenedor"""
+        self.add_containers_bulk([container])
+        return True
+
+    def update_containers_bulk(self, containers: List[Container]) -> int:
+        """Actualizar varios contenedores en una sola transacción
+
+        Cada UPDATE exige la versión leída; si alguna no coincide se revierte
+        el lote completo y se lanza ``VersionConflictError``.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                updated = self._update_versioned(containers)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        for container in updated:
+            container.version += 1
+        return len(updated)
+
+    def claim_cranes(self, containers: List[Container]) -> int:
+        """Actualizar contenedores en descarga si sus grúas siguen libres
+
+        La verificación de grúas y el compare-and-swap ocurren bajo el mismo
+        ``BEGIN IMMEDIATE``: dos workers no pueden tomar la misma grúa.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                in_use = dict(self._conn.execute(self.SQL_CRANES_IN_USE))
+                conflicts = [
+                    c.container_id
+                    for c in containers
+                    if in_use.get(c.crane_assigned, c.container_id)
+                    != c.container_id
+                ]
+                if conflicts:
+                    raise VersionConflictError(conflicts)
+                updated = self._update_versioned(containers)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        for container in updated:
+            container.version += 1
+        return len(updated)
+
+    def add_containers_bulk(self, containers: List[Container]) -> int:
+        """Agregar varios contenedores en una sola transacción"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq = self._next_seq()
+                for container in containers:
+                    row = self._conn.execute(
+                        self.SQL_CONTAINER_VERSION, (container.container_id,)
+                    ).fetchone()
+                    if row:
+                        container.version = row[0] + 1
+                    self._conn.execute(
+                        self.SQL_UPSERT_CONTAINER,
+                        self._container_to_params(container) + (seq,),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(containers)
+
+    # Implementación ShipTrackingPort
+
+    def get_all_ships(self) -> List[Ship]:
+        """Obtener todas las embarcaciones"""
+        return self._query_ships(self.SQL_ALL_SHIPS)
+
+    def iter_ships(
+        self, filter: Optional[Callable[[Ship], bool]] = None
+    ) -> Iterator[Ship]:
+        """Recorrer embarcaciones por lotes del cursor sin materializar la lista"""
+        for row in self._iter_rows(self.SQL_ALL_SHIPS):
+            ship = self._row_to_ship(row)
+            if filter is None or filter(ship):
+                yield ship
+
+    def get_ship_by_id(self, ship_id: str) -> Optional[Ship]:
+        """Obtener embarcación por ID"""
+        ships = self._query_ships(self.SQL_SHIP_BY_ID, (ship_id,))
+        return ships[0] if ships else None
+
+    def get_arriving_ships(self) -> List[Ship]:
+        """Obtener embarcaciones que llegan"""
+        return self._query_ships(self.SQL_ARRIVING_SHIPS)
+
+    def get_ships_arriving_between(self, start: datetime, end: datetime) -> List[Ship]:
+        """Obtener embarcaciones por ventana de ETA (rango sobre idx_ships_eta)"""
+        return self._query_ships(
+            self.SQL_SHIPS_BY_ETA, (start.isoformat(), end.isoformat())
+        )
+
+    def add_ship(self, ship: Ship) -> bool:
+        """Agregar (o reemplazar) embarcación"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    self.SQL_UPSERT_SHIP,
+                    self._ship_to_params(ship) + (self._next_seq(),),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def update_ship_status(self, ship_id: str, status: str) -> bool:
+        """Actualizar estado de embarcación"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    self.SQL_UPDATE_SHIP_STATUS, (status, self._next_seq(), ship_id)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount > 0
+
+    def update_ship_eta(self, ship_id: str, eta: datetime) -> bool:
+        """Actualizar ETA de embarcación"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    self.SQL_UPDATE_SHIP_ETA,
+                    (eta.isoformat(), self._next_seq(), ship_id),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount > 0
+
+    # Implementación DataAnalyticsPort
+
+    def get_port_overview(self) -> Dict[str, Any]:
+        """Obtener resumen del puerto"""
+        with self._lock:
+            rows = self._conn.execute(self.SQL_OVERVIEW).fetchall()
+            ships_count, occupied_berths = self._conn.execute(
+                self.SQL_SHIPS_OVERVIEW
+            ).fetchone()
+
+        status_breakdown = {status: count for status, count, _, _ in rows}
+        # Solo las descargas en curso ocupan grúa: los completados conservan
+        # la grúa que los descargó como historial
+        cranes_by_status = {status: cranes for status, _, _, cranes in rows}
+        return {
+            "total_containers": sum(row[1] for row in rows),
+            "total_weight_kg": sum(row[2] for row in rows),
+            "ships_count": ships_count,
+            "status_breakdown": status_breakdown,
+            "active_cranes": cranes_by_status.get("descargando", 0),
+            "occupied_berths": occupied_berths,
+            "unloading_containers": status_breakdown.get("descargando", 0),
+        }
+
+    def get_performance_metrics(self) -> Dict[str, float]:
+        """Obtener métricas de rendimiento"""
+        with self._lock:
+            (completed,) = self._conn.execute(
+                self.SQL_COMPLETED_COUNT, (ContainerStatus.COMPLETADO.value,)
+            ).fetchone()
+
+        return {
+            "containers_processed": completed,
+            "crane_usage": random.uniform(0.7, 0.95) * 12,  # Simulado
+            "berth_usage": random.uniform(0.6, 0.9) * 4,  # Simulado
+            "avg_turnaround": random.uniform(36, 48),  # Simulado
+        }
+
+    def get_cargo_statistics(self) -> Dict[str, Any]:
+        """Obtener estadísticas de carga"""
+        with self._lock:
+            rows = self._conn.execute(self.SQL_CARGO_STATS).fetchall()
+
+        return {
+            "cargo_breakdown": {cargo: count for cargo, count, _ in rows},
+            "total_weight_by_type": {cargo: weight for cargo, _, weight in rows},
+            "peru_exports": ["cobre", "zinc", "harina_pescado", "palta"],
+            "asia_imports": ["manufactura", "textiles", "quimicos"],
+        }
+
+    def get_route_analytics(self) -> Dict[str, Any]:
+        """Obtener análisis de rutas Perú-Asia"""
+        with self._lock:
+            rows = self._conn.execute(self.SQL_ROUTES).fetchall()
+
+        return {
+            "active_routes": dict(rows),
+            "main_corridors": ["Shanghai-Chancay", "Qingdao-Chancay", "Busan-Chancay"],
+            "avg_transit_times": {
+                "Shanghai": 23,
+                "Qingdao": 25,
+                "Busan": 26,
+                "Ningbo": 24,
+                "Yokohama": 22,
+            },
+        }
+
+    # Implementación ChangeFeedPort
+
+    def get_changes_since(self, since: Optional[int]) -> ChangeSet:
+        """Obtener filas con ``seq`` mayor a ``since`` (índices por seq)"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                (seq,) = self._conn.execute(self.SQL_CURRENT_SEQ).fetchone()
+                full = since is None or since > seq
+                if full:
+                    container_rows = self._conn.execute(
+                        self.SQL_ALL_CONTAINERS
+                    ).fetchall()
+                    ship_rows = self._conn.execute(self.SQL_ALL_SHIPS).fetchall()
+                else:
+                    container_rows = self._conn.execute(
+                        self.SQL_CONTAINERS_CHANGED, (since,)
+                    ).fetchall()
+                    ship_rows = self._conn.execute(
+                        self.SQL_SHIPS_CHANGED, (since,)
+                    ).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+
+        return ChangeSet(
+            seq=seq,
+            containers=[self._row_to_container(row) for row in container_rows],
+            ships=[self._row_to_ship(row) for row in ship_rows],
+            full=full,
+        )
+
+    def get_data_version(self) -> str:
+        """Versión de datos: valor actual de la secuencia de cambios"""
+        with self._lock:
+            (seq,) = self._conn.execute(self.SQL_CURRENT_SEQ).fetchone()
+        return str(seq)
+
+    def get_change_seq(self) -> int:
+        """Valor actual de la secuencia de cambios"""
+        with self._lock:
+            (seq,) = self._conn.execute(self.SQL_CURRENT_SEQ).fetchone()
+        return seq
+
+    # Migración y ciclo de vida
+
+    def migrate_from_csv(self, csv_path: str = "data/") -> Dict[str, int]:
+        """Cargar el estado del almacén CSV (contenedores y barcos) en la base
+
+        Se lee a través de ``CSVDataAdapter`` (solo lectura) para incluir las
+        mutaciones del journal que aún no se compactaron en los CSV, sin
+        modificar el directorio de origen.
+        """
+        started = time.perf_counter()
+        if not os.path.isdir(csv_path):
+            print(f"Directorio {csv_path} no encontrado")
+            return {"containers": 0, "ships": 0}
+        source = CSVDataAdapter(os.path.join(csv_path, ""), read_only=True)
+        try:
+            containers = source.get_all_containers()
+            ships = source.get_all_ships()
+        finally:
+            source.close()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    self.SQL_UPSERT_CONTAINER,
+                    (self._container_to_params(c) + (0,) for c in containers),
+                )
+                self._conn.executemany(
+                    self.SQL_UPSERT_SHIP,
+                    (self._ship_to_params(ship) + (0,) for ship in ships),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        migrated = {"containers": len(containers), "ships": len(ships)}
+        self.load_stats = {
+            "loaded": True,
+            "source": "csv_migration",
+            **migrated,
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+        return migrated
+
+    def close(self) -> None:
+        """Cerrar la conexión (checkpoint del WAL)"""
+        with self._lock:
+            self._conn.close()
+
+    # Métodos auxiliares
+
+    def _ensure_columns(self) -> None:
+        """Agregar a bases existentes las columnas que les falten"""
+        for table, column, definition in ADDED_COLUMNS:
+            info = self._conn.execute(f"PRAGMA table_info({table})").fetchall()
+            if column not in {row[1] for row in info}:
+                self._conn.execute(
+                    f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+                )
+        self._conn.executescript(SEQ_INDEXES)
+        self._conn.executescript(PAGE_INDEXES)
+
+    def _next_seq(self) -> int:
+        """Reservar la siguiente secuencia de cambio (dentro de la transacción)"""
+        self._conn.execute(self.SQL_NEXT_SEQ)
+        return self._conn.execute(self.SQL_CURRENT_SEQ).fetchone()[0]
+
+    def _update_versioned(self, containers: List[Container]) -> List[Container]:
+        """UPDATE con compare-and-swap por versión (dentro de la transacción)
+
+        Retorna los contenedores existentes actualizados; si alguna versión
+        no coincide lanza ``VersionConflictError`` para revertir el lote.
+        """
+        updated, conflicts = [], []
+        seq = self._next_seq()
+        for container in containers:
+            params = self._container_to_params(container)
+            cursor = self._conn.execute(
+                self.SQL_UPDATE_CONTAINER,
+                params[1:-1] + (seq, container.container_id, container.version),
+            )
+            if cursor.rowcount:
+                updated.append(container)
+            elif self._conn.execute(
+                self.SQL_CONTAINER_VERSION, (container.container_id,)
+            ).fetchone():
+                conflicts.append(container.container_id)
+        if conflicts:
+            raise VersionConflictError(conflicts)
+        return updated
+
+    def _count(self, table: str) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _iter_rows(self, sql: str, params: tuple = (), batch_size: int = 500):
+        """Leer filas en lotes; el lock solo se toma durante cada fetchmany"""
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    def _query_containers(self, sql: str, params: tuple = ()) -> List[Container]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_container(row) for row in rows]
+
+    def _query_ships(self, sql: str, params: tuple = ()) -> List[Ship]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_ship(row) for row in rows]
+
+    @staticmethod
+    def _row_to_container(row: tuple) -> Container:
+        """Convertir fila SQL a Container (validada por los CHECK del esquema)"""
+        return Container.from_trusted(
+            row[0],
+            row[1],
+            row[2],
+            row[3],
+            TipoCarga(row[4]),
+            row[5],
+            ContainerStatus(row[6]),
+            datetime.fromisoformat(row[7]),
+            Prioridad(row[8]),
+            row[9],
+            row[10],
+            bool(row[11]),
+            bool(row[12]),
+            row[13],
+        )
+
+    @staticmethod
+    def _row_to_ship(row: tuple) -> Ship:
+        """Convertir fila SQL a Ship"""
+        return Ship.from_trusted(
+            row[0],
+            row[1],
+            row[2],
+            row[3],
+            row[4],
+            row[5],
+            row[6],
+            datetime.fromisoformat(row[7]),
+        )
+
+    @staticmethod
+    def _container_to_params(container: Container) -> tuple:
+        """Convertir Container a parámetros SQL (orden de CONTAINER_COLUMNS)"""
+        return (
+            container.container_id,
+            container.ship_name,
+            container.origin_port,
+            container.destination_port,
+            container.cargo_type.value,
+            container.weight_kg,
+            container.status.value,
+            container.eta.isoformat(),
+            container.priority.value,
+            container.progress_percent,
+            container.crane_assigned,
+            int(container.temperature_controlled),
+            int(container.customs_cleared),
+            container.version,
+        )
+
+    @staticmethod
+    def _ship_to_params(ship: Ship) -> tuple:
+        """Convertir Ship a parámetros SQL (orden de SHIP_COLUMNS)"""
+        return (
+            ship.ship_id,
+            ship.name,
+            ship.captain,
+            ship.origin_port,
+            ship.containers_count,
+            ship.max_capacity,
+            ship.current_status,
+            ship.eta_chancay.isoformat(),
+        )
+
+
+if __name__ == "__main__":
+    import sys
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "data/chancay.db"
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else "data/"
+    adapter = SQLiteDataAdapter(db_path, csv_path, auto_migrate=False)
+    print(f"Migración a {db_path}: {adapter.migrate_from_csv(csv_path)}")
+    adapter.close()
@@ -4,26 +4,63 @@ Puerto de Chancay Container Tracker
 Arquitectura Hexagonal + GPT-4o mini
 """
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
+import asyncio
+import io
+import json
 import os
-from typing import Dict, Any, List
+import zlib
+from typing import Dict, Any, List, Optional
 
 # Imports del dominio
 from domain.services import (
     ContainerTrackingService,
     AIAnalyticsService,
     PortEfficiencyService,
+    BerthAllocationService,
 )
+from domain.crane_scheduling import CraneScheduler, crane_ids
+from domain.ports import VersionConflictError
 from adapters.data_adapter import CSVDataAdapter
-from adapters.openai_adapter import OpenAIAnalyticsAdapter
+from adapters.event_broadcaster import InProcessEventBroadcaster
+from adapters.berth_allocator import GreedyBerthAllocator
+from adapters.sqlite_adapter import SQLiteDataAdapter
+from adapters.manifest_loader import PandasManifestLoader
+from adapters.insight_scheduler import InsightScheduler
+from adapters.insight_store import InMemoryInsightStore
+from adapters.insight_cache import (
+    AsyncCachedAIAnalyticsAdapter,
+    CachedAIAnalyticsAdapter,
+    InsightCache,
+)
+from adapters.local_analytics import (
+    AsyncLocalAnalyticsAdapter,
+    LocalAnalyticsAdapter,
+)
+from adapters.single_flight import (
+    AsyncCoalescingAIAnalyticsAdapter,
+    CoalescingAIAnalyticsAdapter,
+)
+from adapters.openai_adapter import (
+    AsyncOpenAIAnalyticsAdapter,
+    OpenAIAnalyticsAdapter,
+)
 
 # Configuración
-from config import FLASK_CONFIG, PUERTO_CONFIG
+from config import (
+    FLASK_CONFIG,
+    PUERTO_CONFIG,
+    DATA_CONFIG,
+    AI_CONFIG,
+    AI_CACHE_CONFIG,
+    AI_SCHEDULER_CONFIG,
+    BERTH_CONFIG,
+)
 
 # Crear aplicación FastAPI
 app = FastAPI(
@@ -43,16 +80,86 @@ class ContainerProgressUpdate(BaseModel):
     progress: int
 
 
+class ContainerProgressItem(BaseModel):
+    container_id: str
+    progress: int
+
+
+class BulkProgressUpdate(BaseModel):
+    updates: List[ContainerProgressItem]
+
+
 class CraneAssignment(BaseModel):
     container_id: str
 
 
+class ShipEtaUpdate(BaseModel):
+    eta: datetime
+
+
 # Configuración de dependencias (Inyección de Dependencias)
+def setup_ai_adapters(mode: str) -> Dict[str, Any]:
+    """Armar los adaptadores de IA según el modo configurado
+
+    - "llm": GPT-4o mini con caché por contenido y coalescencia de consultas
+      simultáneas; si el modelo falla responde el motor local.
+    - "local": solo el motor numérico local (sin red ni API key).
+    - "tiered": el motor local calcula todo; el LLM solo redacta a pedido.
+    """
+    if mode not in ("llm", "local", "tiered"):
+        raise ValueError(f"Modo de IA no soportado: {mode}")
+
+    local_ai = LocalAnalyticsAdapter(
+        cranes=PUERTO_CONFIG["gruas_disponibles"], berths=PUERTO_CONFIG["muelles"]
+    )
+    insight_cache = InsightCache(
+        max_bytes=AI_CACHE_CONFIG["max_bytes"], path=AI_CACHE_CONFIG["path"]
+    )
+    adapters = {"insight_cache": insight_cache, "ai_flights": {}, "narrator": None}
+
+    if mode != "llm":
+        adapters["ai_adapter"] = local_ai
+        adapters["async_ai_adapter"] = AsyncLocalAnalyticsAdapter(local_ai)
+        if mode == "tiered":
+            narrator = AsyncCoalescingAIAnalyticsAdapter(AsyncOpenAIAnalyticsAdapter())
+            adapters["ai_flights"]["async"] = narrator.flights
+            adapters["narrator"] = AsyncCachedAIAnalyticsAdapter(
+                narrator, insight_cache, AI_CACHE_CONFIG["ttls"]
+            )
+        return adapters
+
+    coalescing_ai = CoalescingAIAnalyticsAdapter(
+        OpenAIAnalyticsAdapter(fallback=local_ai)
+    )
+    async_coalescing_ai = AsyncCoalescingAIAnalyticsAdapter(
+        AsyncOpenAIAnalyticsAdapter(fallback=local_ai)
+    )
+    adapters["ai_flights"] = {
+        "sync": coalescing_ai.flights,
+        "async": async_coalescing_ai.flights,
+    }
+    adapters["ai_adapter"] = CachedAIAnalyticsAdapter(
+        coalescing_ai, insight_cache, AI_CACHE_CONFIG["ttls"]
+    )
+    adapters["async_ai_adapter"] = AsyncCachedAIAnalyticsAdapter(
+        async_coalescing_ai, insight_cache, AI_CACHE_CONFIG["ttls"]
+    )
+    return adapters
+
+
 def setup_dependencies():
     """Configurar dependencias del sistema"""
     # Adaptadores
-    data_adapter = CSVDataAdapter()
-    ai_adapter = OpenAIAnalyticsAdapter()
+    if DATA_CONFIG["backend"] == "sqlite":
+        data_adapter = SQLiteDataAdapter(
+            DATA_CONFIG["sqlite_path"], csv_path=DATA_CONFIG["csv_path"]
+        )
+    else:
+        data_adapter = CSVDataAdapter(DATA_CONFIG["csv_path"])
+    ai_adapters = setup_ai_adapters(AI_CONFIG["mode"])
+    ai_adapter = ai_adapters["ai_adapter"]
+    async_ai_adapter = ai_adapters["async_ai_adapter"]
+    events = InProcessEventBroadcaster()
 
     # Servicios del dominio
     container_service = ContainerTrackingService(
@@ -61,9 +168,32 @@ def setup_dependencies():
         ai_analytics=ai_adapter,
         notifications=None,  # Implementar si es necesario
         operations=None,  # Implementar si es necesario
+        events=events,
+        cranes=CraneScheduler(crane_ids(PUERTO_CONFIG["gruas_disponibles"])),
+    )
+
+    ai_service = AIAnalyticsService(
+        ai_port=ai_adapter,
+        data_analytics=data_adapter,
+        container_repo=data_adapter,
+        operations=None,  # Implementar si es necesario
+        async_ai_port=async_ai_adapter,
     )
 
-    ai_service = AIAnalyticsService(ai_port=ai_adapter, data_analytics=data_adapter)
+    # Insights precalculados: la API lee el almacén, no espera a la IA
+    insight_store = InMemoryInsightStore()
+    insight_scheduler = InsightScheduler(
+        ai_service, insight_store, change_feed=data_adapter, **AI_SCHEDULER_CONFIG
+    )
+
+    berth_service = BerthAllocationService(
+        ship_tracking=data_adapter,
+        change_feed=data_adapter,
+        allocator=GreedyBerthAllocator(
+            berths=PUERTO_CONFIG["muelles"], **BERTH_CONFIG
+        ),
+        events=events,
+    )
 
     efficiency_service = PortEfficiencyService(
         operations_port=None,  # Implementar si es necesario
@@ -75,8 +205,12 @@ def setup_dependencies():
         "container_service": container_service,
         "ai_service": ai_service,
         "efficiency_service": efficiency_service,
+        "berth_service": berth_service,
         "data_adapter": data_adapter,
-        "ai_adapter": ai_adapter,
+        **ai_adapters,
+        "insight_store": insight_store,
+        "insight_scheduler": insight_scheduler,
+        "events": events,
     }
 
 
@@ -100,160 +234,330 @@ async def landing(request: Request):
     )
 
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de ETags contra el header If-None-Match"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in tags
+
+
+def not_modified(request: Request, response: Response) -> Optional[Response]:
+    """Responder 304 si el cliente ya tiene la versión actual de los datos
+
+    El ETag combina la versión de datos del adaptador con la query (cada
+    página o filtro es una representación distinta), así que se obtiene sin
+    recalcular ni serializar el payload.
+    """
+    version = services["data_adapter"].get_data_version()
+    query = zlib.crc32(request.url.query.encode("utf-8"))
+    # no-cache: el navegador guarda la respuesta pero siempre revalida
+    headers = {"ETag": f'W/"{version}-{query:08x}"', "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
 @app.get("/api/overview")
-async def get_overview() -> Dict[str, Any]:
+async def get_overview(request: Request, response: Response) -> Dict[str, Any]:
     """API: Resumen general del puerto"""
-    try:
-        data_adapter = services["data_adapter"]
-        overview = data_adapter.get_port_overview()
-
-        # Agregar información específica de Chancay
-        overview.update(
-            {
-                "puerto_nombre": PUERTO_CONFIG["nombre"],
-                "pais": PUERTO_CONFIG["pais"],
-                "gruas_totales": PUERTO_CONFIG["gruas_disponibles"],
-                "muelles_totales": 4,
-                "capacidad_anual": PUERTO_CONFIG["capacidad_anual"],
-            }
-        )
+    cached = not_modified(request, response)
+    if cached:
+        return cached
 
-        return overview
+    try:
+        return build_overview()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_overview() -> Dict[str, Any]:
+    """Resumen del puerto con la información específica de Chancay"""
+    overview = services["data_adapter"].get_port_overview()
+    overview.update(
+        {
+            "puerto_nombre": PUERTO_CONFIG["nombre"],
+            "pais": PUERTO_CONFIG["pais"],
+            "gruas_totales": PUERTO_CONFIG["gruas_disponibles"],
+            "muelles_totales": 4,
+            "capacidad_anual": PUERTO_CONFIG["capacidad_anual"],
+        }
+    )
+    return overview
+
+
+def container_to_dict(container) -> Dict[str, Any]:
+    """Convertir Container al formato JSON de la API"""
+    return {
+        "container_id": container.container_id,
+        "ship_name": container.ship_name,
+        "origin_port": container.origin_port,
+        "destination_port": container.destination_port,
+        "cargo_type": container.cargo_type.value,
+        "weight_kg": container.weight_kg,
+        "status": container.status.value,
+        "eta": container.eta.strftime("%Y-%m-%d %H:%M"),
+        "priority": container.priority.value,
+        "progress_percent": container.progress_percent,
+        "crane_assigned": container.crane_assigned,
+        "temperature_controlled": container.temperature_controlled,
+        "customs_cleared": container.customs_cleared,
+    }
+
+
+def ship_to_dict(ship) -> Dict[str, Any]:
+    """Convertir Ship al formato JSON de la API"""
+    return {
+        "ship_id": ship.ship_id,
+        "name": ship.name,
+        "captain": ship.captain,
+        "origin_port": ship.origin_port,
+        "containers_count": ship.containers_count,
+        "max_capacity": ship.max_capacity,
+        "current_status": ship.current_status,
+        "eta_chancay": ship.eta_chancay.strftime("%Y-%m-%d %H:%M"),
+        "load_percentage": ship.get_load_percentage(),
+    }
+
+
 @app.get("/api/containers")
-async def get_containers() -> List[Dict[str, Any]]:
-    """API: Lista de contenedores"""
+async def get_containers(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    cargo_type: Optional[str] = None,
+    ship: Optional[str] = None,
+    sort: str = "container_id",
+) -> List[Dict[str, Any]]:
+    """API: Página de contenedores filtrada y ordenada en el servidor
+
+    ``sort``: container_id | eta (prefijo "-" para descendente). El cursor de
+    la página siguiente se devuelve en el header ``X-Next-Cursor``.
+    """
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+
     try:
         data_adapter = services["data_adapter"]
-        containers = data_adapter.get_all_containers()
-
-        # Convertir a formato JSON
-        containers_data = []
-        for container in containers:
-            containers_data.append(
-                {
-                    "container_id": container.container_id,
-                    "ship_name": container.ship_name,
-                    "origin_port": container.origin_port,
-                    "destination_port": container.destination_port,
-                    "cargo_type": container.cargo_type.value,
-                    "weight_kg": container.weight_kg,
-                    "status": container.status.value,
-                    "eta": container.eta.strftime("%Y-%m-%d %H:%M"),
-                    "priority": container.priority.value,
-                    "progress_percent": container.progress_percent,
-                    "crane_assigned": container.crane_assigned,
-                    "temperature_controlled": container.temperature_controlled,
-                    "customs_cleared": container.customs_cleared,
-                }
-            )
+        containers, next_cursor = data_adapter.get_containers_page(
+            limit,
+            cursor=cursor,
+            sort=sort,
+            status=status,
+            priority=priority,
+            cargo_type=cargo_type,
+            ship_name=ship,
+        )
 
-        return containers_data
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return [container_to_dict(c) for c in containers]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/ships")
-async def get_ships() -> List[Dict[str, Any]]:
+async def get_ships(request: Request, response: Response) -> List[Dict[str, Any]]:
     """API: Lista de embarcaciones"""
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+
     try:
         data_adapter = services["data_adapter"]
         ships = data_adapter.get_all_ships()
 
-        ships_data = []
-        for ship in ships:
-            ships_data.append(
-                {
-                    "ship_id": ship.ship_id,
-                    "name": ship.name,
-                    "captain": ship.captain,
-                    "origin_port": ship.origin_port,
-                    "containers_count": ship.containers_count,
-                    "max_capacity": ship.max_capacity,
-                    "current_status": ship.current_status,
-                    "eta_chancay": ship.eta_chancay.strftime("%Y-%m-%d %H:%M"),
-                    "load_percentage": ship.get_load_percentage(),
-                }
-            )
-
-        return ships_data
+        return [ship_to_dict(ship) for ship in ships]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/ai-insights")
-async def get_ai_insights() -> List[Dict[str, Any]]:
-    """API: Insights generados por IA (GPT-4o mini)"""
+def local_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Llevar una fecha con zona horaria a hora local sin zona (como las ETA)"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+@app.get("/api/arrivals")
+async def get_arrivals(
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+) -> Dict[str, Any]:
+    """API: Barcos y contenedores que llegan en una ventana de ETA
+
+    Por defecto la ventana son las próximas 24 horas.
+    """
+    start = local_naive(start) or datetime.now()
+    end = local_naive(end) or start + timedelta(hours=24)
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' debe ser posterior a 'from'")
+
     try:
-        ai_service = services["ai_service"]
         data_adapter = services["data_adapter"]
+        ships = data_adapter.get_ships_arriving_between(start, end)
+        containers = data_adapter.get_containers_arriving_between(start, end)
 
-        # Generar insights en tiempo real
-        insights = []
-
-        # 1. Análisis de congestión
-        port_data = data_adapter.get_port_overview()
-        congestion_insight = services["ai_adapter"].predict_port_congestion(port_data)
-        insights.append(
-            {
-                "id": congestion_insight.insight_id,
-                "type": congestion_insight.type,
-                "title": congestion_insight.title,
-                "description": congestion_insight.description,
-                "confidence": congestion_insight.confidence,
-                "impact_level": congestion_insight.impact_level,
-                "generated_at": congestion_insight.generated_at.strftime(
-                    "%Y-%m-%d %H:%M"
-                ),
-            }
-        )
+        return {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "ships": [ship_to_dict(ship) for ship in ships],
+            "containers": [container_to_dict(c) for c in containers],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # 2. Análisis de patrones de carga
-        containers = data_adapter.get_all_containers()
-        cargo_insight = services["ai_adapter"].analyze_cargo_patterns(containers)
-        insights.append(
-            {
-                "id": cargo_insight.insight_id,
-                "type": cargo_insight.type,
-                "title": cargo_insight.title,
-                "description": cargo_insight.description,
-                "confidence": cargo_insight.confidence,
-                "impact_level": cargo_insight.impact_level,
-                "generated_at": cargo_insight.generated_at.strftime("%Y-%m-%d %H:%M"),
-            }
-        )
 
-        # 3. Recomendaciones de grúas
-        waiting_containers = data_adapter.get_containers_by_status("atracado")
-        if waiting_containers:
-            crane_insight = services["ai_adapter"].recommend_crane_allocation(
-                waiting_containers
-            )
-            insights.append(
-                {
-                    "id": crane_insight.insight_id,
-                    "type": crane_insight.type,
-                    "title": crane_insight.title,
-                    "description": crane_insight.description,
-                    "confidence": crane_insight.confidence,
-                    "impact_level": crane_insight.impact_level,
-                    "generated_at": crane_insight.generated_at.strftime(
-                        "%Y-%m-%d %H:%M"
-                    ),
+@app.get("/api/changes")
+async def get_changes(since: Optional[int] = Query(None, ge=0)) -> Dict[str, Any]:
+    """API: Contenedores y barcos modificados desde la secuencia ``since``
+
+    Sin ``since`` retorna el estado completo. El cliente guarda ``seq`` y lo
+    envía como ``since`` en el siguiente polling; con ``full=true`` debe
+    reemplazar su espejo local completo.
+    """
+    try:
+        changes = services["data_adapter"].get_changes_since(since)
+
+        return {
+            "seq": changes.seq,
+            "full": changes.full,
+            "containers": [container_to_dict(c) for c in changes.containers],
+            "ships": [ship_to_dict(s) for s in changes.ships],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def sse_message(event: str, data: Dict[str, Any]) -> str:
+    """Serializar un evento en formato Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def push_changes(interval: float = 2.0):
+    """Productor único del canal push: un delta por lote de cambios
+
+    Despierta con cada publicación de los servicios o, sin ellas, cada
+    ``interval`` segundos para detectar escrituras de otros workers. El delta
+    se calcula y serializa una sola vez para todos los suscriptores.
+    """
+    events = services["events"]
+    data_adapter = services["data_adapter"]
+    seq = data_adapter.get_change_seq()
+    version = data_adapter.get_data_version()
+
+    while True:
+        topics = await events.wait_for_changes(interval)
+        try:
+            # Las lecturas pueden recargar el snapshot: en un hilo, así el
+            # loop sigue atendiendo los streams mientras tanto
+            current = await asyncio.to_thread(data_adapter.get_data_version)
+            if not topics and current == version:
+                continue
+            version = current
+            changes = await asyncio.to_thread(data_adapter.get_changes_since, seq)
+            seq = changes.seq
+            if not events.subscriber_count:
+                continue
+            if changes.full:
+                # Historial insuficiente: cada cliente recarga por la API
+                events.broadcast(sse_message("resync", {"seq": seq}))
+            elif changes.containers or changes.ships:
+                delta = {
+                    "seq": seq,
+                    "overview": await asyncio.to_thread(build_overview),
+                    "containers": [container_to_dict(c) for c in changes.containers],
+                    "ships": [ship_to_dict(s) for s in changes.ships],
                 }
-            )
+                events.broadcast(sse_message("delta", delta))
+        except Exception as e:
+            print(f"Error generando delta push: {e}")
+
+
+@app.get("/api/stream")
+async def stream_updates(request: Request) -> StreamingResponse:
+    """API: Canal push (Server-Sent Events) con deltas de contenedores,
+    barcos y resumen; reemplaza el polling periódico del dashboard"""
+    events = services["events"]
+
+    async def event_stream():
+        queue = events.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    # Cola desbordada: el cliente perdió deltas
+                    message = sse_message("resync", {})
+                yield message
+        finally:
+            events.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def insight_to_dict(insight) -> Dict[str, Any]:
+    """Convertir AIInsight al formato JSON de la API"""
+    return {
+        "id": insight.insight_id,
+        "type": insight.type,
+        "title": insight.title,
+        "description": insight.description,
+        "confidence": insight.confidence,
+        "impact_level": insight.impact_level,
+        "generated_at": insight.generated_at.strftime("%Y-%m-%d %H:%M"),
+    }
+
 
-        return insights
+@app.get("/api/ai-insights")
+async def get_ai_insights(narrate: bool = False) -> List[Dict[str, Any]]:
+    """API: Insights generados por IA (GPT-4o mini)
+
+    Se sirven los precalculados por el planificador de fondo; solo si aún
+    no hay ninguno se espera la primera generación. En modo "tiered" con
+    ``narrate=true`` el LLM redacta los resultados del motor local.
+    """
+    try:
+        insights = services["insight_store"].get_latest_insights()
+        if not insights:
+            insights = await services["insight_scheduler"].refresh()
+        narrator = services["narrator"]
+        if narrate and narrator:
+            narrated = await asyncio.gather(
+                *(narrator.narrate_insight(insight) for insight in insights)
+            )
+            insights = [new or old for new, old in zip(narrated, insights)]
+        return [insight_to_dict(insight) for insight in insights]
     except Exception as e:
         return [{"error": str(e), "insights": []}]
 
 
 @app.get("/api/analytics/peru-asia")
-async def get_peru_asia_analytics() -> Dict[str, Any]:
+async def get_peru_asia_analytics(
+    request: Request, response: Response
+) -> Dict[str, Any]:
     """API: Análisis específico del corredor Perú-Asia"""
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+
     try:
         data_adapter = services["data_adapter"]
 
@@ -289,8 +593,14 @@ async def get_peru_asia_analytics() -> Dict[str, Any]:
 
 
 @app.get("/api/efficiency")
-async def get_efficiency_metrics() -> Dict[str, Any]:
+async def get_efficiency_metrics(
+    request: Request, response: Response
+) -> Dict[str, Any]:
     """API: Métricas de eficiencia del puerto"""
+    cached = not_modified(request, response)
+    if cached:
+        return cached
+
     try:
         efficiency_service = services["efficiency_service"]
         data_adapter = services["data_adapter"]
@@ -319,7 +629,7 @@ async def get_efficiency_metrics() -> Dict[str, Any]:
 
 
 @app.post("/api/container/{container_id}/update")
-async def update_container_progress(
+def update_container_progress(
     container_id: str, update_data: ContainerProgressUpdate
 ):
     """API: Actualizar progreso de contenedor"""
@@ -334,12 +644,51 @@ async def update_container_progress(
         else:
             raise HTTPException(status_code=404, detail="Contenedor no encontrado")
 
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/containers/progress")
+def update_containers_progress(update_data: BulkProgressUpdate):
+    """API: Actualizar progreso de varios contenedores (reporte de grúas)"""
+    try:
+        container_service = services["container_service"]
+        results = container_service.update_unloading_progress_bulk(
+            {item.container_id: item.progress for item in update_data.updates}
+        )
+
+        return {
+            "success": True,
+            "updated": sum(results.values()),
+            "failed": [cid for cid, ok in results.items() if not ok],
+        }
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/manifests/import")
+async def import_manifest(request: Request):
+    """API: Importar manifiesto CSV de un barco (cuerpo text/csv)"""
+    try:
+        body = await request.body()
+        # Parseo y escritura bloqueantes (lock entre workers): fuera del loop
+        result = await asyncio.to_thread(
+            PandasManifestLoader().ingest, io.BytesIO(body), services["data_adapter"]
+        )
+        services["events"].publish("containers", result.summary())
+        return {"success": True, **result.summary()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/crane/assign")
-async def assign_crane(assignment_data: CraneAssignment):
+def assign_crane(assignment_data: CraneAssignment):
     """API: Asignar grúa inteligentemente"""
     try:
         container_service = services["container_service"]
@@ -352,6 +701,70 @@ async def assign_crane(assignment_data: CraneAssignment):
         else:
             raise HTTPException(status_code=400, detail="No se pudo asignar grúa")
 
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/crane/assign/batch")
+def assign_cranes_batch():
+    """API: Planificar las grúas para todos los contenedores atracados"""
+    try:
+        plan = services["container_service"].assign_cranes_batch()
+        return {
+            "success": True,
+            "asignados": plan.started,
+            "colas": plan.queues,
+            "makespan_horas": round(plan.makespan_hours, 2),
+        }
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def berth_assignment_to_dict(assignment) -> Dict[str, Any]:
+    """Serializar un atraque planificado"""
+    return {
+        "ship_id": assignment.ship_id,
+        "ship_name": assignment.ship_name,
+        "muelle": assignment.berth,
+        "llegada": assignment.arrival.strftime("%Y-%m-%d %H:%M"),
+        "inicio": assignment.start.strftime("%Y-%m-%d %H:%M"),
+        "fin": assignment.end.strftime("%Y-%m-%d %H:%M"),
+        "espera_horas": round(assignment.waiting_hours(), 2),
+    }
+
+
+@app.get("/api/berths/schedule")
+async def get_berth_schedule() -> Dict[str, Any]:
+    """API: Plan de atraques en los muelles (mínima espera total)"""
+    try:
+        schedule = services["berth_service"].get_berth_schedule()
+        return {
+            "muelles": PUERTO_CONFIG["muelles"],
+            "espera_total_horas": round(
+                sum(assignment.waiting_hours() for assignment in schedule), 2
+            ),
+            "atraques": [berth_assignment_to_dict(a) for a in schedule],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/ships/{ship_id}/eta")
+def update_ship_eta(ship_id: str, update_data: ShipEtaUpdate):
+    """API: Actualizar la ETA de un barco (replanifica los muelles)"""
+    try:
+        berth_service = services["berth_service"]
+        success = berth_service.update_ship_eta(ship_id, update_data.eta)
+
+        if success:
+            return {"success": True, "message": "ETA actualizada"}
+        else:
+            raise HTTPException(status_code=404, detail="Barco no encontrado")
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -366,6 +779,7 @@ async def get_system_status() -> Dict[str, Any]:
             "framework": "FastAPI",
             "arquitectura": "Hexagonal",
             "ia_integrada": "OpenAI GPT-4o mini",
+            "modo_ia": AI_CONFIG["mode"],
             "estado": "operativo",
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "servicios": {
@@ -374,6 +788,14 @@ async def get_system_status() -> Dict[str, Any]:
                 "data_management": "activo",
                 "efficiency_monitoring": "activo",
             },
+            "carga_datos": services["data_adapter"].load_stats,
+            "suscriptores_push": services["events"].subscriber_count,
+            "cache_insights": services["insight_cache"].stats(),
+            "coalescencia_ia": {
+                mode: flights.stats()
+                for mode, flights in services["ai_flights"].items()
+            },
+            "precalculo_insights": services["insight_scheduler"].stats(),
             "documentacion": {"swagger_ui": "/docs", "redoc": "/redoc"},
         }
     except Exception as e:
@@ -390,12 +812,32 @@ async def startup_event():
 
     print("🚢 Iniciando Puerto de Chancay Container Tracker...")
     print(f"📍 Puerto: {PUERTO_CONFIG['nombre']}, {PUERTO_CONFIG['pais']}")
-    print(f"🤖 IA: OpenAI GPT-4o mini integrado")
+    print(f"🤖 IA: OpenAI GPT-4o mini integrado (modo {AI_CONFIG['mode']})")
     print(f"🏗️ Arquitectura: Hexagonal")
     print(f"🌐 Corredor: Perú-Asia")
     print(f"⚡ Framework: FastAPI")
     print(f"📖 Documentación: http://localhost:{FLASK_CONFIG['port']}/docs")
 
+    # Canal push del dashboard
+    services["push_task"] = asyncio.create_task(push_changes())
+
+    # Precálculo de insights de IA
+    services["insight_scheduler"].start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Detener las tareas de fondo y consolidar el journal de datos"""
+    push_task = services.pop("push_task", None)
+    if push_task:
+        push_task.cancel()
+    await services["insight_scheduler"].stop()
+    services["data_adapter"].close()
+    await services["async_ai_adapter"].aclose()
+    if services["narrator"]:
+        await services["narrator"].aclose()
+    services["insight_cache"].close()
+
 
 if __name__ == "__main__":
     import uvicorn
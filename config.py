@@ -52,6 +52,37 @@ TIPOS_CARGA_PERU = [
     "Productos químicos",  # Industria
 ]
 
+# Backend de datos: "csv" (por defecto) o "sqlite"
+DATA_CONFIG = {
+    "backend": os.getenv("CHANCAY_DATA_BACKEND", "csv"),
+    "csv_path": "data/",
+    "sqlite_path": os.getenv("CHANCAY_SQLITE_PATH", "data/chancay.db"),
+}
+
+# Motor de análisis: "llm" (GPT-4o mini con respaldo local), "local" (modelos
+# numéricos, sin red) o "tiered" (cálculo local; el LLM solo redacta a pedido)
+AI_CONFIG = {"mode": os.getenv("CHANCAY_AI_MODE", "llm")}
+
+# Caché de insights de IA (TTL en segundos por análisis; path=None: solo memoria)
+AI_CACHE_CONFIG = {
+    "max_bytes": 4 * 1024 * 1024,
+    "path": "data/ai_insights_cache.json",
+    "ttls": {
+        "congestion": 300,
+        "crane_allocation": 300,
+        "cargo_patterns": 1800,
+        "efficiency": 900,
+    },
+}
+
+# Precálculo de insights en segundo plano: cada "interval" segundos o antes si
+# hubo más de "change_threshold" cambios (revisado cada "check_interval")
+AI_SCHEDULER_CONFIG = {"interval": 300, "change_threshold": 50, "check_interval": 5}
+
+# Asignación de muelles: ritmo de operación por muelle y horas de maniobra
+# (amarre y desamarre) que se suman a cada atraque
+BERTH_CONFIG = {"containers_per_hour": 75.0, "maneuver_hours": 2.0}
+
 # Configuración Flask
 FLASK_CONFIG = {"host": "0.0.0.0", "port": 5000, "debug": True}
 
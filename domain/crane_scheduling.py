@@ -0,0 +1,198 @@
+"""
+Domain Layer - Planificación de grúas del muelle
+Arquitectura Hexagonal - Puerto de Chancay
+"""
+
+import heapq
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .entities import Container, Prioridad, TipoCarga
+
+
+PRIORITY_RANK = {
+    Prioridad.CRITICA: 0,
+    Prioridad.ALTA: 1,
+    Prioridad.MEDIA: 2,
+    Prioridad.BAJA: 3,
+}
+
+# Dentro de una misma prioridad: perecibles y peligrosos dejan el muelle primero
+CARGO_RANK = {
+    TipoCarga.AGRICOLA: 0,
+    TipoCarga.QUIMICOS: 1,
+    TipoCarga.MANUFACTURA: 2,
+    TipoCarga.TEXTILES: 3,
+    TipoCarga.GENERAL: 4,
+    TipoCarga.MINERALES: 5,
+}
+
+
+def crane_ids(count: int) -> List[str]:
+    """IDs de las grúas del muelle (Grua-01, Grua-02, ...)"""
+    return [f"Grua-{i + 1:02d}" for i in range(count)]
+
+
+def unload_hours(container: Container) -> int:
+    """Horas de grúa de un contenedor (ninguna descarga es instantánea)"""
+    return max(1, container.get_estimated_unload_time())
+
+
+def queue_key(container: Container) -> Tuple:
+    """Orden de atención: prioridad, tipo de carga y descarga más corta"""
+    return (
+        PRIORITY_RANK[container.priority],
+        CARGO_RANK.get(container.cargo_type, len(CARGO_RANK)),
+        unload_hours(container),
+        container.eta,
+        container.container_id,
+    )
+
+
+def remaining_hours(unloading: Iterable[Container]) -> Dict[str, float]:
+    """Horas de trabajo pendiente por grúa según el avance de cada descarga"""
+    hours: Dict[str, float] = {}
+    for container in unloading:
+        if container.crane_assigned:
+            left = unload_hours(container) * (100 - container.progress_percent) / 100
+            hours[container.crane_assigned] = (
+                hours.get(container.crane_assigned, 0.0) + left
+            )
+    return hours
+
+
+@dataclass(slots=True)
+class CranePlan:
+    """Plan de descarga de un lote de contenedores atracados"""
+
+    queues: Dict[str, List[str]]  # grúa -> contenedores en orden de atención
+    finish_hours: Dict[str, float]  # grúa -> horas hasta vaciar su cola
+    started: Dict[str, str] = field(default_factory=dict)  # contenedor -> grúa
+
+    @property
+    def makespan_hours(self) -> float:
+        """Horas hasta que termina la última grúa"""
+        return max(self.finish_hours.values(), default=0.0)
+
+
+class CraneScheduler:
+    """Estado de las grúas del muelle y asignación de contenedores
+
+    Las grúas libres viven en un diccionario ordenado: consultar, tomar la
+    que lleva más tiempo libre y liberar son O(1). Las ocupadas se guardan
+    como grúa -> contenedores, con el índice inverso contenedor -> grúa.
+    """
+
+    def __init__(self, cranes: Iterable[str]):
+        self.cranes = list(cranes)
+        self._known = set(self.cranes)
+        self._free: "OrderedDict[str, None]" = OrderedDict.fromkeys(self.cranes)
+        self._busy: Dict[str, Set[str]] = {}
+        self._crane_of: Dict[str, str] = {}
+
+    def is_available(self, crane_id: str) -> bool:
+        """Si la grúa está libre"""
+        return crane_id in self._free
+
+    def available_cranes(self) -> List[str]:
+        """Grúas libres, la que lleva más tiempo sin trabajo primero"""
+        return list(self._free)
+
+    def crane_of(self, container_id: str) -> Optional[str]:
+        """Grúa que descarga un contenedor (None si no tiene)"""
+        return self._crane_of.get(container_id)
+
+    def sync(self, unloading: Iterable[Container]) -> None:
+        """Reconstruir el estado desde los contenedores en descarga
+
+        Las grúas que siguen libres conservan su orden; las que se liberaron
+        desde la última sincronización pasan al final.
+        """
+        self._free = OrderedDict.fromkeys([*self._free, *self.cranes])
+        self._busy = {}
+        self._crane_of = {}
+        for container in unloading:
+            if container.crane_assigned:
+                self._occupy(container.crane_assigned, container.container_id)
+
+    def acquire(
+        self, container_id: str, crane_id: Optional[str] = None
+    ) -> Optional[str]:
+        """Tomar una grúa libre para el contenedor
+
+        Sin ``crane_id`` se toma la que lleva más tiempo libre. Retorna la
+        grúa asignada, o None si no hay (o la pedida está ocupada).
+        """
+        if container_id in self._crane_of:
+            return self._crane_of[container_id]
+        if crane_id is None:
+            if not self._free:
+                return None
+            crane_id = next(iter(self._free))
+        elif crane_id not in self._free:
+            return None
+        self._occupy(crane_id, container_id)
+        return crane_id
+
+    def release(self, container_id: str) -> Optional[str]:
+        """Liberar la grúa de un contenedor terminado"""
+        crane_id = self._crane_of.pop(container_id, None)
+        if crane_id is None:
+            return None
+        containers = self._busy[crane_id]
+        containers.discard(container_id)
+        if not containers:
+            del self._busy[crane_id]
+            if crane_id in self._known:
+                self._free[crane_id] = None  # Al final: se reparte el desgaste
+        return crane_id
+
+    def plan(
+        self,
+        containers: List[Container],
+        busy_hours: Optional[Dict[str, float]] = None,
+    ) -> CranePlan:
+        """Repartir un lote minimizando el makespan y ordenar cada cola
+
+        Se reparte por niveles de prioridad (críticos primero, así toman las
+        grúas que se liberan antes) y dentro de cada nivel con la regla LPT:
+        de la descarga más larga a la más corta, cada contenedor va a la grúa
+        que termina antes (a lo sumo 4/3 del makespan óptimo). Las grúas
+        ocupadas parten de sus ``busy_hours`` pendientes. Los primeros de la
+        cola de cada grúa libre quedan en ``started``.
+        """
+        busy_hours = busy_hours or {}
+        heap = [
+            (0.0 if crane in self._free else busy_hours.get(crane, 0.0), index)
+            for index, crane in enumerate(self.cranes)
+        ]
+        heapq.heapify(heap)
+        queues: Dict[str, List[Container]] = {crane: [] for crane in self.cranes}
+
+        tiers: Dict[int, List[Container]] = {}
+        for container in containers:
+            tiers.setdefault(PRIORITY_RANK[container.priority], []).append(container)
+        for rank in sorted(tiers):
+            batch = sorted(tiers[rank], key=lambda c: (-unload_hours(c), queue_key(c)))
+            for container in batch:
+                finish, index = heapq.heappop(heap)
+                queues[self.cranes[index]].append(container)
+                heapq.heappush(heap, (finish + unload_hours(container), index))
+
+        finish_hours = {self.cranes[index]: finish for finish, index in heap}
+        plan = CranePlan(queues={}, finish_hours={})
+        for crane, queue in queues.items():
+            if not queue:
+                continue
+            # El orden dentro de la grúa no cambia su hora de término
+            queue.sort(key=queue_key)
+            plan.queues[crane] = [c.container_id for c in queue]
+            plan.finish_hours[crane] = finish_hours[crane]
+            if crane in self._free:
+                plan.started[queue[0].container_id] = crane
+        return plan
+
+    def _occupy(self, crane_id: str, container_id: str) -> None:
+        self._free.pop(crane_id, None)
+        self._busy.setdefault(crane_id, set()).add(container_id)
+        self._crane_of[container_id] = crane_id
@@ -3,6 +3,7 @@ Domain Layer - Entidades del Puerto de Chancay
 Arquitectura Hexagonal
 """
 
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -34,9 +35,14 @@ class Prioridad(Enum):
     CRITICA = "critica"
 
 
-@dataclass
+@dataclass(slots=True)
 class Container:
-    """Entidad Container - Núcleo del dominio"""
+    """Entidad Container - Núcleo del dominio
+
+    Usa ``__slots__`` (sin ``__dict__`` por instancia) e interna los strings
+    repetidos (barco, puertos, grúa) para reducir memoria con cientos de
+    miles de contenedores residentes.
+    """
 
     container_id: str
     ship_name: str
@@ -51,6 +57,7 @@ class Container:
     crane_assigned: Optional[str] = None
     temperature_controlled: bool = False
     customs_cleared: bool = False
+    version: int = 0  # Control de concurrencia optimista (lo asigna el repositorio)
 
     def __post_init__(self):
         """Validaciones de negocio"""
@@ -58,12 +65,78 @@ class Container:
             raise ValueError("El peso debe ser positivo")
         if not (0 <= self.progress_percent <= 100):
             raise ValueError("El progreso debe estar entre 0 y 100")
+        self.ship_name = sys.intern(self.ship_name)
+        self.origin_port = sys.intern(self.origin_port)
+        self.destination_port = sys.intern(self.destination_port)
+        if self.crane_assigned is not None:
+            self.crane_assigned = sys.intern(self.crane_assigned)
+
+    @classmethod
+    def from_trusted(
+        cls,
+        container_id: str,
+        ship_name: str,
+        origin_port: str,
+        destination_port: str,
+        cargo_type: TipoCarga,
+        weight_kg: float,
+        status: ContainerStatus,
+        eta: datetime,
+        priority: Prioridad,
+        progress_percent: int = 0,
+        crane_assigned: Optional[str] = None,
+        temperature_controlled: bool = False,
+        customs_cleared: bool = False,
+        version: int = 0,
+    ) -> "Container":
+        """Construcción rápida sin revalidar, para datos de almacenamiento
+
+        Solo debe usarse con datos que ya pasaron las validaciones de
+        negocio al persistirse (snapshot binario, base de datos, copias).
+        """
+        container = object.__new__(cls)
+        container.container_id = container_id
+        container.ship_name = sys.intern(ship_name)
+        container.origin_port = sys.intern(origin_port)
+        container.destination_port = sys.intern(destination_port)
+        container.cargo_type = cargo_type
+        container.weight_kg = weight_kg
+        container.status = status
+        container.eta = eta
+        container.priority = priority
+        container.progress_percent = progress_percent
+        container.crane_assigned = (
+            sys.intern(crane_assigned) if crane_assigned is not None else None
+        )
+        container.temperature_controlled = temperature_controlled
+        container.customs_cleared = customs_cleared
+        container.version = version
+        return container
+
+    def clone(self) -> "Container":
+        """Copia superficial rápida (todos los campos son inmutables)"""
+        return Container.from_trusted(
+            self.container_id,
+            self.ship_name,
+            self.origin_port,
+            self.destination_port,
+            self.cargo_type,
+            self.weight_kg,
+            self.status,
+            self.eta,
+            self.priority,
+            self.progress_percent,
+            self.crane_assigned,
+            self.temperature_controlled,
+            self.customs_cleared,
+            self.version,
+        )
 
     def assign_crane(self, crane_id: str) -> None:
         """Asignar grúa para descarga"""
         if self.status != ContainerStatus.ATRACADO:
             raise ValueError("Solo se puede asignar grúa a contenedores atracados")
-        self.crane_assigned = crane_id
+        self.crane_assigned = sys.intern(crane_id)
         self.status = ContainerStatus.DESCARGANDO
 
     def update_progress(self, progress: int) -> None:
@@ -91,7 +164,7 @@ class Container:
         return int(base_time * weight_factor)
 
 
-@dataclass
+@dataclass(slots=True)
 class Ship:
     """Entidad Ship - Embarcación"""
 
@@ -107,6 +180,45 @@ class Ship:
     def __post_init__(self):
         if self.containers_count > self.max_capacity:
             raise ValueError("Contenedores exceden capacidad")
+        self.origin_port = sys.intern(self.origin_port)
+        self.current_status = sys.intern(self.current_status)
+
+    @classmethod
+    def from_trusted(
+        cls,
+        ship_id: str,
+        name: str,
+        captain: str,
+        origin_port: str,
+        containers_count: int,
+        max_capacity: int,
+        current_status: str,
+        eta_chancay: datetime,
+    ) -> "Ship":
+        """Construcción rápida sin revalidar, para datos de almacenamiento"""
+        ship = object.__new__(cls)
+        ship.ship_id = ship_id
+        ship.name = name
+        ship.captain = captain
+        ship.origin_port = sys.intern(origin_port)
+        ship.containers_count = containers_count
+        ship.max_capacity = max_capacity
+        ship.current_status = sys.intern(current_status)
+        ship.eta_chancay = eta_chancay
+        return ship
+
+    def clone(self) -> "Ship":
+        """Copia superficial rápida (todos los campos son inmutables)"""
+        return Ship.from_trusted(
+            self.ship_id,
+            self.name,
+            self.captain,
+            self.origin_port,
+            self.containers_count,
+            self.max_capacity,
+            self.current_status,
+            self.eta_chancay,
+        )
 
     def get_load_percentage(self) -> float:
         """Porcentaje de carga del barco"""
@@ -117,7 +229,7 @@ class Ship:
         return self.containers_count > self.max_capacity * 0.95
 
 
-@dataclass
+@dataclass(slots=True)
 class PortOperation:
     """Entidad PortOperation - Operación portuaria"""
 
@@ -143,7 +255,23 @@ class PortOperation:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
+class BerthAssignment:
+    """Entidad BerthAssignment - Turno de un barco en un muelle"""
+
+    ship_id: str
+    ship_name: str
+    berth: str
+    arrival: datetime  # ETA, o el inicio del plan si la ETA ya pasó
+    start: datetime
+    end: datetime
+
+    def waiting_hours(self) -> float:
+        """Horas de espera en fondeadero antes de atracar"""
+        return (self.start - self.arrival).total_seconds() / 3600
+
+
+@dataclass(slots=True)
 class AIInsight:
     """Entidad AIInsight - Insights generados por IA"""
 
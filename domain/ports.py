@@ -4,9 +4,30 @@ Arquitectura Hexagonal - Puerto de Chancay
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Callable, Iterator, Tuple
 from datetime import datetime
-from .entities import Container, Ship, PortOperation, AIInsight
+from .entities import Container, Ship, PortOperation, AIInsight, BerthAssignment
+
+
+class VersionConflictError(Exception):
+    """La versión del contenedor cambió desde que se leyó (escritura concurrente)"""
+
+    def __init__(self, container_ids: List[str]):
+        self.container_ids = container_ids
+        super().__init__(
+            f"Conflicto de versión en contenedores: {', '.join(container_ids)}"
+        )
+
+
+@dataclass
+class ChangeSet:
+    """Contenedores y barcos modificados después de una secuencia de cambio"""
+
+    seq: int  # Secuencia actual: usar como ``since`` en la próxima consulta
+    containers: List[Container]
+    ships: List[Ship]
+    full: bool = False  # True: es el estado completo (reemplazar el espejo local)
 
 
 class ContainerRepositoryPort(ABC):
@@ -17,6 +38,13 @@ class ContainerRepositoryPort(ABC):
         """Obtener todos los contenedores"""
         pass
 
+    @abstractmethod
+    def iter_containers(
+        self, filter: Optional[Callable[[Container], bool]] = None
+    ) -> Iterator[Container]:
+        """Recorrer contenedores uno a uno sin materializar la lista"""
+        pass
+
     @abstractmethod
     def get_container_by_id(self, container_id: str) -> Optional[Container]:
         """Obtener contenedor por ID"""
@@ -27,9 +55,45 @@ class ContainerRepositoryPort(ABC):
         """Obtener contenedores por estado"""
         pass
 
+    @abstractmethod
+    def get_containers_by_ship(self, ship_name: str) -> List[Container]:
+        """Obtener contenedores de una embarcación"""
+        pass
+
+    @abstractmethod
+    def get_containers_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: str = "container_id",
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        cargo_type: Optional[str] = None,
+        ship_name: Optional[str] = None,
+    ) -> Tuple[List[Container], Optional[str]]:
+        """Obtener una página filtrada y ordenada (paginación por clave)
+
+        ``sort`` acepta "container_id" o "eta" (prefijo "-" = descendente).
+        Retorna la página y el cursor opaco de la siguiente (None al final).
+        Lanza ValueError si el orden, el cursor o un filtro no son válidos.
+        """
+        pass
+
+    @abstractmethod
+    def get_containers_arriving_between(
+        self, start: datetime, end: datetime
+    ) -> List[Container]:
+        """Obtener contenedores con ETA en [start, end], ordenados por ETA"""
+        pass
+
     @abstractmethod
     def update_container(self, container: Container) -> bool:
-        """Actualizar contenedor"""
+        """Actualizar contenedor (compare-and-swap sobre ``container.version``)
+
+        Retorna False si no existe. Si la versión almacenada difiere de la
+        leída lanza ``VersionConflictError`` en lugar de sobrescribir; si
+        se aplica, incrementa ``container.version``.
+        """
         pass
 
     @abstractmethod
@@ -37,6 +101,32 @@ class ContainerRepositoryPort(ABC):
         """Agregar nuevo contenedor"""
         pass
 
+    @abstractmethod
+    def update_containers_bulk(self, containers: List[Container]) -> int:
+        """Actualizar varios contenedores con una sola persistencia
+
+        Retorna la cantidad de contenedores existentes que se actualizaron.
+        El lote es atómico: si alguna versión no coincide lanza
+        ``VersionConflictError`` sin aplicar ningún cambio.
+        """
+        pass
+
+    @abstractmethod
+    def add_containers_bulk(self, containers: List[Container]) -> int:
+        """Agregar varios contenedores con una sola persistencia"""
+        pass
+
+    @abstractmethod
+    def claim_cranes(self, containers: List[Container]) -> int:
+        """Persistir contenedores que empiezan a descargar con su grúa
+
+        Igual que ``update_containers_bulk``, y en la misma transacción
+        verifica que ninguna de las grúas esté descargando otro contenedor
+        (asignada por este u otro worker); si alguna lo está lanza
+        ``VersionConflictError`` sin aplicar ningún cambio.
+        """
+        pass
+
 
 class ShipTrackingPort(ABC):
     """Puerto para seguimiento de embarcaciones"""
@@ -46,6 +136,13 @@ class ShipTrackingPort(ABC):
         """Obtener todas las embarcaciones"""
         pass
 
+    @abstractmethod
+    def iter_ships(
+        self, filter: Optional[Callable[[Ship], bool]] = None
+    ) -> Iterator[Ship]:
+        """Recorrer embarcaciones una a una sin materializar la lista"""
+        pass
+
     @abstractmethod
     def get_ship_by_id(self, ship_id: str) -> Optional[Ship]:
         """Obtener embarcación por ID"""
@@ -56,11 +153,50 @@ class ShipTrackingPort(ABC):
         """Obtener embarcaciones que llegan"""
         pass
 
+    @abstractmethod
+    def get_ships_arriving_between(self, start: datetime, end: datetime) -> List[Ship]:
+        """Obtener embarcaciones con ETA en [start, end], ordenadas por ETA"""
+        pass
+
+    @abstractmethod
+    def add_ship(self, ship: Ship) -> bool:
+        """Agregar (o reemplazar) embarcación"""
+        pass
+
     @abstractmethod
     def update_ship_status(self, ship_id: str, status: str) -> bool:
         """Actualizar estado de embarcación"""
         pass
 
+    @abstractmethod
+    def update_ship_eta(self, ship_id: str, eta: datetime) -> bool:
+        """Actualizar ETA de embarcación"""
+        pass
+
+
+class ChangeFeedPort(ABC):
+    """Puerto para sincronización incremental (delta) de contenedores y barcos"""
+
+    @abstractmethod
+    def get_changes_since(self, since: Optional[int]) -> ChangeSet:
+        """Obtener lo modificado con secuencia mayor a ``since``
+
+        Si ``since`` es None, anterior al historial disponible o posterior a
+        la secuencia actual, retorna el estado completo con ``full=True``.
+        """
+        pass
+
+    @abstractmethod
+    def get_data_version(self) -> str:
+        """Token opaco que cambia con cada modificación de contenedores o
+        barcos (base para ETags); debe ser barato de obtener"""
+        pass
+
+    @abstractmethod
+    def get_change_seq(self) -> int:
+        """Secuencia de cambios actual, sin materializar entidades"""
+        pass
+
 
 class AIAnalyticsPort(ABC):
     """Puerto para análisis con IA (GPT-4o mini)"""
@@ -93,6 +229,75 @@ class AIAnalyticsPort(ABC):
         pass
 
 
+class AsyncAIAnalyticsPort(ABC):
+    """Puerto asíncrono para análisis con IA (consultas concurrentes)"""
+
+    @abstractmethod
+    async def predict_port_congestion(self, current_data: Dict[str, Any]) -> AIInsight:
+        """Predecir congestión portuaria"""
+        pass
+
+    @abstractmethod
+    async def recommend_crane_allocation(
+        self, containers: List[Container]
+    ) -> AIInsight:
+        """Recomendar asignación de grúas"""
+        pass
+
+    @abstractmethod
+    async def analyze_cargo_patterns(self, containers: List[Container]) -> AIInsight:
+        """Analizar patrones de carga Perú-Asia"""
+        pass
+
+    @abstractmethod
+    async def generate_efficiency_insights(
+        self, operations: List[PortOperation]
+    ) -> AIInsight:
+        """Generar insights de eficiencia"""
+        pass
+
+    @abstractmethod
+    async def predict_delays(self, ship: Ship, weather_data: Dict) -> AIInsight:
+        """Predecir demoras potenciales"""
+        pass
+
+
+class InsightNarrationPort(ABC):
+    """Puerto para redactar en lenguaje natural insights ya calculados"""
+
+    @abstractmethod
+    async def narrate_insight(self, insight: AIInsight) -> Optional[AIInsight]:
+        """Mismo insight (cifras intactas) con título y descripción redactados
+
+        ``None`` si no se pudo redactar (quien llama conserva el original).
+        """
+        pass
+
+
+class BerthAllocationPort(ABC):
+    """Puerto para asignación de muelles a los barcos"""
+
+    @abstractmethod
+    def schedule(self, ships: List[Ship], now: datetime) -> List[BerthAssignment]:
+        """Planificar desde cero los atraques de los barcos activos"""
+        pass
+
+    @abstractmethod
+    def reschedule(
+        self, changed: List[Ship], now: datetime
+    ) -> List[BerthAssignment]:
+        """Replanificar con barcos nuevos, modificados o ya retirados
+
+        Los atraques que empiezan antes del primer cambio se mantienen.
+        """
+        pass
+
+    @abstractmethod
+    def get_schedule(self) -> List[BerthAssignment]:
+        """Obtener el plan vigente ordenado por inicio de atraque"""
+        pass
+
+
 class NotificationPort(ABC):
     """Puerto para notificaciones"""
 
@@ -106,6 +311,11 @@ class NotificationPort(ABC):
         """Enviar actualización de estado"""
         pass
 
+    @abstractmethod
+    def send_status_updates(self, updates: Dict[str, str]) -> bool:
+        """Enviar un lote de actualizaciones de estado (container_id → estado)"""
+        pass
+
     @abstractmethod
     def send_ai_insight(self, insight: AIInsight) -> bool:
         """Enviar insight de IA"""
@@ -163,3 +373,31 @@ class DataAnalyticsPort(ABC):
     def get_route_analytics(self) -> Dict[str, Any]:
         """Obtener análisis de rutas Perú-Asia"""
         pass
+
+
+class EventPublisherPort(ABC):
+    """Puerto para publicar cambios de estado a suscriptores en tiempo real"""
+
+    @abstractmethod
+    def publish(self, topic: str, payload: Dict[str, Any]) -> None:
+        """Publicar un cambio (no bloqueante; puede llamarse desde cualquier hilo)"""
+        pass
+
+
+class InsightStorePort(ABC):
+    """Puerto para guardar los últimos insights precalculados"""
+
+    @abstractmethod
+    def save_insights(self, insights: List[AIInsight]) -> None:
+        """Reemplazar los insights vigentes"""
+        pass
+
+    @abstractmethod
+    def get_latest_insights(self) -> List[AIInsight]:
+        """Obtener los insights vigentes (vacío si aún no se generaron)"""
+        pass
+
+    @abstractmethod
+    def get_updated_at(self) -> Optional[datetime]:
+        """Momento de la última actualización"""
+        pass
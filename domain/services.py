@@ -3,29 +3,41 @@ Domain Layer - Services
 Arquitectura Hexagonal - Puerto de Chancay
 """
 
-from typing import List, Dict, Any, Optional
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from .entities import (
     Container,
     Ship,
     PortOperation,
     AIInsight,
+    BerthAssignment,
     ContainerStatus,
     Prioridad,
 )
+from .crane_scheduling import CranePlan, CraneScheduler, crane_ids, remaining_hours
 from .ports import (
     ContainerRepositoryPort,
     ShipTrackingPort,
     AIAnalyticsPort,
+    AsyncAIAnalyticsPort,
     NotificationPort,
     PortOperationsPort,
     DataAnalyticsPort,
+    EventPublisherPort,
+    ChangeFeedPort,
+    BerthAllocationPort,
+    VersionConflictError,
 )
 
 
 class ContainerTrackingService:
     """Servicio principal para tracking de contenedores"""
 
+    # Reintentos ante escrituras concurrentes (el progreso es idempotente:
+    # se relee el contenedor y se vuelve a aplicar el mismo valor)
+    MAX_CONFLICT_RETRIES = 3
+
     def __init__(
         self,
         container_repo: ContainerRepositoryPort,
@@ -33,12 +45,16 @@ class ContainerTrackingService:
         ai_analytics: AIAnalyticsPort,
         notifications: NotificationPort,
         operations: PortOperationsPort,
+        events: Optional[EventPublisherPort] = None,
+        cranes: Optional[CraneScheduler] = None,
     ):
         self.container_repo = container_repo
         self.ship_tracking = ship_tracking
         self.ai_analytics = ai_analytics
         self.notifications = notifications
         self.operations = operations
+        self.events = events
+        self.cranes = cranes or CraneScheduler(crane_ids(12))  # 12 grúas en Chancay
 
     def process_arriving_container(self, container: Container) -> bool:
         """Procesar llegada de contenedor"""
@@ -46,6 +62,7 @@ class ContainerTrackingService:
             # Actualizar estado
             container.status = ContainerStatus.LLEGANDO
             self.container_repo.update_container(container)
+            self._publish_changes([container.container_id])
 
             # Generar recomendación de grúa con IA
             containers_waiting = self.container_repo.get_containers_by_status(
@@ -72,86 +89,253 @@ class ContainerTrackingService:
             return False
 
         container.status = ContainerStatus.ATRACADO
-        return self.container_repo.update_container(container)
-
-    def assign_crane_intelligently(self, container_id: str) -> bool:
-        """Asignar grúa usando IA"""
-        container = self.container_repo.get_container_by_id(container_id)
-        if not container:
-            return False
-
-        # Obtener recomendación de IA
-        crane_assignments = self.operations.get_crane_assignments()
-        containers_waiting = self.container_repo.get_containers_by_status("atracado")
-
-        recommendation = self.ai_analytics.recommend_crane_allocation(
-            containers_waiting
-        )
-
-        # Asignar grúa disponible
-        available_cranes = self._get_available_cranes(crane_assignments)
-        if available_cranes:
-            crane_id = available_cranes[0]
-            container.assign_crane(crane_id)
-            self.container_repo.update_container(container)
-            self.operations.assign_crane(container_id, crane_id)
-            return True
+        updated = self.container_repo.update_container(container)
+        if updated:
+            self._publish_changes([container_id])
+        return updated
+
+    def assign_crane_intelligently(
+        self, container_id: str, crane_id: Optional[str] = None
+    ) -> bool:
+        """Asignar la grúa libre que lleva más tiempo sin trabajo
+
+        Con ``crane_id`` se pide esa grúa; falla si no está libre.
+        """
+        for attempt in range(self.MAX_CONFLICT_RETRIES):
+            container = self.container_repo.get_container_by_id(container_id)
+            if not container or container.status != ContainerStatus.ATRACADO:
+                return False
+
+            self._sync_cranes()
+            assigned = self.cranes.acquire(container_id, crane_id)
+            if assigned is None:
+                return False
+
+            container.assign_crane(assigned)
+            try:
+                self.container_repo.claim_cranes([container])
+                break
+            except VersionConflictError:
+                # Otro worker tomó la grúa o el contenedor: se relee y reintenta
+                self.cranes.release(container_id)
+                if attempt == self.MAX_CONFLICT_RETRIES - 1:
+                    raise
+            except Exception:
+                self.cranes.release(container_id)
+                raise
+
+        if self.operations:
+            self.operations.assign_crane(container_id, assigned)
+        self._publish_changes([container_id])
+        return True
 
-        return False
+    def get_available_cranes(self) -> List[str]:
+        """Grúas libres, la que lleva más tiempo sin trabajo primero"""
+        self._sync_cranes()
+        return self.cranes.available_cranes()
+
+    def assign_cranes_batch(self) -> CranePlan:
+        """Planificar todos los contenedores atracados de una vez
+
+        Las grúas libres empiezan ya con el primero de su cola; el resto
+        sigue atracado y el plan indica su grúa y orden de atención.
+        """
+        for attempt in range(self.MAX_CONFLICT_RETRIES):
+            unloading = self._sync_cranes()
+            docked = self.container_repo.get_containers_by_status("atracado")
+            plan = self.cranes.plan(docked, remaining_hours(unloading))
+
+            by_id = {container.container_id: container for container in docked}
+            started = []
+            for container_id, crane_id in plan.started.items():
+                container = by_id[container_id]
+                container.assign_crane(crane_id)
+                self.cranes.acquire(container_id, crane_id)
+                started.append(container)
+
+            if not started:
+                return plan
+            try:
+                self.container_repo.claim_cranes(started)
+                break
+            except VersionConflictError:
+                self._release_cranes(started)
+                if attempt == self.MAX_CONFLICT_RETRIES - 1:
+                    raise
+            except Exception:
+                self._release_cranes(started)
+                raise
+
+        if self.operations:
+            for container_id, crane_id in plan.started.items():
+                self.operations.assign_crane(container_id, crane_id)
+        self._publish_changes(list(plan.started))
+        return plan
 
     def update_unloading_progress(self, container_id: str, progress: int) -> bool:
         """Actualizar progreso de descarga"""
-        container = self.container_repo.get_container_by_id(container_id)
-        if not container:
-            return False
-
-        container.update_progress(progress)
-        self.container_repo.update_container(container)
-
+        for attempt in range(self.MAX_CONFLICT_RETRIES):
+            container = self.container_repo.get_container_by_id(container_id)
+            if not container:
+                return False
+
+            container.update_progress(progress)
+            try:
+                self.container_repo.update_container(container)
+                break
+            except VersionConflictError:
+                if attempt == self.MAX_CONFLICT_RETRIES - 1:
+                    raise
+
+        self._publish_changes([container_id])
         if progress == 100:
-            self.notifications.send_status_update(container_id, "completado")
+            self.cranes.release(container_id)
+            if self.notifications:
+                self.notifications.send_status_update(container_id, "completado")
 
         return True
 
+    def update_unloading_progress_bulk(
+        self, updates: Dict[str, int]
+    ) -> Dict[str, bool]:
+        """Actualizar progreso de varios contenedores con una sola persistencia
+
+        Retorna por cada container_id si la actualización fue aplicada.
+        """
+        for attempt in range(self.MAX_CONFLICT_RETRIES):
+            results = {}
+            changed = []
+            completed = {}
+
+            for container_id, progress in updates.items():
+                container = self.container_repo.get_container_by_id(container_id)
+                if not container:
+                    results[container_id] = False
+                    continue
+                try:
+                    container.update_progress(progress)
+                except ValueError:
+                    results[container_id] = False
+                    continue
+
+                changed.append(container)
+                results[container_id] = True
+                if progress == 100:
+                    completed[container_id] = "completado"
+
+            try:
+                if changed:
+                    self.container_repo.update_containers_bulk(changed)
+                break
+            except VersionConflictError:
+                if attempt == self.MAX_CONFLICT_RETRIES - 1:
+                    raise
+
+        self._publish_changes([c.container_id for c in changed])
+        for container_id in completed:
+            self.cranes.release(container_id)
+        if completed and self.notifications:
+            self.notifications.send_status_updates(completed)
+
+        return results
+
     def get_priority_containers(self) -> List[Container]:
         """Obtener contenedores prioritarios"""
-        all_containers = self.container_repo.get_all_containers()
-        return [c for c in all_containers if c.is_priority_cargo()]
+        return list(
+            self.container_repo.iter_containers(filter=Container.is_priority_cargo)
+        )
+
+    def _publish_changes(self, container_ids: List[str]) -> None:
+        """Avisar a los suscriptores en tiempo real qué contenedores cambiaron"""
+        if self.events and container_ids:
+            self.events.publish("containers", {"container_ids": container_ids})
+
+    def _release_cranes(self, containers: List[Container]) -> None:
+        """Devolver a la caché las grúas de una asignación no persistida"""
+        for container in containers:
+            self.cranes.release(container.container_id)
 
-    def _get_available_cranes(self, assignments: Dict[str, List[str]]) -> List[str]:
-        """Obtener grúas disponibles"""
-        all_cranes = [f"Grua-{i+1:02d}" for i in range(12)]  # 12 grúas en Chancay
-        busy_cranes = []
-        for crane_containers in assignments.values():
-            if crane_containers:  # Si tiene contenedores asignados
-                busy_cranes.append(crane_containers[0])
+    def _sync_cranes(self) -> List[Container]:
+        """Leer del repositorio qué grúas están descargando
 
-        return [crane for crane in all_cranes if crane not in busy_cranes]
+        El repositorio es la fuente de verdad (lo comparten los workers);
+        el ``CraneScheduler`` en memoria es solo una caché que se refresca
+        antes de cada asignación.
+        """
+        unloading = self.container_repo.get_containers_by_status("descargando")
+        self.cranes.sync(unloading)
+        return unloading
 
 
 class AIAnalyticsService:
     """Servicio de análisis con IA"""
 
-    def __init__(self, ai_port: AIAnalyticsPort, data_analytics: DataAnalyticsPort):
+    def __init__(
+        self,
+        ai_port: AIAnalyticsPort,
+        data_analytics: DataAnalyticsPort,
+        container_repo: Optional[ContainerRepositoryPort] = None,
+        operations: Optional[PortOperationsPort] = None,
+        async_ai_port: Optional[AsyncAIAnalyticsPort] = None,
+    ):
         self.ai_port = ai_port
         self.data_analytics = data_analytics
+        self.container_repo = container_repo
+        self.operations = operations
+        self.async_ai_port = async_ai_port
 
     def generate_daily_insights(self) -> List[AIInsight]:
-        """Generar insights diarios"""
-        insights = []
-
-        # Análisis de congestión
-        port_data = self.data_analytics.get_port_overview()
-        congestion_insight = self.ai_port.predict_port_congestion(port_data)
-        insights.append(congestion_insight)
-
-        # Análisis de patrones de carga
-        containers = []  # Se obtendría del repositorio
-        cargo_patterns = self.ai_port.analyze_cargo_patterns(containers)
-        insights.append(cargo_patterns)
+        """Generar insights diarios: congestión, patrones de carga, grúas y
+        eficiencia (las dos últimas solo si hay datos para analizar)"""
+        port_data, containers, waiting, operations = self._insight_inputs()
+
+        insights = [
+            self.ai_port.predict_port_congestion(port_data),
+            self.ai_port.analyze_cargo_patterns(containers),
+        ]
+        if waiting:
+            insights.append(self.ai_port.recommend_crane_allocation(waiting))
+        if operations is not None:
+            insights.append(self.ai_port.generate_efficiency_insights(operations))
 
         return insights
 
+    async def generate_daily_insights_async(self) -> List[AIInsight]:
+        """Igual que ``generate_daily_insights`` con las consultas a la IA en
+        paralelo (requiere ``async_ai_port``)"""
+        # Las lecturas del repositorio son bloqueantes (recorren todos los
+        # contenedores): se hacen en un hilo para no detener el event loop
+        inputs = await asyncio.to_thread(self._insight_inputs)
+        port_data, containers, waiting, operations = inputs
+        ai = self.async_ai_port
+
+        analyses = [
+            ai.predict_port_congestion(port_data),
+            ai.analyze_cargo_patterns(containers),
+        ]
+        if waiting:
+            analyses.append(ai.recommend_crane_allocation(waiting))
+        if operations is not None:
+            analyses.append(ai.generate_efficiency_insights(operations))
+
+        return list(await asyncio.gather(*analyses))
+
+    def _insight_inputs(
+        self,
+    ) -> Tuple[
+        Dict[str, Any], List[Container], List[Container], Optional[List[PortOperation]]
+    ]:
+        """Datos que alimentan los análisis (solo lecturas, sin IA)"""
+        port_data = self.data_analytics.get_port_overview()
+        containers, waiting = [], []
+        if self.container_repo:
+            containers = self.container_repo.get_all_containers()
+            waiting = self.container_repo.get_containers_by_status("atracado")
+        operations = (
+            self.operations.get_active_operations() if self.operations else None
+        )
+        return port_data, containers, waiting, operations
+
     def analyze_peru_asia_trade(self) -> AIInsight:
         """Analizar comercio Perú-Asia"""
         route_data = self.data_analytics.get_route_analytics()
@@ -172,6 +356,52 @@ class AIAnalyticsService:
         )
 
 
+class BerthAllocationService:
+    """Servicio de planificación de atraques en los muelles"""
+
+    def __init__(
+        self,
+        ship_tracking: ShipTrackingPort,
+        change_feed: ChangeFeedPort,
+        allocator: BerthAllocationPort,
+        events: Optional[EventPublisherPort] = None,
+    ):
+        self.ship_tracking = ship_tracking
+        self.change_feed = change_feed
+        self.allocator = allocator
+        self.events = events
+        self._seq: Optional[int] = None
+
+    def get_berth_schedule(self) -> List[BerthAssignment]:
+        """Plan de atraques vigente
+
+        Solo se replanifica si hubo cambios, y con los barcos que cambiaron
+        (ETA, estado o nuevos arribos) según el feed de cambios.
+        """
+        seq = self.change_feed.get_change_seq()
+        if seq == self._seq:
+            return self.allocator.get_schedule()
+
+        now = datetime.now()
+        changes = None
+        if self._seq is not None:
+            changes = self.change_feed.get_changes_since(self._seq)
+        if changes is None or changes.full:
+            schedule = self.allocator.schedule(self.ship_tracking.get_all_ships(), now)
+        else:
+            seq = changes.seq
+            schedule = self.allocator.reschedule(changes.ships, now)
+        self._seq = seq
+        return schedule
+
+    def update_ship_eta(self, ship_id: str, eta: datetime) -> bool:
+        """Actualizar la ETA de un barco (el plan se ajusta en la próxima consulta)"""
+        updated = self.ship_tracking.update_ship_eta(ship_id, eta)
+        if updated and self.events:
+            self.events.publish("ships", {"ship_ids": [ship_id]})
+        return updated
+
+
 class PortEfficiencyService:
     """Servicio de eficiencia portuaria"""
 
@@ -0,0 +1,52 @@
+"""
+Pruebas - Ventana de llegadas con fechas con zona horaria
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as api
+from adapters.data_adapter import CSVDataAdapter
+from domain.entities import Container, ContainerStatus, Prioridad, TipoCarga
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    adapter = CSVDataAdapter(f"{tmp_path}/", seed_if_empty=False)
+    monkeypatch.setitem(api.services, "data_adapter", adapter)
+    yield TestClient(api.app)
+    adapter.close()
+
+
+def test_timezone_aware_window_is_normalized(client):
+    eta = datetime(2026, 1, 1, 12, 0)
+    api.services["data_adapter"].add_container(
+        Container(
+            container_id="TEST-001",
+            ship_name="Perú Express",
+            origin_port="Shanghai",
+            destination_port="Chancay",
+            cargo_type=TipoCarga.MINERALES,
+            weight_kg=25000.0,
+            status=ContainerStatus.EN_TRANSITO,
+            eta=eta,
+            priority=Prioridad.ALTA,
+        )
+    )
+    arrival = eta.astimezone(timezone.utc)
+    start, end = arrival - timedelta(hours=1), arrival + timedelta(hours=1)
+
+    response = client.get(
+        "/api/arrivals",
+        params={
+            "from": start.isoformat().replace("+00:00", "Z"),
+            "to": end.isoformat().replace("+00:00", "Z"),
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["from"] == (eta - timedelta(hours=1)).isoformat()
+    assert [c["container_id"] for c in body["containers"]] == ["TEST-001"]
@@ -0,0 +1,58 @@
+"""
+Pruebas - Grúas activas en el resumen del puerto
+"""
+
+from datetime import datetime
+
+import pytest
+
+from adapters.data_adapter import CSVDataAdapter
+from adapters.sqlite_adapter import SQLiteDataAdapter
+from domain.crane_scheduling import CraneScheduler
+from domain.entities import Container, ContainerStatus, Prioridad, TipoCarga
+from domain.services import ContainerTrackingService
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def adapter(request, tmp_path):
+    if request.param == "csv":
+        adapter = CSVDataAdapter(f"{tmp_path}/", seed_if_empty=False)
+    else:
+        adapter = SQLiteDataAdapter(
+            str(tmp_path / "chancay.db"), str(tmp_path), auto_migrate=False
+        )
+    yield adapter
+    adapter.close()
+
+
+def test_completed_container_releases_active_crane(adapter):
+    adapter.add_container(
+        Container(
+            container_id="TEST-001",
+            ship_name="Perú Express",
+            origin_port="Shanghai",
+            destination_port="Chancay",
+            cargo_type=TipoCarga.MINERALES,
+            weight_kg=25000.0,
+            status=ContainerStatus.ATRACADO,
+            eta=datetime(2026, 1, 1, 8, 0),
+            priority=Prioridad.ALTA,
+        )
+    )
+    service = ContainerTrackingService(
+        container_repo=adapter,
+        ship_tracking=adapter,
+        ai_analytics=None,
+        notifications=None,
+        operations=None,
+        cranes=CraneScheduler(["Grua-01", "Grua-02"]),
+    )
+
+    assert service.assign_crane_intelligently("TEST-001")
+    assert adapter.get_port_overview()["active_cranes"] == 1
+
+    assert service.update_unloading_progress("TEST-001", 100)
+    overview = adapter.get_port_overview()
+    assert overview["active_cranes"] == 0
+    assert overview["status_breakdown"]["completado"] == 1
+    assert adapter.get_container_by_id("TEST-001").crane_assigned == "Grua-01"